@@ -1,22 +1,72 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # Route modules
-from .routes.admin_routes import router as admin_router
+from .routes.admin_routes import router as admin_router, chains, integrity_monitor
 from .routes.voter_routes import router as voter_router
 from .routes.election import router as election_router
+from .routes.archive_routes import router as archive_router
+from .routes.station_routes import router as station_router
+
+from . import config
 
 # Database
-from .database.session import Base, engine
+from .database.session import engine, SessionLocal
+from .database.schema import ensure_schema
+from .database.crud import get_all_elections, get_live_counter_seeds
+from .security.membership import load_voter_index
+from .blockchain.archiver import chain_archiver
+from .blockchain.tally import shutdown_pool as shutdown_tally_pool
+from .utils.readiness import readiness
+from .utils.live_counters import live_counters
+from .utils.idempotency import IdempotentReplay, replay_response
 
 
 # Initialize Database
 
 def create_tables():
     """
-    Creates all database tables on startup if they don’t exist.
+    Creates all database tables if they don’t exist, and adds columns
+    introduced since older databases were created. Skipped when the
+    database already carries the current schema version.
     """
-    Base.metadata.create_all(bind=engine)
+    return ensure_schema(engine)
+
+
+# Live counters (shared with the other workers when a launcher made them)
+
+def open_live_counters():
+    if config.SHARED_COUNTERS_FILE:
+        live_counters.attach(config.SHARED_COUNTERS_FILE)
+        return
+
+    db = SessionLocal()
+    try:
+        live_counters.open_private(get_live_counter_seeds(db))
+    finally:
+        db.close()
+
+
+# Warm-up (background, after the server is accepting connections)
+
+def warm_up():
+    """
+    Loads what the hot paths want resident: the voter index, and the
+    chain of every election (resumed from disk / journal replayed).
+    """
+    db = SessionLocal()
+    try:
+        load_voter_index(db)
+        elections = [(e.id, e.epoch) for e in get_all_elections(db)]
+    finally:
+        db.close()
+
+    for election_id, epoch in elections:
+        chains.get(election_id, epoch)
+
+    if config.INTEGRITY_MONITOR_ENABLED:
+        integrity_monitor.start()
 
 
 # FastAPI App
@@ -37,19 +87,48 @@ app.add_middleware(
 )
 
 
+# Retried requests answered with their first response (Idempotency-Key)
+app.add_exception_handler(IdempotentReplay, replay_response)
+
+
 # Attach Routes
 
 app.include_router(admin_router)
 app.include_router(voter_router)
 app.include_router(election_router)
+app.include_router(archive_router)
+app.include_router(station_router)
 
 
 # Startup Hook
 
 @app.on_event("startup")
 def startup():
+    config.ensure_data_dir()
     create_tables()
-    print("[VoteChain] Database initialized. Server ready.")
+    open_live_counters()
+
+    # chains and indexes load in the background; see /ready
+    readiness.begin(warm_up)
+    print("[VoteChain] Database initialized. Warming up.")
+
+
+@app.on_event("shutdown")
+def shutdown():
+    integrity_monitor.stop()
+    # finish archiving reset chains before exiting
+    chain_archiver.stop()
+    shutdown_tally_pool()
+
+
+# Readiness (for load balancers during rolling restarts)
+
+@app.get("/ready")
+def ready():
+    """
+    200 once warm-up has finished, 503 until then.
+    """
+    return JSONResponse(readiness.report(), status_code=200 if readiness.ready else 503)
 
 
 # Root Test Endpoint
@@ -0,0 +1,115 @@
+import queue
+import threading
+from collections import deque
+
+from .. import config
+from .segments import SegmentArchive
+from .shared import chain_store_path, create_blockchain
+
+
+# BACKGROUND ARCHIVAL OF RESET CHAINS
+#
+# Resetting an election only bumps its epoch and swaps in a fresh chain
+# (see ChainRegistry.reset). The chain it replaces is handed to this
+# archiver, which in one background thread:
+#
+#   1. packs its sealed blocks not archived yet into the retired
+#      epoch's segment directory (nothing is discarded)
+#   2. closes it, removing its mempool journal slot (unsealed votes of
+#      a reset election are void)
+#   3. drops the old ledger rows through `purge`, in short jobs
+#
+# Ending the election again waits for its archival first (wait()), so
+# the new epoch's ledger rows are never written before the old ones
+# are gone.
+
+
+class ChainArchiver:
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._pending = {}                  # election_id -> queued / running jobs
+        self.errors = deque(maxlen=20)      # most recent failures
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="votechain-archiver", daemon=True
+                )
+                self._thread.start()
+
+    # --------------------------------------------------------
+    # SUBMISSION
+    # --------------------------------------------------------
+
+    def submit(self, election_id: int, epoch: int, chain, archive_root, purge=None):
+        """
+        Queues the archival of the chain of `epoch` (None if this
+        process never loaded it; persisted chains are then reopened).
+        purge() deletes a batch of old ledger rows and returns how many.
+        """
+        self._ensure_started()
+        with self._lock:
+            self._pending[election_id] = self._pending.get(election_id, 0) + 1
+        self._queue.put((election_id, epoch, chain, archive_root, purge))
+
+    def wait(self, election_id: int = None, timeout: float = None) -> bool:
+        """
+        Blocks until every archival queued for the election (None: for
+        any election) is done. Returns False on timeout.
+        """
+        def done():
+            if election_id is None:
+                return not any(self._pending.values())
+            return not self._pending.get(election_id)
+
+        with self._lock:
+            return self._done.wait_for(done, timeout)
+
+    # --------------------------------------------------------
+    # WORKER
+    # --------------------------------------------------------
+
+    def _loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+
+            election_id = job[0]
+            try:
+                self._archive(*job)
+            except Exception as e:
+                self.errors.appendleft({"election_id": election_id, "epoch": job[1], "error": str(e)})
+            finally:
+                with self._lock:
+                    self._pending[election_id] -= 1
+                    self._done.notify_all()
+
+    def _archive(self, election_id, epoch, chain, archive_root, purge):
+        if chain is None and config.CHAIN_BACKEND in ("disk", "sqlite"):
+            if chain_store_path(election_id, epoch).exists():
+                chain = create_blockchain(election_id, epoch=epoch)
+
+        if chain is not None:
+            SegmentArchive(archive_root).archive_chain(chain, config.SEGMENT_BLOCKS, final=True)
+            chain.close()
+
+        if purge is not None:
+            while purge():
+                pass
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+# shared by the admin routes of this process
+chain_archiver = ChainArchiver()
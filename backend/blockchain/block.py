@@ -1,8 +1,10 @@
 from .utils import (
     sha256_hash,
     prepare_block_data,
-    current_timestamp
+    current_timestamp,
+    serialize_transactions
 )
+from .transaction import VoteTransaction
 
 
 class Block:
@@ -36,3 +38,32 @@ class Block:
         )
 
         return sha256_hash(block_data)
+
+    def to_dict(self):
+        """
+        Serialize the sealed block, including its hash.
+        """
+        return {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "transactions": serialize_transactions(self.transactions),
+            "previous_hash": self.previous_hash,
+            "hash": self.hash
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a sealed block from its serialized form.
+        The original timestamp and hash are kept as stored,
+        so tampering is still caught by compute_hash().
+        """
+        block = cls.__new__(cls)
+        block.index = data["index"]
+        block.timestamp = data["timestamp"]
+        block.transactions = [
+            VoteTransaction.from_dict(tx) for tx in data["transactions"]
+        ]
+        block.previous_hash = data["previous_hash"]
+        block.hash = data["hash"]
+        return block
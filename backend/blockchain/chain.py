@@ -1,7 +1,22 @@
+import threading
+
+from .. import config
 from .block import Block
 from .transaction import VoteTransaction
 from .utils import serialize_transactions
 from .consensus import ConsensusEngine
+from .mempool import Mempool
+from .lazy import LazyChain
+from .turnout import TurnoutSeries
+from .tree import BlockTree
+
+
+class ForkResolutionError(Exception):
+    """
+    Raised when peer blocks or chains are offered to a chain without an
+    in-memory block tree (store-backed and shared chains): they cannot
+    keep forks, so they only grow by sealing their own mempool.
+    """
 
 
 class Blockchain:
@@ -10,24 +25,75 @@ class Blockchain:
       - holds blocks
       - queues transactions until mining
       - validates chain through ConsensusEngine
+
+    Safe for concurrent use: voters append through a striped mempool,
+    while sealing is serialized by a single seal lock.
+
+    With a block_store, only block headers stay in memory: bodies are
+    persisted to the store and loaded on demand through an LRU cache
+    (see LazyChain), and blocks already in the store are resumed.
+
+    With a journal, unsealed votes are written ahead to disk before
+    they are acknowledged, and replayed into the mempool on restart.
+
+    In-memory chains also keep every known block (forks included) in a
+    BlockTree. `chain` is the branch ending at the tree's best tip, and
+    switching tips only touches the blocks above the common ancestor.
     """
 
-    def __init__(self):
-        # internal blocks
-        self.chain = []
+    # whether the turnout series leaves pending ballots out
+    turnout_sealed_only = False
+
+    def __init__(self, election_id=None, block_store=None, journal=None):
+        # election this chain belongs to (None = standalone chain)
+        self.election_id = election_id
+        # sealed votes per candidate_id, updated as blocks are sealed
+        self.tally = {}
+        # voter hashes sealed on the active branch (in-memory chains)
+        self.sealed_voters = set()
+        # internal blocks (a plain list, or headers + lazily loaded bodies)
+        self.block_store = block_store
+        if block_store is None:
+            self.chain = []
+            # every known block by hash, forks included
+            self.tree = BlockTree()
+        else:
+            self.chain = LazyChain(block_store, config.BLOCK_CACHE_TRANSACTIONS)
+            self.tree = None
+        # votes cast per time bucket, updated as ballots arrive
+        self.turnout = TurnoutSeries(config.TURNOUT_BUCKET_SECONDS)
         # unmined VoteTransaction objects
-        self.current_transactions = []
+        self.mempool = Mempool()
+        # serializes block sealing and chain replacement
+        self._seal_lock = threading.Lock()
+        # write-ahead log of unsealed votes (optional)
+        self.journal = journal
 
         # simple local consensus engine
         self.consensus = ConsensusEngine(self)
 
-        # initialize genesis
-        self.create_genesis_block()
+        # initialize genesis, or resume blocks already persisted
+        if block_store is None or not self._resume():
+            self.create_genesis_block()
+
+        if journal is not None:
+            self._replay_journal()
 
     # --------------------------------------------------------
     # GENESIS BLOCK
     # --------------------------------------------------------
 
+    def _resume(self) -> bool:
+        """
+        Loads the headers of blocks already in the block store.
+        Returns False if the store is empty.
+        """
+        if not self.chain.load_headers():
+            return False
+        self._rebuild_tally()
+        self._rebuild_turnout()
+        return True
+
     def create_genesis_block(self):
         """
         Creates the very first block with:
@@ -41,6 +107,8 @@ class Blockchain:
             previous_hash="0"
         )
         self.chain.append(genesis)
+        if self.tree is not None:
+            self.tree.add(genesis)
 
     # --------------------------------------------------------
     # TRANSACTION MANAGEMENT
@@ -51,7 +119,41 @@ class Blockchain:
         Add a vote transaction to the pending list.
         vote_tx is a VoteTransaction instance.
         """
-        self.current_transactions.append(vote_tx)
+        if self.journal is not None:
+            # durable before the vote is acknowledged
+            self.journal.append(vote_tx)
+        self.mempool.add(vote_tx)
+        self.turnout.record(vote_tx.timestamp)
+
+    def add_transactions(self, transactions):
+        """
+        Adds a batch of vote transactions together: one journal write
+        (one fsync) and one pass over the mempool stripes.
+        """
+        if self.journal is not None:
+            self.journal.append_many(transactions)
+        self.mempool.add_many(transactions)
+        for tx in transactions:
+            self.turnout.record(tx.timestamp)
+
+    def _replay_journal(self):
+        """
+        Puts votes journaled before a restart back into the mempool.
+        Votes of the last block are skipped: a crash may have hit
+        between sealing it and compacting the journal.
+        """
+        sealed = {tx.voter_hash for tx in self.last_block().transactions}
+        for tx in self.journal.replay():
+            if tx.voter_hash not in sealed:
+                self.mempool.add(tx)
+                self.turnout.record(tx.timestamp)
+
+    @property
+    def current_transactions(self):
+        """
+        Snapshot of the unmined transactions.
+        """
+        return self.mempool.snapshot()
 
     # --------------------------------------------------------
     # BLOCK CREATION (MINING)
@@ -61,26 +163,78 @@ class Blockchain:
         """
         Turns current transactions into a new block,
         appends it to the chain, and clears the mempool.
+
+        The mempool is drained by a buffer swap, so votes arriving
+        while the block is hashed go to the next block.
         """
-        if not self.current_transactions:
-            return None
+        with self._seal_lock:
+            transactions = self.mempool.drain()
+            if not transactions:
+                return None
 
-        last_block = self.chain[-1]
+            last_block = self.chain[-1]
 
-        new_block = Block(
-            index=len(self.chain),
-            transactions=self.current_transactions.copy(),
-            previous_hash=last_block.hash
-        )
+            new_block = Block(
+                index=len(self.chain),
+                transactions=transactions,
+                previous_hash=last_block.hash
+            )
 
-        # add block to chain (through consensus engine hook)
-        self.chain.append(new_block)
+            # add block to chain (through consensus engine hook)
+            self.chain.append(new_block)
+            if self.tree is not None:
+                self.tree.add(new_block)
+            self._index_block(new_block)
 
-        # clear pending tx
-        self.current_transactions = []
+            if self.journal is not None:
+                self.journal.discard(transactions)
 
         return new_block
 
+    # --------------------------------------------------------
+    # TALLY INDEX
+    # --------------------------------------------------------
+
+    def _index_block(self, block):
+        """
+        Adds a sealed block's votes to the running tally.
+        """
+        for tx in block.transactions:
+            self.tally[tx.candidate_id] = self.tally.get(tx.candidate_id, 0) + 1
+            if self.tree is not None:
+                self.sealed_voters.add(tx.voter_hash)
+
+    def _unindex_block(self, block):
+        """
+        Takes a rolled-back block's votes out of the running tally.
+        """
+        for tx in block.transactions:
+            remaining = self.tally[tx.candidate_id] - 1
+            if remaining:
+                self.tally[tx.candidate_id] = remaining
+            else:
+                del self.tally[tx.candidate_id]
+            self.sealed_voters.discard(tx.voter_hash)
+
+    def _rebuild_tally(self):
+        self.tally = {}
+        self.sealed_voters = set()
+        for block in self.chain:
+            self._index_block(block)
+
+    def _rebuild_turnout(self):
+        """
+        Recounts the turnout series from sealed and pending votes
+        (after a resume or a chain replacement).
+        """
+        turnout = TurnoutSeries(config.TURNOUT_BUCKET_SECONDS)
+        for block in self.chain:
+            for tx in block.transactions:
+                turnout.record(tx.timestamp)
+        for tx in self.current_transactions:
+            turnout.record(tx.timestamp)
+        self.turnout = turnout
+
     # --------------------------------------------------------
     # CHAIN VALIDATION
     # --------------------------------------------------------
@@ -107,16 +261,94 @@ class Blockchain:
     def last_block(self):
         return self.chain[-1]
 
+    def close(self):
+        """
+        Releases the files of a chain that was replaced by a newer
+        epoch's: its journal slot (unsealed votes of an old epoch are
+        void) and this thread's block store connection.
+        """
+        if self.journal is not None:
+            self.journal.close(remove=True)
+        if self.block_store is not None:
+            self.block_store.close()
+
 
     # --------------------------------------------------------
-    # OPTIONAL SYNC (multi-node future support)
+    # FORKS (multi-node future support)
     # --------------------------------------------------------
 
+    def _require_tree(self):
+        if self.tree is None:
+            raise ForkResolutionError("Fork resolution needs an in-memory block tree")
+
     def resolve_conflicts(self, other_chains: list):
         """
         Accepts multiple chains and adopts the longest valid one.
         """
-        changed = self.consensus.resolve_conflicts(other_chains)
-        if changed:
-            self.chain = self.consensus.get_chain().chain
-        return changed
+        self._require_tree()
+        with self._seal_lock:
+            return self.consensus.resolve_conflicts(other_chains)
+
+    def receive_block(self, block) -> bool:
+        """
+        Accepts a block from a peer, on any known branch.
+        """
+        self._require_tree()
+        with self._seal_lock:
+            return self.consensus.add_block_to_chain(block)
+
+    def switch_to_best_tip(self) -> bool:
+        """
+        Reorganizes onto the tree's best tip: blocks above the common
+        ancestor are rolled back, the new branch is applied, and the
+        tally / sealed voter set / mempool are updated by that delta
+        only. Returns False if the chain already ends at the best tip.
+        Caller holds the seal lock.
+        """
+        new_tip = self.tree.get(self.tree.best_tip)
+        old_tip = self.chain[-1]
+        if new_tip.hash == old_tip.hash:
+            return False
+
+        ancestor = self.tree.common_ancestor(old_tip, new_tip)
+        keep = ancestor.index + 1 if ancestor is not None else 0
+
+        rolled_back = self.chain[keep:]
+        applied = self.tree.branch(new_tip, ancestor)
+
+        del self.chain[keep:]
+        self.chain.extend(applied)
+
+        for block in reversed(rolled_back):
+            self._unindex_block(block)
+        for block in applied:
+            self._index_block(block)
+
+        self._requeue_after_reorg(rolled_back, applied)
+        return True
+
+    def _requeue_after_reorg(self, rolled_back: list, applied: list):
+        """
+        Votes of rolled-back blocks that the new branch does not contain
+        go back to the mempool; pending votes the new branch sealed
+        leave it. Votes first seen in the new branch join the turnout.
+        """
+        applied_txs = [tx for block in applied for tx in block.transactions]
+        now_sealed = {tx.voter_hash for tx in applied_txs}
+
+        known = {tx.voter_hash for block in rolled_back for tx in block.transactions}
+        known.update(tx.voter_hash for tx in self.mempool.discard(now_sealed))
+
+        if self.journal is not None:
+            self.journal.discard(applied_txs)
+
+        for block in rolled_back:
+            for tx in block.transactions:
+                if tx.voter_hash not in now_sealed:
+                    if self.journal is not None:
+                        self.journal.append(tx)
+                    self.mempool.add(tx)
+
+        for tx in applied_txs:
+            if tx.voter_hash not in known:
+                self.turnout.record(tx.timestamp)
@@ -0,0 +1,242 @@
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from .. import config
+
+
+# VOTE COLUMN STORE
+#
+# A columnar projection of every sealed vote, one flat binary file per
+# column in DATA_DIR:
+#
+#   candidate_id.i4    int32
+#   timestamp.f8       float64
+#   block_index.i4     int32
+#   meta.json          {"count": rows, "next_block": first block not yet appended}
+#
+# Files are only ever appended to, and meta.json is replaced atomically
+# after the data is flushed, so readers trust `count` and ignore any torn
+# tail. Appends hold an flock on append.lock, so worker processes sealing
+# the same election never project a block twice. Readers map the files
+# with np.memmap: the OS page cache is shared by every worker process
+# reading the same election.
+
+COLUMNS = {
+    "candidate_id": np.int32,
+    "timestamp": np.float64,
+    "block_index": np.int32,
+}
+
+
+class VoteColumns:
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps = None
+        self._mapped_count = -1
+
+    # --------------------------------------------------------
+    # META
+    # --------------------------------------------------------
+
+    def _column_path(self, name) -> Path:
+        # e.g. "candidate_id.i4", "timestamp.f8" (little-endian, native)
+        return self.root / f"{name}.{np.dtype(COLUMNS[name]).str[1:]}"
+
+    def meta(self) -> dict:
+        try:
+            with open(self.root / "meta.json") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {"count": 0, "next_block": 0}
+
+    def _write_meta(self, meta: dict):
+        tmp = self.root / "meta.json.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(meta, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.root / "meta.json")
+
+    @contextmanager
+    def _append_lock(self):
+        """
+        Exclusive against appends of this process (thread lock) and of
+        every other process (flock on the column directory's lock file).
+        """
+        with self._lock:
+            with open(self.root / "append.lock", "a") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    # --------------------------------------------------------
+    # APPEND (called when blocks are sealed)
+    # --------------------------------------------------------
+
+    def append_chain(self, chain) -> int:
+        """
+        Appends the votes of every sealed block not projected yet.
+        Returns the number of votes appended.
+        """
+        return self.append_blocks(chain.chain[self.meta()["next_block"]:])
+
+    def append_blocks(self, blocks) -> int:
+        """
+        Appends the votes of consecutive sealed blocks (e.g. streamed
+        from a chain store); blocks already projected, by this or any
+        other process, are skipped. Returns the number of votes appended.
+        """
+        with self._append_lock():
+            # re-read under the lock: another process may have appended
+            meta = self.meta()
+            blocks = [block for block in blocks if block.index >= meta["next_block"]]
+            if not blocks:
+                return 0
+            if blocks[0].index != meta["next_block"]:
+                raise ValueError(
+                    f"expected block {meta['next_block']}, got {blocks[0].index}"
+                )
+
+            columns = {name: [] for name in COLUMNS}
+            for block in blocks:
+                for tx in block.transactions:
+                    columns["candidate_id"].append(tx.candidate_id)
+                    columns["timestamp"].append(tx.timestamp)
+                    columns["block_index"].append(block.index)
+
+            for name, dtype in COLUMNS.items():
+                path = self._column_path(name)
+                with open(path, "ab") as fh:
+                    # drop a torn tail left by an interrupted append
+                    fh.truncate(meta["count"] * np.dtype(dtype).itemsize)
+                    np.asarray(columns[name], dtype=dtype).tofile(fh)
+                    fh.flush()
+                    os.fsync(fh.fileno())
+
+            added = len(columns["candidate_id"])
+            self._write_meta({
+                "count": meta["count"] + added,
+                "next_block": blocks[-1].index + 1
+            })
+            return added
+
+    # --------------------------------------------------------
+    # MEMORY-MAPPED READS
+    # --------------------------------------------------------
+
+    def clear(self):
+        """
+        Drops every column (the projection is rebuilt from the chain).
+        """
+        with self._append_lock():
+            for name in COLUMNS:
+                self._column_path(name).unlink(missing_ok=True)
+            (self.root / "meta.json").unlink(missing_ok=True)
+            self._maps = None
+            self._mapped_count = -1
+
+    def arrays(self) -> dict:
+        """
+        Read-only memory maps of every column, sized to the committed count.
+        """
+        count = self.meta()["count"]
+        with self._lock:
+            if count != self._mapped_count:
+                self._maps = {
+                    name: (
+                        np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(count,))
+                        if count else np.empty(0, dtype=dtype)
+                    )
+                    for name, dtype in COLUMNS.items()
+                }
+                self._mapped_count = count
+            return self._maps
+
+    def _window(self, start_time=None, end_time=None):
+        cols = self.arrays()
+        if start_time is None and end_time is None:
+            return cols
+
+        ts = cols["timestamp"]
+        mask = np.ones(len(ts), dtype=bool)
+        if start_time is not None:
+            mask &= ts >= start_time
+        if end_time is not None:
+            mask &= ts < end_time
+        return {name: col[mask] for name, col in cols.items()}
+
+    # --------------------------------------------------------
+    # VECTORIZED ANALYTICS
+    # --------------------------------------------------------
+
+    def tally(self, start_time=None, end_time=None) -> dict:
+        """
+        Votes per candidate_id (np.bincount).
+        """
+        candidate_ids = self._window(start_time, end_time)["candidate_id"]
+        if not len(candidate_ids):
+            return {}
+        counts = np.bincount(candidate_ids)
+        return {int(cid): int(counts[cid]) for cid in np.flatnonzero(counts)}
+
+    def turnout_histogram(self, bucket_seconds: float, start_time=None, end_time=None) -> dict:
+        """
+        Votes per fixed-width time bucket, plus the cumulative curve.
+        """
+        ts = self._window(start_time, end_time)["timestamp"]
+        if not len(ts):
+            return {"start": None, "bucket_seconds": bucket_seconds, "counts": [], "cumulative": []}
+
+        origin = float(ts.min()) if start_time is None else float(start_time)
+        buckets = ((ts - origin) // bucket_seconds).astype(np.int64)
+        counts = np.bincount(buckets)
+
+        return {
+            "start": origin,
+            "bucket_seconds": bucket_seconds,
+            "counts": counts.tolist(),
+            "cumulative": np.cumsum(counts).tolist()
+        }
+
+    def per_block_counts(self) -> dict:
+        """
+        Votes sealed in each block (block_index -> count).
+        """
+        block_index = self.arrays()["block_index"]
+        if not len(block_index):
+            return {}
+        counts = np.bincount(block_index)
+        return {int(i): int(counts[i]) for i in np.flatnonzero(counts)}
+
+
+# ONE COLUMN STORE PER ELECTION
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_columns(election_id: int) -> VoteColumns:
+    with _stores_lock:
+        store = _stores.get(election_id)
+        if store is None:
+            store = VoteColumns(config.COLUMNS_DIR / f"election-{election_id}")
+            _stores[election_id] = store
+        return store
+
+
+def reset_columns(election_id: int):
+    """
+    Drops an election's projection when its chain is reset.
+    """
+    get_columns(election_id).clear()
@@ -4,6 +4,53 @@ if TYPE_CHECKING:
     from .chain import Blockchain
 
 
+class BranchVoters:
+    """
+    Voters already sealed on the branch ending at `parent`, without
+    copying the local chain's sealed voter set: that set, minus the
+    voters of local blocks above the fork point, plus the voters of the
+    fork's own blocks (only the fork is walked).
+    """
+
+    def __init__(self, local_chain, parent):
+        tree = local_chain.tree
+        self.sealed = local_chain.sealed_voters
+        self.rolled_back = set()
+        self.fork = set()
+
+        ancestor = None
+        if parent is not None:
+            ancestor = tree.common_ancestor(local_chain.chain[-1], parent)
+            self.fork.update(_voters(tree.branch(parent, ancestor)))
+        if ancestor is None:
+            # no block shared with the local chain
+            self.sealed = set()
+        else:
+            self.rolled_back.update(_voters(local_chain.chain[ancestor.index + 1:]))
+
+    def __contains__(self, voter_hash) -> bool:
+        if voter_hash in self.fork:
+            return True
+        return voter_hash in self.sealed and voter_hash not in self.rolled_back
+
+    def admits(self, block) -> bool:
+        """
+        True if the block seals each of its voters once, and none that
+        is already sealed on the branch.
+        """
+        voters = [tx.voter_hash for tx in block.transactions]
+        if len(set(voters)) != len(voters):
+            return False
+        return not any(voter in self for voter in voters)
+
+    def extend(self, block):
+        self.fork.update(tx.voter_hash for tx in block.transactions)
+
+
+def _voters(blocks):
+    return (tx.voter_hash for block in blocks for tx in block.transactions)
+
+
 class ConsensusEngine:
     """
     A simple consensus engine for VoteChain.
@@ -14,6 +61,10 @@ class ConsensusEngine:
       - validating chains
       - resolving forks by choosing the longest valid chain
       - safe block addition
+
+    Blocks from other chains are grafted into the local BlockTree;
+    the local chain then switches to the best tip by rolling back and
+    applying only the blocks above the common ancestor.
     """
 
     def __init__(self, blockchain):
@@ -26,34 +77,70 @@ class ConsensusEngine:
 
     def validate_chain(self, chain) -> bool:
         """
-        Ensures a candidate chain is valid.
+        Ensures a candidate chain is valid: every block hashes to its
+        stored hash and links to the block before it, and no voter is
+        sealed twice.
         """
-        return chain.is_chain_valid()
+        previous = None
+        voters = set()
+        for block in chain.chain:
+            if block.hash != block.compute_hash():
+                return False
+            for tx in block.transactions:
+                if tx.voter_hash in voters:
+                    return False
+                voters.add(tx.voter_hash)
+            if previous is not None and (
+                block.previous_hash != previous.hash
+                or block.index != previous.index + 1
+            ):
+                return False
+            previous = block
+        return previous is not None
 
     # --------------------------------------------------------
     # FORK RESOLUTION: LONGEST VALID CHAIN WINS
     # --------------------------------------------------------
 
-    def resolve_conflicts(self, candidate_chains: List["Blockchain"]) -> bool:
+    def graft(self, candidate: "Blockchain") -> int:
         """
-        Picks the longest valid chain from candidates.
+        Adds the candidate's blocks that the local tree does not know
+        yet. Only those blocks are read and validated (walking back
+        from the candidate's tip to the first known block); grafting
+        stops at the first block that re-seals a voter of its branch.
+        Returns the number of blocks added.
         """
-        longest_chain = self.local_chain
-        max_length = len(self.local_chain.chain)
+        tree = self.local_chain.tree
+        blocks = candidate.chain
+
+        new_blocks = []
+        for i in range(len(blocks) - 1, -1, -1):
+            if blocks[i].hash in tree:
+                break
+            new_blocks.append(blocks[i])
+
+        added = 0
+        voters = None
+        for block in reversed(new_blocks):
+            if voters is None:
+                voters = BranchVoters(self.local_chain, tree.parent(block))
+            if not voters.admits(block) or not tree.add(block):
+                break
+            voters.extend(block)
+            added += 1
+        return added
 
+    def resolve_conflicts(self, candidate_chains: List["Blockchain"]) -> bool:
+        """
+        Grafts every longer candidate chain into the block tree, then
+        switches the local chain to the best tip.
+        Caller holds the local chain's seal lock.
+        """
         for chain in candidate_chains:
-            if (
-                len(chain.chain) > max_length
-                and self.validate_chain(chain)
-            ):
-                longest_chain = chain
-                max_length = len(chain.chain)
-
-        if longest_chain is not self.local_chain:
-            self.local_chain = longest_chain
-            return True
+            if len(chain.chain) > len(self.local_chain.chain):
+                self.graft(chain)
 
-        return False
+        return self.local_chain.switch_to_best_tip()
 
     # --------------------------------------------------------
     # ADD BLOCK SAFELY
@@ -61,17 +148,20 @@ class ConsensusEngine:
 
     def add_block_to_chain(self, block) -> bool:
         """
-        Appends block only if it correctly follows the last block.
+        Stores a block on any known branch (it must link to a known
+        parent and hash correctly, and must not re-seal a voter of its
+        branch) and follows it if it extends the best chain.
+        Caller holds the local chain's seal lock.
         """
-        last_block = self.local_chain.chain[-1]
-
-        if block.previous_hash != last_block.hash:
+        tree = self.local_chain.tree
+        if block.hash in tree:
             return False
-
-        if block.hash != block.compute_hash():
+        if not BranchVoters(self.local_chain, tree.parent(block)).admits(block):
+            return False
+        if not tree.add(block):
             return False
 
-        self.local_chain.chain.append(block)
+        self.local_chain.switch_to_best_tip()
         return True
 
     # --------------------------------------------------------
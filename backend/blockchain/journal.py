@@ -0,0 +1,256 @@
+import fcntl
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from .transaction import VoteTransaction
+
+
+# MEMPOOL JOURNAL
+#
+# Write-ahead log of unsealed votes, one JSON line per transaction:
+#
+#   {"voter_hash": ..., "candidate_id": ..., "timestamp": ...}
+#
+# A vote is acknowledged only once its line is on disk. Concurrent
+# voters share fsyncs (group commit): the first waiter flushes every
+# line written so far, the others just wait for it. After a block is
+# sealed, the sealed lines are compacted away; on startup the remaining
+# lines are replayed into the mempool. A torn last line (crash while
+# writing) is ignored.
+#
+# Compaction rewrites the whole file, so a journal file has exactly one
+# writer: each journal holds an flock on "<name>.lock" while open. Worker
+# processes of one election each take their own slot (open_journal):
+#
+#   mempool-1.log, mempool-1.1.log, mempool-1.2.log, ...
+
+
+class JournalInUse(Exception):
+    """
+    Raised when opening a journal file another process (or journal
+    object) already holds.
+    """
+
+
+class MempoolJournal:
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock_fh = open(self.path.with_suffix(".lock"), "a")
+        try:
+            fcntl.flock(self._lock_fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_fh.close()
+            raise JournalInUse(f"{self.path} is held by another process")
+
+        self._lock = threading.Lock()
+        self._synced = threading.Condition(self._lock)
+
+        # rewrite the surviving lines, so new ones never follow a torn tail
+        self._fh = None
+        self._pending = self._read() if self.path.exists() else []
+        self._rewrite(self._pending)
+
+        # monotonic line counters (not reset by compaction)
+        self._written = 0       # lines written to the file
+        self._durable = 0       # lines known to be fsynced
+        self._flushing = False
+        # number of fsync calls, for benchmarks
+        self.fsyncs = 0
+
+    # --------------------------------------------------------
+    # APPEND (GROUP COMMIT)
+    # --------------------------------------------------------
+
+    def append(self, tx: VoteTransaction):
+        """
+        Writes the transaction and returns once it is durable.
+        """
+        self.append_many([tx])
+
+    def append_many(self, transactions):
+        """
+        Writes a batch of transactions in one write and returns once
+        all of them are durable (one fsync, shared as above).
+        """
+        data = b"".join(
+            json.dumps(tx.to_dict(), separators=(",", ":")).encode() + b"\n"
+            for tx in transactions
+        )
+
+        with self._lock:
+            if self._fh is None:
+                raise ValueError(f"{self.path} is closed")
+            self._fh.write(data)
+            self._written += len(transactions)
+            seq = self._written
+
+            while self._durable < seq:
+                if self._flushing:
+                    # someone else's fsync is in flight; it may cover us
+                    self._synced.wait()
+                    continue
+
+                # become the flusher for everything written so far
+                self._flushing = True
+                target = self._written
+                self._fh.flush()
+                fd = self._fh.fileno()
+
+                self._lock.release()
+                try:
+                    os.fsync(fd)
+                finally:
+                    self._lock.acquire()
+                    self._flushing = False
+
+                self.fsyncs += 1
+                self._durable = max(self._durable, target)
+                self._synced.notify_all()
+
+    # --------------------------------------------------------
+    # REPLAY / COMPACTION
+    # --------------------------------------------------------
+
+    def _read(self) -> list:
+        entries = []
+        with open(self.path, "rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entries.append(VoteTransaction.from_dict(json.loads(line)))
+                except (ValueError, KeyError):
+                    break
+        return entries
+
+    def replay(self) -> list:
+        """
+        Transactions found in the journal when it was opened
+        (journaled but not sealed before the restart), in arrival order.
+        """
+        pending, self._pending = self._pending, []
+        return pending
+
+    def discard(self, sealed_transactions):
+        """
+        Drops sealed transactions from the journal. Lines appended
+        while the block was being sealed are kept.
+        """
+        sealed = {tx.voter_hash for tx in sealed_transactions}
+
+        with self._lock:
+            while self._flushing:
+                self._synced.wait()
+
+            self._fh.flush()
+            kept = [tx for tx in self._read() if tx.voter_hash not in sealed]
+            self._rewrite(kept)
+
+            # the rewritten file is fsynced: every line so far is durable
+            self._durable = self._written
+            self._synced.notify_all()
+
+    def adopt(self, other: "MempoolJournal"):
+        """
+        Takes over the votes of a journal whose process is gone: they
+        are appended here (durably) and replayed with this journal's
+        own, then the other file is removed.
+        """
+        known = {tx.voter_hash for tx in self._pending}
+        moved = [tx for tx in other.replay() if tx.voter_hash not in known]
+        if moved:
+            self.append_many(moved)
+            self._pending.extend(moved)
+        other.close(remove=True)
+
+    def close(self, remove: bool = False):
+        """
+        Closes the file and releases it to other processes; remove=True
+        deletes it first (its votes were adopted or are not needed).
+        """
+        with self._lock:
+            while self._flushing:
+                self._synced.wait()
+            if remove:
+                self.path.unlink(missing_ok=True)
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            self._lock_fh.close()       # releases the flock
+
+    def clear(self):
+        with self._lock:
+            while self._flushing:
+                self._synced.wait()
+            self._rewrite([])
+            self._durable = self._written
+            self._synced.notify_all()
+
+    def _rewrite(self, transactions):
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as fh:
+            for tx in transactions:
+                fh.write(json.dumps(tx.to_dict(), separators=(",", ":")).encode() + b"\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = open(self.path, "ab")
+
+
+# ONE JOURNAL SLOT PER PROCESS
+
+def slot_path(path, slot: int) -> Path:
+    # slot 0 keeps the plain name
+    path = Path(path)
+    if slot == 0:
+        return path
+    return path.with_name(f"{path.stem}.{slot}{path.suffix}")
+
+
+def slot_paths(path) -> list:
+    """
+    Existing journal files of every slot of `path`, slot 0 first.
+    """
+    path = Path(path)
+    pattern = re.compile(rf"{re.escape(path.stem)}\.(\d+){re.escape(path.suffix)}")
+    slots = sorted(
+        int(match.group(1))
+        for match in map(pattern.fullmatch, (p.name for p in path.parent.glob(f"{path.stem}.*")))
+        if match
+    )
+    paths = [slot_path(path, slot) for slot in slots]
+    return [path, *paths] if path.exists() else paths
+
+
+def open_journal(path) -> MempoolJournal:
+    """
+    This process's journal for `path`: the first slot no other process
+    holds. Slots of processes that are gone are adopted, so their votes
+    are replayed even if fewer workers restart.
+    """
+    slot = 0
+    while True:
+        try:
+            journal = MempoolJournal(slot_path(path, slot))
+            break
+        except JournalInUse:
+            slot += 1
+
+    for other in slot_paths(path):
+        if other == journal.path:
+            continue
+        try:
+            orphan = MempoolJournal(other)
+        except JournalInUse:
+            continue
+        journal.adopt(orphan)
+    return journal
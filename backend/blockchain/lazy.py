@@ -0,0 +1,174 @@
+import threading
+from collections import OrderedDict
+
+
+class MissingBlockError(Exception):
+    """
+    A block the resident headers list is not in the store any more:
+    the store file lost rows (corruption, manual edits).
+    """
+
+    def __init__(self, index: int):
+        super().__init__(f"block {index} is missing from the chain store")
+        self.index = index
+
+
+class BlockHeader:
+    """
+    The resident part of a sealed block: everything but its transactions.
+    """
+
+    __slots__ = ("index", "timestamp", "previous_hash", "hash", "tx_count")
+
+    def __init__(self, index, timestamp, previous_hash, hash, tx_count):
+        self.index = index
+        self.timestamp = timestamp
+        self.previous_hash = previous_hash
+        self.hash = hash
+        self.tx_count = tx_count
+
+    @classmethod
+    def of(cls, block):
+        return cls(block.index, block.timestamp, block.previous_hash, block.hash, len(block.transactions))
+
+
+class BlockCache:
+    """
+    LRU of full Block objects, bounded by the total number of
+    transactions held (block size varies a lot, block count does not
+    say much about memory). The most recent block is always kept.
+    """
+
+    def __init__(self, max_transactions: int):
+        self.max_transactions = max_transactions
+        self._blocks = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, index: int):
+        with self._lock:
+            block = self._blocks.get(index)
+            if block is None:
+                self.misses += 1
+                return None
+            self._blocks.move_to_end(index)
+            self.hits += 1
+            return block
+
+    def put(self, block):
+        with self._lock:
+            old = self._blocks.pop(block.index, None)
+            if old is not None:
+                self._size -= len(old.transactions)
+            self._blocks[block.index] = block
+            self._size += len(block.transactions)
+
+            while self._size > self.max_transactions and len(self._blocks) > 1:
+                _, evicted = self._blocks.popitem(last=False)
+                self._size -= len(evicted.transactions)
+
+    def clear(self):
+        with self._lock:
+            self._blocks.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._blocks)
+
+
+class LazyChain:
+    """
+    List-like view of a chain whose headers stay in memory while block
+    bodies live in a SqliteChainStore and are loaded on demand through
+    a BlockCache.
+
+    Supports what callers of Blockchain.chain rely on: len(), indexing
+    (negative too), slicing, iteration and append().
+    """
+
+    # blocks fetched per query when iterating past the cache
+    BATCH = 64
+
+    def __init__(self, store, cache_transactions: int):
+        self.store = store
+        self.cache = BlockCache(cache_transactions)
+        self.headers = []
+
+    # --------------------------------------------------------
+    # HEADERS
+    # --------------------------------------------------------
+
+    def load_headers(self):
+        """
+        Appends headers of blocks present in the store but not here yet.
+        Returns the number of new headers.
+        """
+        rows = self.store.load_headers(start=len(self.headers))
+        self.headers.extend(BlockHeader(*row) for row in rows)
+        return len(rows)
+
+    def reset(self):
+        self.headers = []
+        self.cache.clear()
+
+    # --------------------------------------------------------
+    # LIST INTERFACE
+    # --------------------------------------------------------
+
+    def __len__(self):
+        return len(self.headers)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._load(i) for i in range(*key.indices(len(self.headers)))]
+
+        if key < 0:
+            key += len(self.headers)
+        if not 0 <= key < len(self.headers):
+            raise IndexError("block index out of range")
+        return self._load(key)
+
+    def __iter__(self):
+        i = 0
+        while i < len(self.headers):
+            block = self.cache.get(i)
+            if block is not None:
+                yield block
+                i += 1
+                continue
+
+            # cache miss: fetch the next batch in one query; a gap or an
+            # empty batch means rows were lost, not the end of the chain
+            batch = self.store.load_blocks(i, min(i + self.BATCH, len(self.headers)))
+            if not batch:
+                raise MissingBlockError(i)
+            for block in batch:
+                if block.index != i:
+                    raise MissingBlockError(i)
+                self.cache.put(block)
+                yield block
+                i += 1
+
+    def append(self, block):
+        """
+        Persists a newly sealed block and keeps its header resident.
+        """
+        self.store.append_blocks([block])
+        self.headers.append(BlockHeader.of(block))
+        self.cache.put(block)
+
+    # --------------------------------------------------------
+    # BODY LOADING
+    # --------------------------------------------------------
+
+    def _load(self, index: int):
+        block = self.cache.get(index)
+        if block is None:
+            blocks = self.store.load_blocks(index, index + 1)
+            if not blocks:
+                raise MissingBlockError(index)
+            block = blocks[0]
+            self.cache.put(block)
+        return block
@@ -0,0 +1,100 @@
+import threading
+
+
+class Mempool:
+    """
+    Thread-safe pool of unmined VoteTransaction objects.
+
+    Ingestion is spread over several independent stripes, each with
+    its own lock, so concurrent voters rarely contend with each other.
+
+    Sealing uses a double-buffered swap: every stripe's buffer is
+    exchanged for a fresh empty list under that stripe's lock. Voters
+    are only ever blocked for the duration of that pointer swap, never
+    for the time it takes to build and hash a block.
+    """
+
+    def __init__(self, stripes: int = 16):
+        self._stripes = max(1, int(stripes))
+        self._locks = [threading.Lock() for _ in range(self._stripes)]
+        self._buffers = [[] for _ in range(self._stripes)]
+
+    # --------------------------------------------------------
+    # INGESTION
+    # --------------------------------------------------------
+
+    def _stripe_for(self, tx) -> int:
+        return hash(tx.voter_hash) % self._stripes
+
+    def add(self, tx):
+        """
+        Append a transaction to its stripe.
+        """
+        i = self._stripe_for(tx)
+        with self._locks[i]:
+            self._buffers[i].append(tx)
+
+    def add_many(self, transactions):
+        """
+        Appends a batch, taking each stripe's lock once.
+        """
+        by_stripe = {}
+        for tx in transactions:
+            by_stripe.setdefault(self._stripe_for(tx), []).append(tx)
+        for i, batch in by_stripe.items():
+            with self._locks[i]:
+                self._buffers[i].extend(batch)
+
+    # --------------------------------------------------------
+    # SEALING
+    # --------------------------------------------------------
+
+    def drain(self) -> list:
+        """
+        Atomically takes every pending transaction out of the pool.
+        Each stripe is swapped for an empty buffer; transactions that
+        arrive afterwards land in the new buffers and are kept for
+        the next block.
+        Returned transactions are ordered by timestamp.
+        """
+        drained = []
+        for i in range(self._stripes):
+            with self._locks[i]:
+                buffer, self._buffers[i] = self._buffers[i], []
+            drained.extend(buffer)
+
+        drained.sort(key=lambda tx: tx.timestamp)
+        return drained
+
+    def discard(self, voter_hashes) -> list:
+        """
+        Removes pending transactions of the given voters (sealed on
+        another branch after a reorg). Returns the removed ones.
+        """
+        removed = []
+        for i in range(self._stripes):
+            with self._locks[i]:
+                kept = []
+                for tx in self._buffers[i]:
+                    (removed if tx.voter_hash in voter_hashes else kept).append(tx)
+                self._buffers[i] = kept
+        return removed
+
+    # --------------------------------------------------------
+    # READ HELPERS
+    # --------------------------------------------------------
+
+    def snapshot(self) -> list:
+        """
+        Returns a copy of the pending transactions without removing them.
+        """
+        pending = []
+        for i in range(self._stripes):
+            with self._locks[i]:
+                pending.extend(self._buffers[i])
+
+        pending.sort(key=lambda tx: tx.timestamp)
+        return pending
+
+    def __len__(self):
+        return sum(len(buffer) for buffer in self._buffers)
@@ -0,0 +1,262 @@
+import random
+import threading
+import time
+from collections import deque
+
+from .. import config
+from .lazy import MissingBlockError
+
+
+# INTEGRITY MONITOR
+#
+# Background re-verification of every election's chain:
+#
+#   1. new blocks: everything above the highest validated index is
+#      checked once (hash, link to the previous block, index)
+#   2. old blocks: a random sample below that index is re-checked
+#      every cycle, to catch later tampering in memory or on disk
+#
+# Each cycle stops when its CPU budget (thread time) is spent; new
+# blocks left over are picked up on the next cycle.
+
+
+class ChainProgress:
+    """
+    Monitor state for one election's chain.
+    """
+
+    __slots__ = ("chain", "validated", "last_hash")
+
+    def __init__(self, chain):
+        self.chain = chain
+        self.validated = -1     # highest block index verified so far
+        self.last_hash = None   # its hash, to notice a replaced chain
+
+
+def chain_snapshot(chain) -> list:
+    """
+    The active branch as it is now: its blocks (in-memory chains) or
+    block headers (disk-backed chains), copied under the seal lock so a
+    concurrent seal, reorg or reset cannot change it mid-cycle.
+    """
+    with chain._seal_lock:
+        blocks = chain.chain
+        if chain.block_store is not None:
+            return list(blocks.headers)
+        return list(blocks)
+
+
+def read_block(chain, snapshot: list, index: int):
+    """
+    Reads a block the way it is stored: from the block store (not the
+    LRU cache) for disk-backed chains, from the snapshot otherwise.
+    """
+    if chain.block_store is not None:
+        blocks = chain.block_store.load_blocks(index, index + 1)
+        return blocks[0] if blocks else None
+    return snapshot[index]
+
+
+def verify_block(block, previous) -> str:
+    """
+    Returns None if the block is sound, otherwise what is wrong.
+    """
+    if block is None:
+        return "missing"
+    if block.hash != block.compute_hash():
+        return "hash_mismatch"
+    if previous is not None:
+        if block.previous_hash != previous.hash:
+            return "broken_link"
+        if block.index != previous.index + 1:
+            return "bad_index"
+    return None
+
+
+class IntegrityMonitor:
+
+    def __init__(self, registry, interval=None, sample_size=None, cpu_budget=None):
+        self.registry = registry
+        self.interval = interval if interval is not None else config.INTEGRITY_INTERVAL_SECONDS
+        self.sample_size = sample_size if sample_size is not None else config.INTEGRITY_SAMPLE_SIZE
+        self.cpu_budget = cpu_budget if cpu_budget is not None else config.INTEGRITY_CPU_BUDGET_SECONDS
+
+        self._progress = {}                 # election_id -> ChainProgress
+        self.findings = deque(maxlen=100)   # most recent problems first
+        self._reported = set()              # (election_id, index, problem) already reported
+        self.metrics = {
+            "cycles": 0,
+            "blocks_verified": 0,
+            "samples_verified": 0,
+            "failures": 0,
+            "budget_exhausted": 0,
+            "errors": 0,                    # cycles cut short by an exception
+            "last_error": None,
+            "last_cycle_cpu_seconds": 0.0,
+            "last_cycle_at": None,
+        }
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --------------------------------------------------------
+    # ONE CYCLE
+    # --------------------------------------------------------
+
+    def _finding(self, election_id, index, problem):
+        key = (election_id, index, problem)
+        if key in self._reported:
+            return
+        self._reported.add(key)
+        self.metrics["failures"] += 1
+        self.findings.appendleft({
+            "election_id": election_id,
+            "block_index": index,
+            "problem": problem,
+            "detected_at": time.time()
+        })
+
+    def _progress_for(self, election_id, chain, snapshot: list) -> ChainProgress:
+        progress = self._progress.get(election_id)
+        if progress is None or progress.chain is not chain:
+            # first sight, or the election was reset: start over
+            progress = ChainProgress(chain)
+            self._progress[election_id] = progress
+        elif progress.validated >= 0 and (
+            progress.validated >= len(snapshot)
+            or snapshot[progress.validated].hash != progress.last_hash
+        ):
+            # the branch under the validated mark changed (reorg)
+            progress.validated = -1
+            progress.last_hash = None
+        return progress
+
+    def _check_chain(self, election_id, deadline) -> bool:
+        """
+        Verifies new blocks and a sample of old ones of one election's
+        chain. Returns True if the CPU budget ran out.
+        """
+        exhausted = False
+        chain = self.registry.get(election_id)
+        snapshot = chain_snapshot(chain)
+        progress = self._progress_for(election_id, chain, snapshot)
+        length = len(snapshot)
+
+        # 1. newly appended blocks
+        previous = read_block(chain, snapshot, progress.validated) if progress.validated >= 0 else None
+        while progress.validated + 1 < length:
+            if time.thread_time() > deadline:
+                exhausted = True
+                break
+            index = progress.validated + 1
+            block = read_block(chain, snapshot, index)
+            problem = verify_block(block, previous)
+            if problem:
+                self._finding(election_id, index, problem)
+                break
+            progress.validated = index
+            progress.last_hash = block.hash
+            previous = block
+            self.metrics["blocks_verified"] += 1
+
+        # 2. random sample of already validated blocks
+        if progress.validated < 0:
+            return exhausted
+        for index in random.sample(
+            range(progress.validated + 1),
+            min(self.sample_size, progress.validated + 1)
+        ):
+            if time.thread_time() > deadline:
+                exhausted = True
+                break
+            block = read_block(chain, snapshot, index)
+            previous = read_block(chain, snapshot, index - 1) if index else None
+            problem = verify_block(block, previous)
+            if problem is None and block.hash != snapshot[index].hash:
+                problem = "diverges_from_memory"
+            if problem:
+                self._finding(election_id, index, problem)
+            self.metrics["samples_verified"] += 1
+        return exhausted
+
+    def check_once(self) -> dict:
+        """
+        Runs one verification cycle over every election's chain.
+        """
+        with self._lock:
+            started = time.thread_time()
+            deadline = started + self.cpu_budget
+            exhausted = False
+
+            for election_id in self.registry.election_ids():
+                try:
+                    exhausted = self._check_chain(election_id, deadline) or exhausted
+                except MissingBlockError as e:
+                    # rows lost from the store while loading the chain:
+                    # evidence of corruption, not a transient error
+                    self._finding(election_id, e.index, "missing")
+
+            self.metrics["cycles"] += 1
+            self.metrics["budget_exhausted"] += int(exhausted)
+            self.metrics["last_cycle_cpu_seconds"] = time.thread_time() - started
+            self.metrics["last_cycle_at"] = time.time()
+            return self.report()
+
+    # --------------------------------------------------------
+    # BACKGROUND THREAD
+    # --------------------------------------------------------
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check_once()
+            except Exception as e:
+                # not evidence of tampering (e.g. a store closed by a reset
+                # mid-cycle): counted apart from failures, retried next cycle
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = str(e)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="votechain-integrity", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    # --------------------------------------------------------
+    # REPORTING
+    # --------------------------------------------------------
+
+    def report(self) -> dict:
+        return {
+            "running": self._thread is not None,
+            "elections": {
+                election_id: {"validated_index": progress.validated}
+                for election_id, progress in self._progress.items()
+            },
+            "metrics": dict(self.metrics),
+            "findings": list(self.findings)
+        }
+
+    def prometheus(self) -> str:
+        """
+        Metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for name in ("cycles", "blocks_verified", "samples_verified", "failures", "budget_exhausted", "errors"):
+            lines.append(f"# TYPE votechain_integrity_{name}_total counter")
+            lines.append(f"votechain_integrity_{name}_total {self.metrics[name]}")
+        lines.append("# TYPE votechain_integrity_last_cycle_cpu_seconds gauge")
+        lines.append(f"votechain_integrity_last_cycle_cpu_seconds {self.metrics['last_cycle_cpu_seconds']:.6f}")
+        lines.append("# TYPE votechain_integrity_validated_index gauge")
+        for election_id, progress in self._progress.items():
+            lines.append(f'votechain_integrity_validated_index{{election_id="{election_id}"}} {progress.validated}')
+        return "\n".join(lines) + "\n"
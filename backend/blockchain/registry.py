@@ -0,0 +1,66 @@
+import threading
+
+from .shared import create_blockchain
+
+
+class ChainRegistry:
+    """
+    One Blockchain per election.
+
+    Each election has its own chain, mempool, seal lock and tally
+    index, so ballots running side by side never contend on the
+    same structures. Routes look chains up here at call time.
+
+    Chains are kept per election epoch: a request carrying a newer
+    epoch than the cached chain (the election was reset, possibly by
+    another worker process) gets the new epoch's chain, and the
+    cached one is closed.
+    """
+
+    def __init__(self):
+        self._chains = {}       # election_id -> (epoch, chain)
+        self._lock = threading.Lock()
+
+    def get(self, election_id: int, epoch: int = None):
+        """
+        Returns the election's chain, creating it on first use.
+        epoch=None returns the cached chain whatever its epoch
+        (epoch 0 if there is none yet).
+        """
+        entry = self._chains.get(election_id)
+        if entry is None or (epoch is not None and entry[0] < epoch):
+            replaced = None
+            with self._lock:
+                entry = self._chains.get(election_id)
+                if entry is None or (epoch is not None and entry[0] < epoch):
+                    replaced = entry
+                    epoch = epoch or 0
+                    entry = (epoch, create_blockchain(election_id, epoch=epoch))
+                    self._chains[election_id] = entry
+            if replaced is not None:
+                # reset by another process, which archives the old epoch:
+                # only its journal slot and store handle are released here
+                replaced[1].close()
+        return entry[1]
+
+    def reset(self, election_id: int, epoch: int = 0):
+        """
+        Switches the election to a fresh chain for `epoch`.
+        Returns the chain it replaces (None if there was none), for
+        archival; it is no longer reachable through the registry.
+        """
+        with self._lock:
+            old = self._chains.get(election_id)
+            chain = create_blockchain(election_id, fresh=True, epoch=epoch)
+            self._chains[election_id] = (epoch, chain)
+        return old[1] if old is not None else None
+
+    def election_ids(self):
+        return list(self._chains)
+
+    def clear(self):
+        """
+        Forgets every chain (tests, full resets).
+        """
+        with self._lock:
+            self._chains = {}
@@ -0,0 +1,231 @@
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from .. import config
+from .block import Block
+
+
+# SEGMENT FORMAT
+#
+# Sealed blocks are packed into immutable segment files:
+#
+#   seg-<first index>.vseg       concatenated frames, one per block;
+#                                a frame is zlib(JSON of Block.to_dict())
+#   seg-<first index>.idx.json   {"first_index", "last_index", "sha256",
+#                                 "entries": [[block_index, offset, length], ...]}
+#
+# Frames are compressed one by one, so a single block can be read by
+# seeking to its offset and decompressing only that frame, while a whole
+# segment can be shipped as-is (plain file, HTTP Range friendly).
+
+SEGMENT_SUFFIX = ".vseg"
+INDEX_SUFFIX = ".idx.json"
+
+
+class SegmentArchive:
+    """
+    Directory of immutable, compressed block segments for one chain.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._indexes = {}      # segment name -> loaded index
+        self._firsts = []       # sorted first_index of each segment
+        self._names = []        # segment names, parallel to _firsts
+        self._scan()
+
+    # --------------------------------------------------------
+    # DISCOVERY
+    # --------------------------------------------------------
+
+    def _scan(self):
+        names = sorted(
+            p.name[:-len(INDEX_SUFFIX)]
+            for p in self.root.glob("seg-*" + INDEX_SUFFIX)
+        )
+        self._names = names
+        self._firsts = [int(name.split("-")[1]) for name in names]
+
+    def segments(self) -> list:
+        """
+        Metadata of every segment, oldest first.
+        """
+        self._scan()
+        result = []
+        for name in list(self._names):
+            index = self._load_index(name)
+            result.append({
+                "name": name,
+                "first_index": index["first_index"],
+                "last_index": index["last_index"],
+                "blocks": len(index["entries"]),
+                "bytes": self.segment_path(name).stat().st_size,
+                "sha256": index["sha256"]
+            })
+        return result
+
+    def next_index(self) -> int:
+        """
+        Index of the first block not yet archived.
+        """
+        self._scan()
+        if not self._names:
+            return 0
+        return self._load_index(self._names[-1])["last_index"] + 1
+
+    def segment_path(self, name: str) -> Path:
+        if name not in self._names:
+            raise KeyError(name)
+        return self.root / (name + SEGMENT_SUFFIX)
+
+    def _load_index(self, name: str) -> dict:
+        index = self._indexes.get(name)
+        if index is None:
+            with open(self.root / (name + INDEX_SUFFIX)) as fh:
+                index = json.load(fh)
+            self._indexes[name] = index
+        return index
+
+    # --------------------------------------------------------
+    # WRITING
+    # --------------------------------------------------------
+
+    def write_segment(self, blocks: list) -> str:
+        """
+        Packs consecutive sealed blocks into a new segment.
+        They must start right after the last archived block.
+        Files are written under temporary names and renamed into
+        place, so readers never see a partial segment.
+        """
+        with self._lock:
+            first = blocks[0].index
+            if first != self.next_index():
+                raise ValueError(f"segment must start at block {self.next_index()}, got {first}")
+
+            name = f"seg-{first:010d}"
+            seg_path = self.root / (name + SEGMENT_SUFFIX)
+            idx_path = self.root / (name + INDEX_SUFFIX)
+
+            entries = []
+            digest = hashlib.sha256()
+            offset = 0
+
+            tmp_seg = seg_path.with_suffix(".tmp")
+            with open(tmp_seg, "wb") as fh:
+                for block in blocks:
+                    frame = zlib.compress(
+                        json.dumps(block.to_dict(), separators=(",", ":")).encode()
+                    )
+                    fh.write(frame)
+                    digest.update(frame)
+                    entries.append([block.index, offset, len(frame)])
+                    offset += len(frame)
+                fh.flush()
+                os.fsync(fh.fileno())
+
+            index = {
+                "first_index": first,
+                "last_index": blocks[-1].index,
+                "sha256": digest.hexdigest(),
+                "entries": entries
+            }
+            tmp_idx = idx_path.with_suffix(".tmp")
+            with open(tmp_idx, "w") as fh:
+                json.dump(index, fh)
+                fh.flush()
+                os.fsync(fh.fileno())
+
+            os.replace(tmp_seg, seg_path)
+            os.replace(tmp_idx, idx_path)
+
+            self._indexes[name] = index
+            self._names.append(name)
+            self._firsts.append(first)
+
+        return name
+
+    def archive_chain(self, chain, segment_blocks: int, final: bool = False) -> list:
+        """
+        Archives every full run of `segment_blocks` sealed blocks that
+        is not archived yet. With final=True (chain frozen, e.g. at
+        election end) the remaining partial run is packed as well.
+        Returns the names of the new segments.
+        """
+        blocks = chain.chain[self.next_index():]
+
+        written = []
+        for start in range(0, len(blocks), segment_blocks):
+            run = blocks[start:start + segment_blocks]
+            if len(run) < segment_blocks and not final:
+                break
+            written.append(self.write_segment(run))
+        return written
+
+    # --------------------------------------------------------
+    # READING
+    # --------------------------------------------------------
+
+    def read_block(self, block_index: int) -> Block:
+        """
+        Loads one archived block, decompressing only its own frame.
+        Raises KeyError if the block is not archived.
+        """
+        if not self._names or block_index > self._load_index(self._names[-1])["last_index"]:
+            # another worker may have archived it since we last looked
+            self._scan()
+
+        pos = bisect.bisect_right(self._firsts, block_index) - 1
+        if pos < 0:
+            raise KeyError(block_index)
+
+        name = self._names[pos]
+        index = self._load_index(name)
+        if block_index > index["last_index"]:
+            raise KeyError(block_index)
+
+        _, offset, length = index["entries"][block_index - index["first_index"]]
+        with open(self.root / (name + SEGMENT_SUFFIX), "rb") as fh:
+            fh.seek(offset)
+            frame = fh.read(length)
+
+        return Block.from_dict(json.loads(zlib.decompress(frame)))
+
+
+# ONE ARCHIVE PER ELECTION
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def get_archive(election_id: int) -> SegmentArchive:
+    with _archives_lock:
+        archive = _archives.get(election_id)
+        if archive is None:
+            archive = SegmentArchive(config.ARCHIVE_DIR / f"election-{election_id}")
+            _archives[election_id] = archive
+        return archive
+
+
+def retire_archive(election_id: int, epoch: int = None) -> Path:
+    """
+    Moves an election's segments aside when its chain is reset, so the
+    new chain starts a fresh archive. Old segments are kept, not deleted.
+    Returns the directory they were moved to (the retired epoch's
+    archive, where the rest of its chain can still be packed).
+    """
+    with _archives_lock:
+        _archives.pop(election_id, None)
+        root = config.ARCHIVE_DIR / f"election-{election_id}"
+        tag = f"epoch-{epoch}" if epoch is not None else f"retired-{int(time.time())}"
+        retired = root.with_name(f"{root.name}-{tag}")
+        if root.exists() and any(root.iterdir()):
+            root.rename(retired)
+        return retired
@@ -0,0 +1,165 @@
+import threading
+
+from .. import config
+from .block import Block
+from .chain import Blockchain
+from .journal import open_journal
+from .store import SqliteChainStore
+from .transaction import VoteTransaction
+from .turnout import TurnoutSeries
+
+
+class SharedBlockchain(Blockchain):
+    """
+    Blockchain whose mempool and sealed blocks live in a
+    SqliteChainStore, so every uvicorn worker sees the same ledger.
+
+    Only block headers are kept locally (LazyChain); they are topped
+    up from the store whenever the chain is read, and reloaded if
+    another worker reset the store underneath them.
+
+    The turnout series follows the sealed blocks, the part of the
+    ledger every worker sees: a worker only ever accepts some of the
+    pending ballots, so they are left out of the curve.
+    """
+
+    turnout_sealed_only = True
+
+    def __init__(self, store: SqliteChainStore, election_id=None):
+        self.store = store
+        self._lazy = None
+        self._sync_lock = threading.Lock()
+        super().__init__(election_id, block_store=store)
+
+    # --------------------------------------------------------
+    # CHAIN CACHE
+    # --------------------------------------------------------
+
+    @property
+    def chain(self):
+        return self.sync()
+
+    @chain.setter
+    def chain(self, lazy_chain):
+        self._lazy = lazy_chain
+
+    def sync(self):
+        """
+        Pulls headers of blocks sealed by any worker and adds their
+        votes to the tally index. Returns the LazyChain.
+        """
+        with self._sync_lock:
+            lazy = self._lazy
+            headers = lazy.headers
+            if headers and self.store.block_hash(len(headers) - 1) != headers[-1].hash:
+                lazy.reset()
+                self.tally = {}
+                self.turnout = TurnoutSeries(config.TURNOUT_BUCKET_SECONDS)
+
+            start = len(lazy)
+            if lazy.load_headers():
+                for block in lazy[start:]:
+                    self._index_block(block)
+            return lazy
+
+    def _resume(self) -> bool:
+        return len(self.sync()) > 0
+
+    def _index_block(self, block):
+        super()._index_block(block)
+        for tx in block.transactions:
+            self.turnout.record(tx.timestamp)
+
+    def create_genesis_block(self):
+        """
+        Only the first process to start writes the genesis block;
+        the others adopt it from the store.
+        """
+        genesis = Block(
+            index=0,
+            transactions=[],
+            previous_hash=config.GENESIS_PREVIOUS_HASH
+        )
+        self.store.insert_genesis(genesis)
+        self.sync()
+
+    # --------------------------------------------------------
+    # TRANSACTIONS / SEALING
+    # --------------------------------------------------------
+
+    def add_transaction(self, vote_tx: VoteTransaction):
+        # joins the turnout series once sealed (sync)
+        self.store.add_transaction(vote_tx)
+
+    def add_transactions(self, transactions):
+        self.store.add_transactions(transactions)
+
+    @property
+    def current_transactions(self):
+        return self.store.pending_transactions()
+
+    def mine_block(self):
+        """
+        Seals the shared mempool. Safe to call from any worker:
+        the store elects one sealer at a time.
+        """
+        block = self.store.seal()
+        self.sync()
+        return block
+
+
+# FACTORY
+
+def epoch_suffix(epoch: int) -> str:
+    # epoch 0 keeps the names used before elections had epochs
+    return f"-e{epoch}" if epoch else ""
+
+
+def chain_store_path(election_id, epoch: int = 0):
+    """
+    Each election epoch gets its own store file:
+    chain.db -> chain-<id>.db, then chain-<id>-e<epoch>.db after resets.
+    """
+    path = config.CHAIN_STORE_FILE
+    return path.with_name(f"{path.stem}-{election_id}{epoch_suffix(epoch)}{path.suffix}")
+
+
+def journal_path(election_id, epoch: int = 0):
+    return config.JOURNAL_DIR / f"mempool-{election_id}{epoch_suffix(epoch)}.log"
+
+
+def create_blockchain(election_id=None, fresh: bool = False, epoch: int = 0):
+    """
+    Builds the chain backend selected by VOTECHAIN_CHAIN_BACKEND:
+      - "memory": per-process in-memory chain (default)
+      - "disk":   per-process chain, block bodies kept in CHAIN_STORE_FILE
+                  and only headers + an LRU of bodies in memory
+      - "sqlite": chain shared by all workers through CHAIN_STORE_FILE
+                  (also headers + LRU only)
+
+    "memory" and "disk" keep their mempool in RAM, so unsealed votes are
+    journaled (MEMPOOL_JOURNAL), each worker process in its own journal
+    slot; "sqlite" already keeps it in the store.
+
+    Every epoch of an election has its own store and journal files, so
+    a reset starts from new files and leaves the old ones to archival.
+    fresh=True wipes the persisted store and journal first.
+    """
+    store_id = election_id or config.DEFAULT_ELECTION_ID
+
+    journal = None
+    if config.MEMPOOL_JOURNAL and config.CHAIN_BACKEND != "sqlite":
+        journal = open_journal(journal_path(store_id, epoch))
+        if fresh:
+            journal.clear()
+
+    if config.CHAIN_BACKEND not in ("sqlite", "disk"):
+        return Blockchain(election_id, journal=journal)
+
+    store = SqliteChainStore(chain_store_path(store_id, epoch))
+    if fresh:
+        store.clear()
+
+    if config.CHAIN_BACKEND == "sqlite":
+        return SharedBlockchain(store, election_id)
+    return Blockchain(election_id, block_store=store, journal=journal)
@@ -0,0 +1,317 @@
+import fcntl
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from .block import Block
+from .transaction import VoteTransaction
+
+
+class SqliteChainStore:
+    """
+    Chain state persisted in a single SQLite file, so several
+    worker processes can share one mempool and one ledger.
+
+    Tables:
+      - blocks:  sealed blocks, one row per block
+      - mempool: pending VoteTransaction rows, in arrival order
+
+    Sealing is guarded by an exclusive file lock next to the
+    database, so only one process at a time acts as sealing leader.
+
+    read_only=True opens an existing store for offline readers
+    (verification): no tables are created, no pragma is changed and
+    writes fail.
+    """
+
+    def __init__(self, path, read_only: bool = False):
+        self.path = str(path)
+        self.lock_path = self.path + ".lock"
+        self.read_only = read_only
+        self._local = threading.local()
+        if not read_only:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._create_tables()
+
+    # --------------------------------------------------------
+    # CONNECTIONS
+    # --------------------------------------------------------
+
+    def _connect(self):
+        """
+        One connection per thread; autocommit mode so transactions
+        are opened explicitly with BEGIN IMMEDIATE.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.read_only:
+                uri = Path(self.path).resolve().as_uri() + "?mode=ro"
+                conn = sqlite3.connect(uri, uri=True, timeout=30, isolation_level=None)
+            else:
+                conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """
+        Closes this thread's connection; connections of other threads
+        close when the store is dropped.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _create_tables(self):
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blocks (
+                block_index   INTEGER PRIMARY KEY,
+                timestamp     REAL NOT NULL,
+                previous_hash TEXT NOT NULL,
+                hash          TEXT NOT NULL,
+                transactions  TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS mempool (
+                seq          INTEGER PRIMARY KEY AUTOINCREMENT,
+                voter_hash   TEXT NOT NULL,
+                candidate_id INTEGER NOT NULL,
+                timestamp    REAL NOT NULL
+            )
+            """
+        )
+
+    @contextmanager
+    def sealing_lock(self):
+        """
+        Cross-process exclusive lock held by the sealing leader.
+        """
+        with open(self.lock_path, "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    # --------------------------------------------------------
+    # BLOCKS
+    # --------------------------------------------------------
+
+    def insert_genesis(self, block: Block):
+        """
+        Stores the genesis block unless another process already did.
+        """
+        self._connect().execute(
+            "INSERT OR IGNORE INTO blocks VALUES (?, ?, ?, ?, ?)",
+            self._block_row(block)
+        )
+
+    def append_blocks(self, blocks):
+        """
+        Bulk-writes already sealed blocks (imports, generated data)
+        in one transaction. Blocks are stored as given, not re-verified.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO blocks VALUES (?, ?, ?, ?, ?)",
+                [self._block_row(block) for block in blocks]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def load_blocks(self, start: int = 0, end: int = None) -> list:
+        """
+        Returns sealed blocks with start <= index < end, in chain order.
+        """
+        rows = self._connect().execute(
+            "SELECT block_index, timestamp, previous_hash, hash, transactions "
+            "FROM blocks WHERE block_index >= ? AND block_index < ? ORDER BY block_index",
+            (start, end if end is not None else 2 ** 62)
+        ).fetchall()
+        return [self._row_to_block(row) for row in rows]
+
+    def load_headers(self, start: int = 0) -> list:
+        """
+        Block headers with index >= start, without transaction bodies:
+        (index, timestamp, previous_hash, hash, transaction count) rows.
+        """
+        return self._connect().execute(
+            "SELECT block_index, timestamp, previous_hash, hash, "
+            "json_array_length(transactions) "
+            "FROM blocks WHERE block_index >= ? ORDER BY block_index",
+            (start,)
+        ).fetchall()
+
+    def load_transaction_range(self, start: int, end: int) -> list:
+        """
+        Raw transaction lists (decoded JSON dicts) of the blocks with
+        start <= index < end. Cheaper than load_blocks() when only the
+        votes are needed, e.g. for tallying.
+        """
+        rows = self._connect().execute(
+            "SELECT transactions FROM blocks "
+            "WHERE block_index >= ? AND block_index < ? ORDER BY block_index",
+            (start, end)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def block_hash(self, index: int):
+        row = self._connect().execute(
+            "SELECT hash FROM blocks WHERE block_index = ?", (index,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def block_count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+
+    def last_index(self) -> int:
+        """
+        Highest stored block index, or -1 if the store is empty.
+        """
+        return self._connect().execute(
+            "SELECT COALESCE(MAX(block_index), -1) FROM blocks"
+        ).fetchone()[0]
+
+    # --------------------------------------------------------
+    # MEMPOOL
+    # --------------------------------------------------------
+
+    def add_transaction(self, tx: VoteTransaction):
+        self._connect().execute(
+            "INSERT INTO mempool (voter_hash, candidate_id, timestamp) VALUES (?, ?, ?)",
+            (tx.voter_hash, tx.candidate_id, tx.timestamp)
+        )
+
+    def add_transactions(self, transactions):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO mempool (voter_hash, candidate_id, timestamp) VALUES (?, ?, ?)",
+                [(tx.voter_hash, tx.candidate_id, tx.timestamp) for tx in transactions]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def pending_transactions(self) -> list:
+        rows = self._connect().execute(
+            "SELECT voter_hash, candidate_id, timestamp FROM mempool ORDER BY seq"
+        ).fetchall()
+        return [self._row_to_tx(row) for row in rows]
+
+    def pending_count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM mempool").fetchone()[0]
+
+    # --------------------------------------------------------
+    # SEALING
+    # --------------------------------------------------------
+
+    def seal(self):
+        """
+        Moves every pending transaction into a new block on top of the
+        stored tip, in one write transaction under the sealing lock.
+        Returns the new Block, or None if the mempool was empty.
+        """
+        with self.sealing_lock():
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT seq, voter_hash, candidate_id, timestamp "
+                    "FROM mempool ORDER BY seq"
+                ).fetchall()
+                if not rows:
+                    conn.execute("ROLLBACK")
+                    return None
+
+                tip = conn.execute(
+                    "SELECT block_index, hash FROM blocks "
+                    "ORDER BY block_index DESC LIMIT 1"
+                ).fetchone()
+
+                block = Block(
+                    index=tip[0] + 1,
+                    transactions=[self._row_to_tx(row[1:]) for row in rows],
+                    previous_hash=tip[1]
+                )
+
+                conn.execute(
+                    "INSERT INTO blocks VALUES (?, ?, ?, ?, ?)",
+                    self._block_row(block)
+                )
+                conn.execute("DELETE FROM mempool WHERE seq <= ?", (rows[-1][0],))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        return block
+
+    def clear(self):
+        """
+        Drops every block and pending transaction (election reset).
+        """
+        with self.sealing_lock():
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM mempool")
+            conn.execute("DELETE FROM blocks")
+            conn.execute("COMMIT")
+
+    def compact(self):
+        """
+        Folds the WAL into the database file and rewrites it without
+        free pages (offline maintenance).
+        """
+        with self.sealing_lock():
+            conn = self._connect()
+            conn.execute("VACUUM")
+            # VACUUM in WAL mode writes the new pages to the WAL
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    # --------------------------------------------------------
+    # ROW HELPERS
+    # --------------------------------------------------------
+
+    @staticmethod
+    def _block_row(block: Block):
+        return (
+            block.index,
+            block.timestamp,
+            block.previous_hash,
+            block.hash,
+            json.dumps([tx.to_dict() for tx in block.transactions])
+        )
+
+    @staticmethod
+    def _row_to_block(row) -> Block:
+        return Block.from_dict({
+            "index": row[0],
+            "timestamp": row[1],
+            "previous_hash": row[2],
+            "hash": row[3],
+            "transactions": json.loads(row[4])
+        })
+
+    @staticmethod
+    def _row_to_tx(row) -> VoteTransaction:
+        return VoteTransaction.from_dict({
+            "voter_hash": row[0],
+            "candidate_id": row[1],
+            "timestamp": row[2]
+        })
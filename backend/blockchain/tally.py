@@ -0,0 +1,187 @@
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .. import config
+from .store import SqliteChainStore
+
+
+# MAP: COUNT ONE PARTITION
+
+def count_votes(candidate_ids, timestamps, start_time=None, end_time=None) -> dict:
+    """
+    Counts votes per candidate in one partition.
+    candidate_ids / timestamps are parallel columns; votes outside
+    [start_time, end_time) are skipped.
+    """
+    if start_time is None and end_time is None:
+        return dict(Counter(candidate_ids))
+
+    lo = start_time if start_time is not None else float("-inf")
+    hi = end_time if end_time is not None else float("inf")
+
+    return dict(Counter(
+        candidate_id
+        for candidate_id, ts in zip(candidate_ids, timestamps)
+        if lo <= ts < hi
+    ))
+
+
+def count_blocks(blocks, start_time=None, end_time=None) -> dict:
+    """
+    Counts votes per candidate straight from in-memory blocks (same
+    time window rule as count_votes), without copying them to columns.
+    """
+    if start_time is None and end_time is None:
+        return dict(Counter(
+            tx.candidate_id for block in blocks for tx in block.transactions
+        ))
+
+    lo = start_time if start_time is not None else float("-inf")
+    hi = end_time if end_time is not None else float("inf")
+
+    return dict(Counter(
+        tx.candidate_id
+        for block in blocks
+        for tx in block.transactions
+        if lo <= tx.timestamp < hi
+    ))
+
+
+def _count_store_range(args):
+    """
+    Worker side of tally_store(): reads its own block range from the
+    chain store file, so block data is never pickled between processes.
+    """
+    path, start, end, start_time, end_time = args
+    store = SqliteChainStore(path, read_only=True)
+
+    candidate_ids, timestamps = [], []
+    for transactions in store.load_transaction_range(start, end):
+        for tx in transactions:
+            candidate_ids.append(tx["candidate_id"])
+            timestamps.append(tx["timestamp"])
+
+    return count_votes(candidate_ids, timestamps, start_time, end_time)
+
+
+# REDUCE: MERGE PARTITION COUNTS
+
+def merge_counts(partials) -> dict:
+    total = Counter()
+    for partial in partials:
+        total.update(partial)
+    return dict(total)
+
+
+def partition_range(start: int, end: int, parts: int) -> list:
+    """
+    Splits [start, end) into at most `parts` contiguous (lo, hi) ranges.
+    """
+    size = end - start
+    if size <= 0:
+        return []
+
+    parts = max(1, min(parts, size))
+    step, extra = divmod(size, parts)
+
+    ranges = []
+    lo = start
+    for i in range(parts):
+        hi = lo + step + (1 if i < extra else 0)
+        ranges.append((lo, hi))
+        lo = hi
+    return ranges
+
+
+# WORKER POOL (kept between recounts)
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The tally process pool, started on first use and reused by later
+    tallies; replaced only when a different worker count is asked for.
+    Workers are spawned, not forked: the server process has threads
+    (writer, monitor, archiver) whose locks a fork would copy mid-use.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    """
+    Stops the tally worker processes (server shutdown).
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool, _pool_workers = None, 0
+
+
+def _run(fn, jobs, workers):
+    if workers <= 1 or len(jobs) <= 1:
+        return [fn(job) for job in jobs]
+    return list(_get_pool(workers).map(fn, jobs))
+
+
+# TALLY ENTRY POINTS
+
+def tally_chain(
+    chain,
+    start_block=None,
+    end_block=None,
+    start_time=None,
+    end_time=None,
+    workers=None
+) -> dict:
+    """
+    Tally over an in-memory Blockchain: blocks in [start_block, end_block)
+    are counted in this process, in one pass.
+
+    Worker processes cannot read this process's blocks, and handing them
+    the votes would cost a pass to copy and pickle them, more than the
+    count itself. `workers` is accepted for symmetry with tally_store(),
+    which parallelizes by letting each worker read its own block range.
+    """
+    return count_blocks(chain.chain[start_block:end_block], start_time, end_time)
+
+
+def tally_store(
+    path,
+    start_block=None,
+    end_block=None,
+    start_time=None,
+    end_time=None,
+    workers=None
+) -> dict:
+    """
+    Map-reduce tally over a SqliteChainStore file (offline recount).
+    Each worker loads and decodes its own block range.
+    """
+    workers = workers or config.TALLY_WORKERS
+
+    count = SqliteChainStore(path, read_only=True).block_count()
+    start = start_block if start_block is not None else 0
+    end = min(end_block, count) if end_block is not None else count
+
+    # a few partitions per worker keeps the pool busy when blocks differ in size
+    jobs = [
+        (str(path), lo, hi, start_time, end_time)
+        for lo, hi in partition_range(start, end, workers * 4)
+    ]
+
+    return merge_counts(_run(_count_store_range, jobs, workers))
@@ -21,3 +21,13 @@ class VoteTransaction:
             "candidate_id": self.candidate_id,
             "timestamp": self.timestamp
         }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a transaction from to_dict() output,
+        keeping its original timestamp.
+        """
+        tx = cls(data["voter_hash"], data["candidate_id"])
+        tx.timestamp = data["timestamp"]
+        return tx
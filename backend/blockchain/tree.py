@@ -0,0 +1,82 @@
+class BlockTree:
+    """
+    Every known block, keyed by hash, forks included.
+
+    Each block links to its parent through previous_hash, so any two
+    tips meet at their common ancestor after walking back at most the
+    depth of the fork. The best tip is the highest block (longest chain);
+    on equal height the tip seen first is kept.
+    """
+
+    def __init__(self):
+        self.blocks = {}        # hash -> Block
+        self.best_tip = None    # hash of the best block
+
+    def __contains__(self, block_hash) -> bool:
+        return block_hash in self.blocks
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def get(self, block_hash):
+        return self.blocks.get(block_hash)
+
+    def parent(self, block):
+        return self.blocks.get(block.previous_hash)
+
+    # --------------------------------------------------------
+    # INSERTION
+    # --------------------------------------------------------
+
+    def add(self, block) -> bool:
+        """
+        Stores a block whose parent is known (or a genesis block).
+        Returns False if it is invalid, orphaned or already known.
+        """
+        if block.hash in self.blocks or block.hash != block.compute_hash():
+            return False
+
+        parent = self.parent(block)
+        if parent is None:
+            if block.index != 0:
+                return False
+        elif block.index != parent.index + 1:
+            return False
+
+        self.blocks[block.hash] = block
+
+        best = self.blocks.get(self.best_tip)
+        if best is None or block.index > best.index:
+            self.best_tip = block.hash
+        return True
+
+    # --------------------------------------------------------
+    # FORK NAVIGATION
+    # --------------------------------------------------------
+
+    def common_ancestor(self, a, b):
+        """
+        Deepest block shared by the branches ending at blocks a and b,
+        or None if they do not share a genesis block.
+        """
+        while a is not None and b is not None and a.hash != b.hash:
+            if a.index >= b.index:
+                a = self.parent(a)
+            else:
+                b = self.parent(b)
+        if a is None or b is None:
+            return None
+        return a
+
+    def branch(self, tip, ancestor) -> list:
+        """
+        Blocks after `ancestor` (None = from genesis) up to `tip`,
+        oldest first.
+        """
+        stop = ancestor.hash if ancestor is not None else None
+        blocks = []
+        while tip is not None and tip.hash != stop:
+            blocks.append(tip)
+            tip = self.parent(tip)
+        blocks.reverse()
+        return blocks
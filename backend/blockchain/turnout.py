@@ -0,0 +1,82 @@
+import threading
+
+
+class TurnoutSeries:
+    """
+    Votes per fixed-width time bucket, updated as each ballot is cast.
+
+    Buckets are aligned to multiples of `bucket_seconds` (UNIX time),
+    and only buckets that saw a vote are stored, so a stray timestamp
+    (clock skew, a peer block) costs one entry, not a run of empty
+    buckets up to it. Recording is O(1); reading a curve is
+    O(stored buckets + points) and never touches transactions.
+    """
+
+    # longest curve returned; a span needing more points must be read
+    # at a coarser resolution
+    MAX_POINTS = 100_000
+
+    def __init__(self, bucket_seconds: int):
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+        self.bucket_seconds = bucket_seconds
+        self._counts = {}       # bucket number -> votes
+        self._lock = threading.Lock()
+
+    def record(self, timestamp: float, votes: int = 1):
+        bucket = int(timestamp // self.bucket_seconds)
+        with self._lock:
+            self._counts[bucket] = self._counts.get(bucket, 0) + votes
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+    def curve(self, resolution: int = None) -> dict:
+        """
+        Votes per bucket and cumulative turnout, from the first to the
+        last bucket that saw a vote.
+        `resolution` (seconds) must be a multiple of bucket_seconds;
+        coarser buckets are summed from the stored ones.
+        """
+        if resolution is None:
+            resolution = self.bucket_seconds
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        if resolution % self.bucket_seconds:
+            raise ValueError(
+                f"resolution must be a multiple of {self.bucket_seconds} seconds"
+            )
+        factor = resolution // self.bucket_seconds
+
+        with self._lock:
+            counts = list(self._counts.items())
+
+        if not counts:
+            return {"resolution": resolution, "start": None, "counts": [], "cumulative": []}
+
+        # coarse buckets are aligned to multiples of `resolution`
+        coarse = {}
+        for bucket, votes in counts:
+            coarse[bucket // factor] = coarse.get(bucket // factor, 0) + votes
+        first, last = min(coarse), max(coarse)
+        if last - first >= self.MAX_POINTS:
+            raise ValueError(
+                f"votes span {last - first + 1} buckets of {resolution} seconds "
+                f"(at most {self.MAX_POINTS}); use a coarser resolution"
+            )
+
+        merged = [coarse.get(bucket, 0) for bucket in range(first, last + 1)]
+
+        cumulative = []
+        running = 0
+        for count in merged:
+            running += count
+            cumulative.append(running)
+
+        return {
+            "resolution": resolution,
+            "start": first * resolution,
+            "counts": merged,
+            "cumulative": cumulative
+        }
@@ -7,7 +7,14 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 DATA_DIR = BASE_DIR / "data"
-DATA_DIR.mkdir(exist_ok=True)
+
+
+def ensure_data_dir():
+    """
+    Creates DATA_DIR (server startup, scripts); nothing touches the
+    filesystem at import time.
+    """
+    DATA_DIR.mkdir(exist_ok=True)
 
 
 # DATABASE CONFIG
@@ -18,6 +25,11 @@ DATABASE_URL = os.getenv(
     f"sqlite:///{DATA_DIR / 'votechain.db'}"
 )
 
+# database access: read-only connection pool size, and how long
+# a connection waits on a SQLite lock before failing
+DB_READ_POOL_SIZE = int(os.getenv("VOTECHAIN_DB_READ_POOL", 8))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("VOTECHAIN_DB_BUSY_TIMEOUT_MS", 5000))
+
 
 # JWT / SECURITY CONFIG
 
@@ -34,9 +46,112 @@ ADMIN_PASSWORD = os.getenv("VOTECHAIN_ADMIN_PASSWORD", "admin123")
 # BLOCKCHAIN CONFIG
 
 CHAIN_FILE = DATA_DIR / "chain.json"
+
+# "memory" keeps the chain per process; "disk" keeps block bodies on
+# disk with only headers resident; "sqlite" shares one chain store
+# between all uvicorn workers (headers resident as well)
+CHAIN_BACKEND = os.getenv("VOTECHAIN_CHAIN_BACKEND", "memory")
+CHAIN_STORE_FILE = Path(os.getenv("VOTECHAIN_CHAIN_STORE", DATA_DIR / "chain.db"))
+
+# LRU of block bodies for disk-backed chains, bounded in transactions
+BLOCK_CACHE_TRANSACTIONS = int(os.getenv("VOTECHAIN_BLOCK_CACHE_TXS", 200_000))
 AUTO_MINE_ON_END = True
 GENESIS_PREVIOUS_HASH = "0"
 
+# write-ahead journal of unsealed votes (memory/disk backends)
+MEMPOOL_JOURNAL = os.getenv("VOTECHAIN_MEMPOOL_JOURNAL", "1") != "0"
+JOURNAL_DIR = Path(os.getenv("VOTECHAIN_JOURNAL_DIR", DATA_DIR / "journal"))
+
+# compressed segment archive of sealed blocks
+ARCHIVE_DIR = Path(os.getenv("VOTECHAIN_ARCHIVE_DIR", DATA_DIR / "segments"))
+SEGMENT_BLOCKS = 64
+
+# memory-mapped columns of sealed votes (admin analytics)
+COLUMNS_DIR = Path(os.getenv("VOTECHAIN_COLUMNS_DIR", DATA_DIR / "columns"))
+
+# turnout time-series: width of the stored buckets (seconds);
+# coarser curves are served by summing buckets
+TURNOUT_BUCKET_SECONDS = int(os.getenv("VOTECHAIN_TURNOUT_BUCKET_SECONDS", 60))
+
+# in-memory voter index: how often a login miss may re-read new
+# registrations (made by other workers) from the database
+VOTER_INDEX_REFRESH_SECONDS = float(os.getenv("VOTECHAIN_VOTER_INDEX_REFRESH", 2.0))
+
+# background integrity monitor: cycle interval, random sample of old
+# blocks re-verified per cycle, and CPU time allowed per cycle
+INTEGRITY_MONITOR_ENABLED = os.getenv("VOTECHAIN_INTEGRITY_MONITOR", "1") != "0"
+INTEGRITY_INTERVAL_SECONDS = float(os.getenv("VOTECHAIN_INTEGRITY_INTERVAL", 30))
+INTEGRITY_SAMPLE_SIZE = int(os.getenv("VOTECHAIN_INTEGRITY_SAMPLE", 32))
+INTEGRITY_CPU_BUDGET_SECONDS = float(os.getenv("VOTECHAIN_INTEGRITY_CPU_BUDGET", 0.05))
+
+# live vote counters shared by all workers: the block the launcher
+# (backend.scripts.serve) created, and the number of election slots
+SHARED_COUNTERS_FILE = os.getenv("VOTECHAIN_SHARED_COUNTERS")
+SHARED_COUNTER_SLOTS = int(os.getenv("VOTECHAIN_COUNTER_SLOTS", 256))
+
+# tally engine: worker processes recounting a chain store (started
+# on the first recount, reused by the next ones)
+TALLY_WORKERS = int(os.getenv("VOTECHAIN_TALLY_WORKERS", os.cpu_count() or 1))
+
+
+# ADMISSION CONTROL (login + vote paths)
+
+RATE_LIMIT_ENABLED = os.getenv("VOTECHAIN_RATE_LIMIT", "1") != "0"
+
+# per client IP: burst size and sustained requests/second
+RATE_LIMIT_IP_BURST = int(os.getenv("VOTECHAIN_RATE_LIMIT_IP_BURST", 30))
+RATE_LIMIT_IP_PER_SECOND = float(os.getenv("VOTECHAIN_RATE_LIMIT_IP_PER_SECOND", 10))
+
+# per voter id
+RATE_LIMIT_VOTER_BURST = int(os.getenv("VOTECHAIN_RATE_LIMIT_VOTER_BURST", 5))
+RATE_LIMIT_VOTER_PER_SECOND = float(os.getenv("VOTECHAIN_RATE_LIMIT_VOTER_PER_SECOND", 0.5))
+
+# upper bound on buckets kept in memory (least recently used evicted)
+RATE_LIMIT_MAX_BUCKETS = 100_000
+
+# write requests allowed in flight at once, per process
+WRITE_CONCURRENCY_LIMIT = int(os.getenv("VOTECHAIN_WRITE_CONCURRENCY", 64))
+
+
+# IDEMPOTENT VOTE RETRIES (Idempotency-Key header)
+
+# how long a vote's final response is replayed to retries
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("VOTECHAIN_IDEMPOTENCY_TTL", 600))
+
+# upper bound on keys kept in memory (least recently used evicted)
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("VOTECHAIN_IDEMPOTENCY_MAX_KEYS", 100_000))
+
+
+# POLLING STATIONS (batch ballot uploads)
+
+# station id -> gateway credential, as "north-1:secret1,south-2:secret2"
+# (gateways log in with it; it cannot sign ballots)
+STATION_KEYS = dict(
+    entry.split(":", 1)
+    for entry in os.getenv("VOTECHAIN_STATIONS", "").split(",")
+    if ":" in entry
+)
+
+# kiosk id -> (station id, ballot signing key), as
+# "k1@north-1:key1,k2@north-1:key2"; gateways never hold these keys
+KIOSK_KEYS = {
+    kiosk: (station, key)
+    for kiosk, _, rest in (
+        entry.partition("@") for entry in os.getenv("VOTECHAIN_KIOSKS", "").split(",")
+    )
+    if ":" in rest
+    for station, key in [rest.split(":", 1)]
+}
+
+# most ballots accepted in one upload
+STATION_BATCH_MAX = int(os.getenv("VOTECHAIN_STATION_BATCH_MAX", 10_000))
+
+
+# ELECTIONS
+
+# election used when a request does not name one
+DEFAULT_ELECTION_ID = 1
+
 
 # ENVIRONMENT MODE
 
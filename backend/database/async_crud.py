@@ -0,0 +1,98 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import (
+    Voter,
+    Candidate,
+    ElectionState,
+    VoteRecord,
+    DEFAULT_ELECTION_ID
+)
+from .crud import current_epoch
+
+
+# Async equivalents of the crud.py read functions used on hot paths
+# (login, voting, election status, results). Async sessions are
+# read-only: writes go through the database writer (writer.py).
+
+# values per IN (...) list (stays under SQLite's bound-parameter limit)
+IN_BATCH = 900
+
+
+# VOTERS
+
+async def get_voter_by_id(db: AsyncSession, voter_id: str):
+    result = await db.execute(select(Voter).where(Voter.voter_id == voter_id))
+    return result.scalars().first()
+
+
+async def get_voters_after(db: AsyncSession, last_id: int):
+    """
+    (row id, voter_hash) of voters registered after row `last_id`.
+    """
+    result = await db.execute(
+        select(Voter.id, Voter.voter_hash).where(Voter.id > last_id).order_by(Voter.id)
+    )
+    return result.all()
+
+
+async def get_voter_rows(db: AsyncSession, voter_ids) -> dict:
+    """
+    voter_id -> row id of the given voters that are registered,
+    in a few IN (...) queries.
+    """
+    voter_ids = list(voter_ids)
+    rows = {}
+    for start in range(0, len(voter_ids), IN_BATCH):
+        result = await db.execute(
+            select(Voter.voter_id, Voter.id)
+            .where(Voter.voter_id.in_(voter_ids[start:start + IN_BATCH]))
+        )
+        rows.update(result.all())
+    return rows
+
+
+async def count_voters(db: AsyncSession) -> int:
+    return (await db.execute(select(func.count(Voter.id)))).scalar()
+
+
+# CANDIDATES
+
+async def get_candidate(db: AsyncSession, candidate_id: int, election_id: int = DEFAULT_ELECTION_ID):
+    result = await db.execute(
+        select(Candidate).where(
+            Candidate.id == candidate_id,
+            Candidate.election_id == election_id
+        )
+    )
+    return result.scalars().first()
+
+
+async def get_all_candidates(db: AsyncSession, election_id: int = DEFAULT_ELECTION_ID):
+    result = await db.execute(select(Candidate).where(Candidate.election_id == election_id))
+    return result.scalars().all()
+
+
+# ELECTION STATE
+
+async def get_election_state(db: AsyncSession, election_id: int = DEFAULT_ELECTION_ID):
+    """
+    Returns the state row of one election, or None.
+    (The default election is created on first use by crud.get_election_state.)
+    """
+    return await db.get(ElectionState, election_id)
+
+
+# SEALED BLOCKS
+
+async def count_votes_by_candidate(db: AsyncSession, election_id: int = DEFAULT_ELECTION_ID) -> dict:
+    result = await db.execute(
+        select(VoteRecord.candidate_id, func.count(VoteRecord.id))
+        .where(
+            VoteRecord.election_id == election_id,
+            # no state row yet: the default election, still at epoch 0
+            VoteRecord.epoch == func.coalesce(current_epoch(election_id), 0)
+        )
+        .group_by(VoteRecord.candidate_id)
+    )
+    return {candidate_id: votes for candidate_id, votes in result.all()}
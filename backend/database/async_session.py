@@ -0,0 +1,39 @@
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from .session import DATABASE_URL, configure_sqlite
+
+
+# ASYNC ENGINE (same database as session.py, through aiosqlite)
+#
+# Read-only, like session.read_engine: async routes write through
+# the database writer (writer.py).
+
+def to_async_url(url: str) -> str:
+    """
+    sqlite:///votechain.db -> sqlite+aiosqlite:///votechain.db
+    """
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+async_engine = create_async_engine(to_async_url(DATABASE_URL))
+configure_sqlite(async_engine.sync_engine, read_only=True)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+# ASYNC SESSION DEPENDENCY FOR FASTAPI
+
+async def get_async_db():
+    """
+    Provides an async database session to `async def` endpoints.
+    Waiting on SQLite no longer holds a threadpool thread.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
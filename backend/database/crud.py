@@ -1,5 +1,18 @@
+import json
+
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from .models import Voter, Candidate, ElectionState, ElectionStatus
+from .models import (
+    Voter,
+    Candidate,
+    ElectionState,
+    ElectionStatus,
+    VoterParticipation,
+    BlockRecord,
+    VoteRecord,
+    DEFAULT_ELECTION_ID
+)
 from sqlalchemy.exc import IntegrityError
 
 
@@ -32,23 +45,168 @@ def get_all_voters(db: Session):
     return db.query(Voter).all()
 
 
-def mark_voter_as_voted(db: Session, voter_id: str):
-    voter = get_voter_by_id(db, voter_id)
-    if not voter:
-        return False
+def get_voter_index_rows(db: Session):
+    """
+    (row id, voter_hash) of every voter, for the in-memory voter index.
+    """
+    return db.query(Voter.id, Voter.voter_hash).all()
+
+
+def count_voters(db: Session) -> int:
+    return db.query(func.count(Voter.id)).scalar()
+
+
+def current_epoch(election_id: int):
+    """
+    The election's epoch, as a scalar subquery: read in the same
+    statement as the participation rows it filters.
+    """
+    return (
+        select(ElectionState.epoch)
+        .where(ElectionState.id == election_id)
+        .scalar_subquery()
+    )
+
 
-    voter.has_voted = True
+def has_voted(db: Session, voter_id: str, election_id: int = DEFAULT_ELECTION_ID) -> bool:
+    return db.query(VoterParticipation.id).filter(
+        VoterParticipation.election_id == election_id,
+        VoterParticipation.voter_id == voter_id,
+        VoterParticipation.epoch == current_epoch(election_id)
+    ).first() is not None
+
+
+def election_epoch(db: Session, election_id: int):
+    return db.execute(
+        select(ElectionState.epoch).where(ElectionState.id == election_id)
+    ).scalar()
+
+
+def claim_ballots(election_id: int, epoch: int, voter_ids):
+    """
+    One upsert claiming the ballots of `voter_ids` in `epoch`: a new row
+    per voter, or a row left by an earlier epoch moved forward. The rows
+    are selected from election_state at that epoch, so once a reset has
+    moved the election on, nothing is inserted or updated. Returns the
+    claimed voter ids (RETURNING).
+    """
+    ballots = func.json_each(json.dumps(list(voter_ids))).table_valued("value")
+    rows = (
+        select(literal(election_id), ballots.c.value, ElectionState.epoch)
+        .join_from(ballots, ElectionState, ElectionState.id == election_id)
+        .where(ElectionState.epoch == epoch)
+    )
+    return (
+        sqlite_insert(VoterParticipation)
+        .from_select(["election_id", "voter_id", "epoch"], rows)
+        .on_conflict_do_update(
+            index_elements=["election_id", "voter_id"],
+            set_={"epoch": epoch},
+            where=VoterParticipation.epoch < epoch
+        )
+        .returning(VoterParticipation.voter_id)
+    )
+
+
+def mark_voter_as_voted(db: Session, voter_id: str, election_id: int = DEFAULT_ELECTION_ID, epoch: int = 0):
+    """
+    Claims the voter's ballot in epoch `epoch` of the election (the one
+    the request was admitted in). Returns False if the voter already
+    voted in it, None if the election was reset since.
+
+    The unique (election_id, voter_id) constraint and the epoch
+    conditions make the claim atomic.
+    """
+    claimed = bool(db.execute(claim_ballots(election_id, epoch, [voter_id])).scalars().all())
     db.commit()
-    return True
+    if not claimed and election_epoch(db, election_id) != epoch:
+        return None
+    return claimed
 
-def get_all_voters(db: Session):
-    return db.query(Voter).all()
+
+def mark_voters_as_voted(db: Session, voter_ids: list, election_id: int = DEFAULT_ELECTION_ID,
+                         epoch: int = 0):
+    """
+    Batch form of mark_voter_as_voted, in one statement: claims the
+    ballot of every voter in `voter_ids` that has not voted in epoch
+    `epoch`. Returns the voter ids claimed, or None if the election was
+    reset since.
+    """
+    claimed = set(db.execute(claim_ballots(election_id, epoch, voter_ids)).scalars())
+    db.commit()
+    if not claimed and election_epoch(db, election_id) != epoch:
+        return None
+    return claimed
+
+
+def unmark_voters(db: Session, voter_ids: list, election_id: int, epoch: int):
+    """
+    Gives back ballots claimed in `epoch` whose votes could not be
+    recorded in the chain (e.g. the journal write failed), so the
+    voters can vote again.
+    """
+    ballots = func.json_each(json.dumps(list(voter_ids))).table_valued("value")
+    db.query(VoterParticipation).filter(
+        VoterParticipation.election_id == election_id,
+        VoterParticipation.epoch == epoch,
+        VoterParticipation.voter_id.in_(select(ballots.c.value))
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def get_participation_rows(db: Session):
+    """
+    (election_id, epoch, voter row id) of every ballot cast in the
+    current epoch of its election.
+    """
+    return db.query(
+        VoterParticipation.election_id, VoterParticipation.epoch, Voter.id
+    ).join(
+        Voter, Voter.voter_id == VoterParticipation.voter_id
+    ).join(
+        ElectionState, ElectionState.id == VoterParticipation.election_id
+    ).filter(
+        VoterParticipation.epoch == ElectionState.epoch
+    ).all()
+
+
+def count_voted(db: Session, election_id: int = DEFAULT_ELECTION_ID) -> int:
+    return db.query(func.count(VoterParticipation.id)).filter(
+        VoterParticipation.election_id == election_id,
+        VoterParticipation.epoch == current_epoch(election_id)
+    ).scalar()
+
+
+def get_live_counter_seeds(db: Session) -> list:
+    """
+    (election_id, epoch, ballots cast in the current epoch, votes sealed
+    into the ledger) of every election: the starting point of the live
+    counters.
+    """
+    cast = dict(
+        db.query(VoterParticipation.election_id, func.count(VoterParticipation.id))
+        .join(ElectionState, ElectionState.id == VoterParticipation.election_id)
+        .filter(VoterParticipation.epoch == ElectionState.epoch)
+        .group_by(VoterParticipation.election_id)
+        .all()
+    )
+    sealed = dict(
+        db.query(VoteRecord.election_id, func.count(VoteRecord.id))
+        .join(ElectionState, ElectionState.id == VoteRecord.election_id)
+        .filter(VoteRecord.epoch == ElectionState.epoch)
+        .group_by(VoteRecord.election_id)
+        .all()
+    )
+    return [
+        (e.id, e.epoch, cast.get(e.id, 0), sealed.get(e.id, 0))
+        for e in get_all_elections(db)
+    ]
 
 
 # CANDIDATES
 
-def add_candidate(db: Session, name: str):
-    candidate = Candidate(name=name)
+def add_candidate(db: Session, name: str, election_id: int = DEFAULT_ELECTION_ID):
+    candidate = Candidate(name=name, election_id=election_id)
     db.add(candidate)
     db.commit()
     db.refresh(candidate)
@@ -76,21 +234,41 @@ def update_candidate_name(db: Session, candidate_id: int, new_name: str):
     return candidate
 
 
-def get_all_candidates(db: Session):
-    return db.query(Candidate).all()
+def get_candidate(db: Session, candidate_id: int, election_id: int = DEFAULT_ELECTION_ID):
+    return db.query(Candidate).filter(
+        Candidate.id == candidate_id,
+        Candidate.election_id == election_id
+    ).first()
+
+
+def get_all_candidates(db: Session, election_id: int = DEFAULT_ELECTION_ID):
+    return db.query(Candidate).filter(Candidate.election_id == election_id).all()
 
 
 # ELECTION STATE
 
-def get_election_state(db: Session):
+def create_election(db: Session, name: str):
+    state = ElectionState(name=name, status=ElectionStatus.NOT_STARTED)
+    db.add(state)
+    db.commit()
+    db.refresh(state)
+    return state
+
+
+def get_all_elections(db: Session):
+    return db.query(ElectionState).order_by(ElectionState.id).all()
+
+
+def get_election_state(db: Session, election_id: int = DEFAULT_ELECTION_ID):
     """
-    Returns the single election state row.
-    If it doesn't exist, create it.
+    Returns the state row of one election.
+    The default election is created on first use; any other
+    election must have been created first (None otherwise).
     """
-    state = db.query(ElectionState).first()
+    state = db.get(ElectionState, election_id)
 
-    if not state:
-        state = ElectionState(status=ElectionStatus.NOT_STARTED)
+    if not state and election_id == DEFAULT_ELECTION_ID:
+        state = ElectionState(id=DEFAULT_ELECTION_ID, status=ElectionStatus.NOT_STARTED)
         db.add(state)
         db.commit()
         db.refresh(state)
@@ -98,17 +276,148 @@ def get_election_state(db: Session):
     return state
 
 
-def set_election_status(db: Session, new_status: ElectionStatus):
-    state = get_election_state(db)
+def set_election_status(db: Session, new_status: ElectionStatus, election_id: int = DEFAULT_ELECTION_ID):
+    state = get_election_state(db, election_id)
     state.status = new_status
     db.commit()
     return state
 
 
-def reset_voters(db: Session):
+def reset_election(db: Session, election_id: int = DEFAULT_ELECTION_ID):
+    """
+    Starts a new epoch of the election (status back to NOT_STARTED).
+    Every voted flag of the previous epoch stops counting at once:
+    one row updated, however many voters voted.
+    Returns the new epoch, or None if the election does not exist.
+    """
+    epoch = db.execute(
+        update(ElectionState)
+        .where(ElectionState.id == election_id)
+        .values(epoch=ElectionState.epoch + 1, status=ElectionStatus.NOT_STARTED)
+        .returning(ElectionState.epoch)
+    ).scalar()
+    db.commit()
+    return epoch
+
+
+# SEALED BLOCKS
+#
+# Ledger rows are keyed by (election_id, epoch): a reset election seals
+# its new epoch's chain while the old epoch's rows are still being purged.
+
+def get_last_block_record(db: Session, election_id: int = DEFAULT_ELECTION_ID, epoch: int = 0):
+    return (
+        db.query(BlockRecord)
+        .filter(BlockRecord.election_id == election_id, BlockRecord.epoch == epoch)
+        .order_by(BlockRecord.block_index.desc())
+        .first()
+    )
+
+
+def save_sealed_block(db: Session, block, election_id: int = DEFAULT_ELECTION_ID, epoch: int = 0):
+    """
+    Writes a sealed Block and its vote transactions to the ledger tables.
+    The block is verified first: its stored hash must match its contents
+    and it must extend the last stored block of the epoch.
+    Returns the BlockRecord, or None if verification fails.
+    """
+    if block.hash != block.compute_hash():
+        return None
+
+    last = get_last_block_record(db, election_id, epoch)
+    if last is not None and (
+        block.index != last.block_index + 1
+        or block.previous_hash != last.hash
+    ):
+        return None
+
+    record = BlockRecord(
+        election_id=election_id,
+        epoch=epoch,
+        block_index=block.index,
+        timestamp=block.timestamp,
+        previous_hash=block.previous_hash,
+        hash=block.hash
+    )
+    db.add(record)
+    db.add_all([
+        VoteRecord(
+            election_id=election_id,
+            epoch=epoch,
+            block_index=block.index,
+            voter_hash=tx.voter_hash,
+            candidate_id=tx.candidate_id,
+            timestamp=tx.timestamp
+        )
+        for tx in block.transactions
+    ])
+
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None  # block index already stored in this epoch (uq_block_epoch_position)
+
+    return record
+
+
+def sync_sealed_blocks(db: Session, chain, election_id: int = DEFAULT_ELECTION_ID, epoch: int = 0):
     """
-    Clears 'has_voted' flags for all voters.
-    Useful when starting a new election.
+    Stores every block of the chain that is not in the epoch's ledger
+    rows yet. Returns the number of blocks written, or None if one
+    fails verification.
     """
-    db.query(Voter).update({Voter.has_voted: False})
+    last = get_last_block_record(db, election_id, epoch)
+    start = last.block_index + 1 if last is not None else 0
+
+    written = 0
+    for block in chain.chain[start:]:
+        if save_sealed_block(db, block, election_id, epoch) is None:
+            return None
+        written += 1
+
+    return written
+
+
+def clear_sealed_blocks(db: Session, election_id: int = DEFAULT_ELECTION_ID):
+    db.query(VoteRecord).filter(VoteRecord.election_id == election_id).delete()
+    db.query(BlockRecord).filter(BlockRecord.election_id == election_id).delete()
     db.commit()
+
+
+def purge_sealed_blocks(db: Session, election_id: int, epoch: int, limit: int = 10_000) -> int:
+    """
+    Deletes up to `limit` ledger rows of one epoch of the election,
+    votes first. Returns the number of rows deleted (0 once nothing is
+    left), so a large ledger can be dropped in short writer jobs.
+    """
+    for model in (VoteRecord, BlockRecord):
+        ids = (
+            select(model.id)
+            .where(model.election_id == election_id, model.epoch == epoch)
+            .limit(limit)
+        )
+        deleted = db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        if deleted:
+            db.commit()
+            return deleted
+    return 0
+
+
+def count_votes_by_candidate(db: Session, election_id: int = DEFAULT_ELECTION_ID) -> dict:
+    """
+    Tally of sealed votes of the election's current epoch, computed in SQL:
+      SELECT candidate_id, COUNT(*) ... WHERE election_id = ? AND epoch = ?
+      GROUP BY candidate_id
+    """
+    rows = (
+        db.query(VoteRecord.candidate_id, func.count(VoteRecord.id))
+        .filter(
+            VoteRecord.election_id == election_id,
+            # no state row yet: the default election, still at epoch 0
+            VoteRecord.epoch == func.coalesce(current_epoch(election_id), 0)
+        )
+        .group_by(VoteRecord.candidate_id)
+        .all()
+    )
+    return {candidate_id: votes for candidate_id, votes in rows}
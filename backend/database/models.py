@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Enum, Float, UniqueConstraint
 import enum
 
 from .session import Base   # ✅ IMPORT THE SAME BASE
+from ..config import DEFAULT_ELECTION_ID
 
 
 class ElectionStatus(enum.Enum):
@@ -18,8 +19,6 @@ class Voter(Base):
     voter_id = Column(String, unique=True, nullable=False)
     voter_hash = Column(String, unique=True, nullable=False)
 
-    has_voted = Column(Boolean, default=False)
-
 
 class Candidate(Base):
     __tablename__ = "candidates"
@@ -27,9 +26,72 @@ class Candidate(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
 
+    election_id = Column(Integer, default=DEFAULT_ELECTION_ID, index=True)
+
 
 class ElectionState(Base):
+    """
+    One row per election; the row id is the election_id.
+    """
     __tablename__ = "election_state"
 
     id = Column(Integer, primary_key=True, index=True)
-    status = Column(Enum(ElectionStatus), default=ElectionStatus.NOT_STARTED)
\ No newline at end of file
+    name = Column(String, nullable=True)
+    status = Column(Enum(ElectionStatus), default=ElectionStatus.NOT_STARTED)
+
+    # bumped by every reset: ballots of older epochs no longer count
+    epoch = Column(Integer, default=0, nullable=False)
+
+
+class VoterParticipation(Base):
+    """
+    Per-election voted tracking: a row means the voter has cast
+    their ballot in that election's epoch `epoch`. Rows from earlier
+    epochs (before a reset) mean "not voted", and are reused by the
+    next claim instead of being deleted.
+    """
+    __tablename__ = "voter_participation"
+    __table_args__ = (
+        UniqueConstraint("election_id", "voter_id", name="uq_participation_voter"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    election_id = Column(Integer, nullable=False, index=True)
+    voter_id = Column(String, nullable=False)
+    epoch = Column(Integer, default=0, nullable=False)
+
+
+# SEALED LEDGER (relational projection of the blockchain)
+
+# Rows carry the election epoch their chain was sealed in: after a
+# reset, the old epoch's rows are purged in the background while the
+# new epoch's chain is sealed next to them.
+
+class BlockRecord(Base):
+    __tablename__ = "blocks"
+    __table_args__ = (
+        UniqueConstraint("election_id", "epoch", "block_index", name="uq_block_epoch_position"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    election_id = Column(Integer, nullable=False, index=True)
+    epoch = Column(Integer, default=0, nullable=False)
+    block_index = Column(Integer, nullable=False, index=True)
+    timestamp = Column(Float, nullable=False)
+    previous_hash = Column(String, nullable=False)
+    hash = Column(String, nullable=False)
+
+
+class VoteRecord(Base):
+    __tablename__ = "vote_transactions"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    election_id = Column(Integer, nullable=False, index=True)
+    epoch = Column(Integer, default=0, nullable=False)
+    block_index = Column(Integer, nullable=False, index=True)
+    voter_hash = Column(String, nullable=False, index=True)
+    candidate_id = Column(Integer, nullable=False, index=True)
+    timestamp = Column(Float, nullable=False)
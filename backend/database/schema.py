@@ -0,0 +1,137 @@
+from sqlalchemy import inspect, text
+
+from ..config import DEFAULT_ELECTION_ID
+from .session import Base
+from . import models  # noqa: F401  (registers tables)
+
+
+# Bump whenever a table or ADDED_COLUMNS changes. SQLite databases
+# remember the version they were built for (PRAGMA user_version), so
+# a restart against an up-to-date database skips create_all entirely.
+SCHEMA_VERSION = 5
+
+
+# Columns added after the first release, as (table, column, DDL type).
+# create_all() never alters existing tables, so older databases get
+# them through upgrade_schema().
+ADDED_COLUMNS = [
+    ("candidates", "election_id", "INTEGER DEFAULT 1"),
+    ("election_state", "name", "VARCHAR"),
+    ("election_state", "epoch", "INTEGER NOT NULL DEFAULT 0"),
+    ("voter_participation", "epoch", "INTEGER NOT NULL DEFAULT 0"),
+    ("blocks", "epoch", "INTEGER NOT NULL DEFAULT 0"),
+    ("vote_transactions", "epoch", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+# Ledger rows written before they carried an epoch belong to their
+# election's epoch at upgrade time.
+EPOCH_BACKFILL = {"blocks", "vote_transactions"}
+
+
+# Unique constraints changed since the first release, as (table, new
+# constraint name). SQLite cannot alter a table's constraints, so an
+# older table without the named one is rebuilt by rebuild_table().
+CHANGED_CONSTRAINTS = [
+    ("blocks", "uq_block_epoch_position"),
+]
+
+
+def upgrade_schema(engine):
+    """
+    Adds any missing ADDED_COLUMNS to existing tables, carries the
+    first release's voters.has_voted flags over to participation rows,
+    and rebuilds the tables listed in CHANGED_CONSTRAINTS that predate
+    them.
+    """
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table, column, ddl in ADDED_COLUMNS:
+            if table not in tables:
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                if column == "epoch" and table in EPOCH_BACKFILL:
+                    conn.execute(text(
+                        f"UPDATE {table} SET epoch = COALESCE(("
+                        f"SELECT epoch FROM election_state "
+                        f"WHERE election_state.id = {table}.election_id), 0)"
+                    ))
+
+        if "voters" in tables:
+            migrate_voted_flags(conn, {c["name"] for c in inspector.get_columns("voters")})
+
+        for table, constraint in CHANGED_CONSTRAINTS:
+            if table not in tables or engine.dialect.name != "sqlite":
+                continue
+            names = {c["name"] for c in inspector.get_unique_constraints(table)}
+            if constraint not in names:
+                rebuild_table(conn, table)
+
+
+def migrate_voted_flags(conn, voter_columns: set):
+    """
+    Voters flagged has_voted by the first release (a single election)
+    get a participation row in the default election's current epoch,
+    so they cannot vote again after the upgrade. Voters that already
+    have a row of their own are left alone.
+    """
+    if "has_voted" not in voter_columns:
+        return
+    conn.execute(text(
+        "INSERT INTO voter_participation (election_id, voter_id, epoch) "
+        "SELECT :election_id, voters.voter_id, COALESCE(("
+        "SELECT epoch FROM election_state WHERE election_state.id = :election_id), 0) "
+        "FROM voters WHERE voters.has_voted = 1 AND NOT EXISTS ("
+        "SELECT 1 FROM voter_participation "
+        "WHERE voter_participation.election_id = :election_id "
+        "AND voter_participation.voter_id = voters.voter_id)"
+    ), {"election_id": DEFAULT_ELECTION_ID})
+
+
+def rebuild_table(conn, table: str):
+    """
+    Recreates a table from its current model, keeping its rows: the old
+    table's indexes are dropped (their names are reused), the table is
+    renamed aside, created anew, and its rows are copied back.
+    """
+    model = Base.metadata.tables[table]
+    for index in inspect(conn).get_indexes(table):
+        conn.execute(text(f"DROP INDEX {index['name']}"))
+
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {table}_old"))
+    model.create(conn)
+
+    columns = ", ".join(column.name for column in model.columns)
+    conn.execute(text(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_old"))
+    conn.execute(text(f"DROP TABLE {table}_old"))
+
+
+def stored_schema_version(engine):
+    """
+    Version recorded in the database, or None if it cannot record one.
+    """
+    if engine.dialect.name != "sqlite":
+        return None
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def ensure_schema(engine) -> bool:
+    """
+    Creates / upgrades the tables only if the stored schema version is
+    not SCHEMA_VERSION. Returns True if any schema work was done.
+    """
+    if stored_schema_version(engine) == SCHEMA_VERSION:
+        return False
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return True
@@ -1,7 +1,9 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from .. import config
+
 
 # DATABASE CONFIGURATION
 
@@ -10,10 +12,33 @@ DATABASE_URL = os.getenv(
     "sqlite:///./votechain.db"   # safe fallback
 )
 
+
+def configure_sqlite(engine, read_only: bool = False):
+    """
+    WAL lets readers run alongside the single writer; read-only
+    connections additionally refuse any write (PRAGMA query_only).
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={config.DB_BUSY_TIMEOUT_MS}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+# WRITE ENGINE: used by the single writer thread (writer.py),
+# schema creation and offline scripts
+
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False}
 )
+configure_sqlite(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -21,10 +46,25 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# READ ENGINE: pool of read-only connections for sync `def` routes
+
+read_engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=config.DB_READ_POOL_SIZE
+)
+configure_sqlite(read_engine, read_only=True)
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine
+)
+
 Base = declarative_base()
 
 
-# SESSION DEPENDENCY FOR FASTAPI
+# SESSION DEPENDENCIES FOR FASTAPI
 
 def get_db():
     """
@@ -36,3 +76,15 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """
+    Read-only session from the reader pool.
+    Writes go through the database writer (writer.py) instead.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,103 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+
+from sqlalchemy.orm import sessionmaker
+
+from .session import engine
+
+
+# SINGLE WRITER
+#
+# SQLite allows one writer at a time. Instead of letting every request
+# thread race for the write lock (and fail with "database is locked"),
+# all writes are queued to one thread that owns the write connection.
+# Jobs are plain crud functions: writer.run(register_voter, voter_id, h)
+# calls register_voter(db, voter_id, h) on the writer thread.
+
+WriterSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,     # results are read after the session closes
+    bind=engine
+)
+
+
+class DatabaseWriter:
+
+    def __init__(self, session_factory):
+        self._sessions = session_factory
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._loop, name="votechain-db-writer", daemon=True
+                    )
+                    self._thread.start()
+
+    def _loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+
+            fn, args, kwargs, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            db = self._sessions()
+            try:
+                future.set_result(fn(db, *args, **kwargs))
+            except BaseException as e:
+                db.rollback()
+                future.set_exception(e)
+            finally:
+                db.close()
+
+    # --------------------------------------------------------
+    # SUBMISSION
+    # --------------------------------------------------------
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """
+        Queues fn(db, *args, **kwargs) for the writer thread.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Runs a write and waits for its result (sync routes).
+        """
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run_async(self, fn, *args, **kwargs):
+        """
+        Runs a write without blocking the event loop (async routes).
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+# shared by all routes of this process
+db_writer = DatabaseWriter(WriterSessionLocal)
+
+
+def get_writer():
+    """
+    FastAPI dependency returning the database writer (overridable in tests).
+    """
+    return db_writer
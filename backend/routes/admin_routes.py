@@ -1,21 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database.session import get_db
+from ..database.session import get_read_db
+from ..database.async_session import get_async_db
+from ..database.writer import DatabaseWriter, get_writer
+from ..database import async_crud
 from ..database.crud import (
     add_candidate,
     delete_candidate,
     update_candidate_name,
     get_all_candidates,
     get_all_voters,
+    count_voters,
     set_election_status,
-    get_election_state,
-    reset_voters
+    reset_election,
+    sync_sealed_blocks,
+    purge_sealed_blocks,
+    count_votes_by_candidate,
+    create_election
 )
 from ..database.models import ElectionStatus
 
-from ..blockchain.chain import Blockchain
+from ..blockchain.registry import ChainRegistry
+from ..blockchain.archiver import chain_archiver
+from ..blockchain.tally import tally_chain, tally_store
+from ..blockchain.segments import get_archive, retire_archive
+from ..blockchain.monitor import IntegrityMonitor
+from .. import config
 from ..routes.auth import get_current_user, admin_login
+from ..routes.election import get_election
+from ..security.membership import voter_index
+from ..utils.live_counters import live_counters
+from ..utils.results_cache import results_cache, cached_response
+from ..utils.single_flight import single_flight
+from ..utils.serializers import admin_results_document, voter_results_document
 
 
 # ROUTER
@@ -45,9 +67,25 @@ def verify_admin(token: str = ""):
     return True
 
 
-# LOCAL BLOCKCHAIN INSTANCE (in-memory)
+# BLOCKCHAIN INSTANCES (one chain per election; in-memory, or shared
+# store across workers)
+
+chains = ChainRegistry()
+
+# background re-verification of every chain (started with the app)
+integrity_monitor = IntegrityMonitor(chains)
+
+
+# CREATE ELECTION
 
-blockchain = Blockchain()
+@router.post("/election/create")
+def admin_create_election(
+    name: str,
+    writer: DatabaseWriter = Depends(get_writer),
+    _: bool = Depends(verify_admin)
+):
+    state = writer.run(create_election, name)
+    return {"election_id": state.id, "name": state.name}
 
 
 # CANDIDATE MANAGEMENT
@@ -55,19 +93,20 @@ blockchain = Blockchain()
 @router.post("/candidate/add")
 def admin_add_candidate(
     name: str,
-    db: Session = Depends(get_db),
+    state=Depends(get_election),
+    writer: DatabaseWriter = Depends(get_writer),
     _: bool = Depends(verify_admin)
 ):
-    return add_candidate(db, name)
+    return writer.run(add_candidate, name, state.id)
 
 
 @router.delete("/candidate/delete/{candidate_id}")
 def admin_delete_candidate(
     candidate_id: int,
-    db: Session = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer),
     _: bool = Depends(verify_admin)
 ):
-    ok = delete_candidate(db, candidate_id)
+    ok = writer.run(delete_candidate, candidate_id)
     if not ok:
         raise HTTPException(status_code=404, detail="Candidate not found")
     return {"message": "Candidate deleted"}
@@ -77,10 +116,10 @@ def admin_delete_candidate(
 def admin_update_candidate(
     candidate_id: int,
     new_name: str,
-    db: Session = Depends(get_db),
+    writer: DatabaseWriter = Depends(get_writer),
     _: bool = Depends(verify_admin)
 ):
-    candidate = update_candidate_name(db, candidate_id, new_name)
+    candidate = writer.run(update_candidate_name, candidate_id, new_name)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     return candidate
@@ -89,33 +128,36 @@ def admin_update_candidate(
 # VIEW REGISTERED VOTERS (COUNT ONLY)
 
 @router.get("/voters/count")
-def admin_voter_count(
-    db: Session = Depends(get_db),
+async def admin_voter_count(
+    db: AsyncSession = Depends(get_async_db),
     _: bool = Depends(verify_admin)
 ):
-    voters = get_all_voters(db)
-    return {"registered_voters": len(voters)}
+    # concurrent requests share one COUNT
+    total = await single_flight.run(("voters", "count"), async_crud.count_voters, db)
+    return {"registered_voters": total}
 
 
 # VIEW CANDIDATES
 
 @router.get("/candidates")
-def admin_candidates(
-    db: Session = Depends(get_db),
+async def admin_candidates(
+    state=Depends(get_election),
+    db: AsyncSession = Depends(get_async_db),
     _: bool = Depends(verify_admin)
 ):
-    return get_all_candidates(db)
+    return await single_flight.run(
+        ("candidates", state.id), async_crud.get_all_candidates, db, state.id
+    )
 
 
 # START ELECTION
 
 @router.post("/election/start")
 def admin_start_election(
-    db: Session = Depends(get_db),
+    state=Depends(get_election),
+    writer: DatabaseWriter = Depends(get_writer),
     _: bool = Depends(verify_admin)
 ):
-    state = get_election_state(db)
-
     if state.status == ElectionStatus.ONGOING:
         raise HTTPException(status_code=400, detail="Election already ongoing")
 
@@ -125,7 +167,7 @@ def admin_start_election(
             detail="Election ended. Clear election to start again."
         )
 
-    set_election_status(db, ElectionStatus.ONGOING)
+    writer.run(set_election_status, ElectionStatus.ONGOING, state.id)
     return {"message": "Election started"}
 
 
@@ -133,83 +175,289 @@ def admin_start_election(
 
 @router.post("/election/end")
 def admin_end_election(
-    db: Session = Depends(get_db),
+    state=Depends(get_election),
+    db: Session = Depends(get_read_db),
+    writer: DatabaseWriter = Depends(get_writer),
     _: bool = Depends(verify_admin)
 ):
-    state = get_election_state(db)
-
     if state.status != ElectionStatus.ONGOING:
         raise HTTPException(status_code=400, detail="Election is not ongoing")
 
-    blockchain.mine_block()
-    set_election_status(db, ElectionStatus.ENDED)
+    blockchain = chains.get(state.id, state.epoch)
+    block = blockchain.mine_block()
+    if block is not None:
+        live_counters.add_sealed(state.id, state.epoch, len(block.transactions))
+
+    # persist sealed blocks to the ledger tables (verified on write);
+    # rows of an earlier epoch may still be purging alongside
+    if writer.run(sync_sealed_blocks, blockchain, state.id, state.epoch) is None:
+        raise HTTPException(status_code=500, detail="Sealed block failed verification")
+
+    writer.run(set_election_status, ElectionStatus.ENDED, state.id)
+
+    # pack the frozen chain into immutable compressed segments
+    get_archive(state.id).archive_chain(blockchain, config.SEGMENT_BLOCKS, final=True)
+
+    # append the sealed votes to the analytics columns
+    sealed_columns(state)
+
+    # the chain is now frozen: build the result documents once
+    precompute_results(db, state.id, blockchain.last_block().hash)
 
     return {"message": "Election ended and votes sealed into blockchain"}
 
 
+def precompute_results(db: Session, election_id: int, chain_tip: str):
+    """
+    Encodes the admin and voter result documents into the results cache.
+    """
+    candidates = get_all_candidates(db, election_id)
+    vote_counts = count_votes_by_candidate(db, election_id)
+
+    results_cache.put(
+        election_id, "admin", chain_tip,
+        admin_results_document(candidates, vote_counts, count_voters(db))
+    )
+    results_cache.put(
+        election_id, "voter", chain_tip,
+        voter_results_document(candidates, vote_counts)
+    )
+
+
 # VIEW RESULTS (POST-ELECTION)
 
 @router.get("/results")
-def admin_view_results(
-    db: Session = Depends(get_db),
+async def admin_view_results(
+    request: Request,
+    state=Depends(get_election),
+    db: AsyncSession = Depends(get_async_db),
     _: bool = Depends(verify_admin)
 ):
-    state = get_election_state(db)
     if state.status != ElectionStatus.ENDED:
         raise HTTPException(status_code=403, detail="Election not ended yet")
 
-    candidates = get_all_candidates(db)
-    voters = get_all_voters(db)
+    # served from the cached bytes computed when the election ended
+    chain_tip = chains.get(state.id, state.epoch).last_block().hash
+    entry = results_cache.get(state.id, "admin", chain_tip)
+
+    if entry is None:
+        # a stampede on a cold cache builds the document once
+        entry = await single_flight.run(
+            ("results", "admin", state.id, chain_tip),
+            build_admin_results, db, state.id, chain_tip
+        )
+
+    return cached_response(entry, request)
+
+
+async def build_admin_results(db: AsyncSession, election_id: int, chain_tip: str):
+    candidates = await async_crud.get_all_candidates(db, election_id)
+
+    # GROUP BY candidate_id over the sealed ledger tables
+    vote_counts = await async_crud.count_votes_by_candidate(db, election_id)
+    total_voters = await async_crud.count_voters(db)
+
+    return results_cache.put(
+        election_id, "admin", chain_tip,
+        admin_results_document(candidates, vote_counts, total_voters)
+    )
+
+
+# RECOUNT (AUDIT TALLY OVER THE CHAIN)
+
+@router.get("/recount")
+def admin_recount(
+    start_block: Optional[int] = None,
+    end_block: Optional[int] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    state=Depends(get_election),
+    db: Session = Depends(get_read_db),
+    _: bool = Depends(verify_admin)
+):
+    """
+    Recounts sealed votes straight from the chain with the parallel
+    tally engine. Optional filters: block range [start_block, end_block)
+    and time window [start_time, end_time) as UNIX timestamps.
+    """
+    blockchain = chains.get(state.id, state.epoch)
+    filters = {
+        "start_block": start_block,
+        "end_block": end_block,
+        "start_time": start_time,
+        "end_time": end_time
+    }
+
+    if blockchain.block_store is not None:
+        vote_counts = tally_store(blockchain.block_store.path, **filters)
+    else:
+        vote_counts = tally_chain(blockchain, **filters)
+
+    names = {c.id: c.name for c in get_all_candidates(db, state.id)}
+
+    return {
+        "filters": filters,
+        "total_votes": sum(vote_counts.values()),
+        "results": [
+            {"candidate_id": cid, "candidate": names.get(cid), "votes": votes}
+            for cid, votes in sorted(vote_counts.items())
+        ]
+    }
+
+
+# ANALYTICS (VECTORIZED, OVER THE MEMORY-MAPPED VOTE COLUMNS)
+
+def sealed_columns(state):
+    """
+    Column store of the election, caught up with its sealed blocks.
+    """
+    # imported on first use: numpy is not needed to boot the server
+    from ..blockchain.columns import get_columns
+
+    columns = get_columns(state.id)
+    columns.append_chain(chains.get(state.id, state.epoch))
+    return columns
+
+
+@router.get("/analytics/tally")
+def admin_analytics_tally(
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    state=Depends(get_election),
+    _: bool = Depends(verify_admin)
+):
+    vote_counts = sealed_columns(state).tally(start_time, end_time)
+    return {
+        "total_votes": sum(vote_counts.values()),
+        "results": [
+            {"candidate_id": cid, "votes": votes}
+            for cid, votes in sorted(vote_counts.items())
+        ]
+    }
+
 
-    vote_counts = {c.id: 0 for c in candidates}
+@router.get("/analytics/turnout")
+def admin_analytics_turnout(
+    bucket_seconds: float = 60,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    state=Depends(get_election),
+    _: bool = Depends(verify_admin)
+):
+    if bucket_seconds <= 0:
+        raise HTTPException(status_code=400, detail="bucket_seconds must be positive")
+    return sealed_columns(state).turnout_histogram(bucket_seconds, start_time, end_time)
 
-    for block in blockchain.chain:
-        for tx in block.transactions:
-            vote_counts[tx.candidate_id] += 1
 
-    total_votes = sum(vote_counts.values())
-    total_voters = len(voters)
+@router.get("/analytics/blocks")
+def admin_analytics_blocks(
+    state=Depends(get_election),
+    _: bool = Depends(verify_admin)
+):
+    counts = sealed_columns(state).per_block_counts()
+    return [
+        {"block_index": index, "votes": votes}
+        for index, votes in sorted(counts.items())
+    ]
 
-    results = []
-    for c in candidates:
-        votes = vote_counts.get(c.id, 0)
 
-        results.append({
-            "candidate": c.name,
-            "votes": votes,
-            "percent_of_votes": round((votes / total_votes * 100), 2) if total_votes else 0,
-            "percent_of_registered_voters": round((votes / total_voters * 100), 2) if total_voters else 0
-        })
+# TURNOUT CURVE (LIVE, FROM THE INCREMENTAL BUCKET COUNTER)
 
-    turnout = (total_votes / total_voters * 100) if total_voters else 0
+@router.get("/turnout")
+def admin_turnout(
+    resolution: Optional[int] = None,
+    state=Depends(get_election),
+    _: bool = Depends(verify_admin)
+):
+    """
+    Votes per time bucket and cumulative turnout, during or after the
+    election. `resolution` (seconds) must be a multiple of
+    TURNOUT_BUCKET_SECONDS; defaults to it.
+
+    total_votes / pending_votes come from the live counters, so they
+    include the ballots every worker took. On the shared (sqlite) chain
+    backend the curve counts sealed ballots only (sealed_only=true):
+    each worker sees just its own share of the pending ones.
+    """
+    chain = chains.get(state.id, state.epoch)
+    try:
+        curve = chain.turnout.curve(resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    live = live_counters.read(state.id, state.epoch)
     return {
-        "total_votes": total_votes,
-        "voter_turnout_percent": round(turnout, 2),
-        "results": results
+        "election_id": state.id,
+        "total_votes": live["accepted"],
+        "pending_votes": live["pending"],
+        "sealed_only": chain.turnout_sealed_only,
+        **curve
     }
 
 
+# CHAIN INTEGRITY (BACKGROUND MONITOR)
+
+@router.get("/integrity")
+def admin_integrity(
+    run: bool = False,
+    _: bool = Depends(verify_admin)
+):
+    """
+    Validated block index per election, monitor metrics and findings.
+    run=true runs one verification cycle first.
+    """
+    if run:
+        return integrity_monitor.check_once()
+    return integrity_monitor.report()
+
+
+@router.get("/integrity/metrics", response_class=PlainTextResponse)
+def admin_integrity_metrics(_: bool = Depends(verify_admin)):
+    return integrity_monitor.prometheus()
+
+
+# METRICS (PROMETHEUS)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def admin_metrics(_: bool = Depends(verify_admin)):
+    """
+    Live vote counters (all workers) and integrity monitor metrics.
+    """
+    return live_counters.prometheus() + integrity_monitor.prometheus()
+
+
 # CLEAR ELECTION
 
 @router.post("/election/clear")
 def admin_clear_election(
-    db: Session = Depends(get_db),
+    state=Depends(get_election),
+    writer: DatabaseWriter = Depends(get_writer),
     _: bool = Depends(verify_admin)
 ):
-    global blockchain
+    # one row updated: every ballot of the old epoch stops counting
+    epoch = writer.run(reset_election, state.id)
+
+    # fresh chain for the new epoch; the old one is archived in the background
+    old_chain = chains.reset(state.id, epoch)
+    retired = retire_archive(state.id, state.epoch)
+    chain_archiver.submit(
+        state.id, state.epoch, old_chain, retired,
+        purge=lambda: writer.run(purge_sealed_blocks, state.id, state.epoch)
+    )
 
-    blockchain = Blockchain()
-    reset_voters(db)
-    set_election_status(db, ElectionStatus.NOT_STARTED)
+    from ..blockchain.columns import reset_columns
+    reset_columns(state.id)
+    results_cache.invalidate(state.id)
+    voter_index.reset_election(state.id)
+    live_counters.reset(state.id, epoch)
 
-    return {"message": "Election cleared and system reset"}
+    return {"message": "Election cleared and system reset", "epoch": epoch}
 
 
 #View Voters
 @router.get("/voters")
 def admin_view_voters(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: bool = Depends(verify_admin)
 ):
     voters = get_all_voters(db)
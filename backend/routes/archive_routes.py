@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from ..blockchain.segments import get_archive
+from ..routes.admin_routes import verify_admin
+from ..routes.election import get_election
+from ..utils.serializers import block_to_dict
+
+
+# ROUTER
+#
+# Read access to the compressed segment archive, for auditors and
+# standby nodes pulling sealed history.
+
+router = APIRouter(prefix="/archive", tags=["Archive"])
+
+
+# LIST SEGMENTS
+
+@router.get("/segments")
+def archive_segments(
+    state=Depends(get_election),
+    _: bool = Depends(verify_admin)
+):
+    return {
+        "election_id": state.id,
+        "segments": get_archive(state.id).segments()
+    }
+
+
+# DOWNLOAD ONE SEGMENT (supports HTTP Range)
+
+@router.get("/segments/{name}")
+def archive_segment_file(
+    name: str,
+    state=Depends(get_election),
+    _: bool = Depends(verify_admin)
+):
+    """
+    Streams the segment file unchanged (still compressed).
+    Clients may resume or split downloads with Range requests.
+    """
+    try:
+        path = get_archive(state.id).segment_path(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Segment not found")
+
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        filename=path.name
+    )
+
+
+# READ ONE BLOCK (decompresses only that block)
+
+@router.get("/blocks/{block_index}")
+def archive_block(
+    block_index: int,
+    state=Depends(get_election),
+    _: bool = Depends(verify_admin)
+):
+    try:
+        block = get_archive(state.id).read_block(block_index)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Block not archived")
+
+    return block_to_dict(block)
@@ -2,11 +2,12 @@ import hashlib
 import time
 import jwt
 from fastapi import HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database.session import get_db
-from ..database.crud import get_voter_by_id
+from ..database.async_session import get_async_db
+from ..database.async_crud import get_voter_by_id, get_voters_after
 from ..database.models import ElectionStatus
+from ..security.membership import voter_index
 
 
 # Secret key for signing tokens
@@ -52,13 +53,34 @@ def admin_login(password: str):
     return {"token": token}
 
 
+# HELPER: registered voter's row id from the in-memory index
+async def lookup_voter_row(voter_id: str, db: AsyncSession):
+    """
+    Returns the voter's row id, or None if not registered.
+    On a miss, voters registered since the last refresh (possibly by
+    another worker) are loaded first, at most once per refresh interval.
+    """
+    voter_hash = hash_voter_id(voter_id)
+    row_id = voter_index.row_id(voter_hash)
+
+    if row_id is None and voter_index.refresh_due():
+        voter_index.extend(await get_voters_after(db, voter_index.max_row_id))
+        row_id = voter_index.row_id(voter_hash)
+
+    return row_id
+
+
 # VOTER LOGIN
-def voter_login(voter_id: str, db: Session = Depends(get_db)):
+async def voter_login(voter_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Voter logs in using their voter_id.
     Returns a JWT token if valid.
+    Unknown ids are rejected from the in-memory index, without a query.
     """
-    voter = get_voter_by_id(db, voter_id)
+    if await lookup_voter_row(voter_id, db) is None:
+        raise HTTPException(status_code=404, detail="Voter not found")
+
+    voter = await get_voter_by_id(db, voter_id)
     if not voter:
         raise HTTPException(status_code=404, detail="Voter not found")
 
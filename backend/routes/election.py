@@ -1,23 +1,65 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database.session import get_db
-from ..database.crud import get_election_state
-from ..database.models import ElectionStatus
+from ..database.session import get_read_db
+from ..database.async_session import get_async_db
+from ..database.writer import DatabaseWriter, get_writer
+from ..database import crud
+from ..database.crud import get_all_elections
+from ..database.async_crud import get_election_state
+from ..database.models import ElectionStatus, DEFAULT_ELECTION_ID
+from ..utils.live_counters import live_counters
 
 
 router = APIRouter(prefix="/election")
 
 
+# ELECTION LOOKUP (shared by admin + voter routes)
+
+async def get_election(
+    election_id: int = DEFAULT_ELECTION_ID,
+    db: AsyncSession = Depends(get_async_db),
+    writer: DatabaseWriter = Depends(get_writer)
+):
+    """
+    Resolves the ?election_id= query parameter to its state row.
+    Requests without one use the default election.
+    """
+    state = await get_election_state(db, election_id)
+    if not state and election_id == DEFAULT_ELECTION_ID:
+        # first use of the default election: created by the writer
+        state = await writer.run_async(crud.get_election_state, election_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Election not found")
+    return state
+
+
 @router.get("/status")
-def get_status(db: Session = Depends(get_db)):
+async def get_status(state=Depends(get_election)):
     """
     A simple universal endpoint:
     - Voters use it to know if voting has begun
     - Admin uses it to confirm current state
     """
-    state = get_election_state(db)
+    return {
+        "election_id": state.id,
+        "status": state.status.value,  # NOT_STARTED, ONGOING, ENDED
+        # bumped by resets; part of what polling-station kiosks sign
+        "epoch": state.epoch,
+        # ballots cast so far, across all workers
+        "votes_cast": live_counters.read(state.id, state.epoch)["accepted"]
+    }
+
 
+@router.get("/list")
+def list_elections(db: Session = Depends(get_read_db)):
+    """
+    All elections on this deployment, with their status.
+    """
     return {
-        "status": state.status.value  # NOT_STARTED, ONGOING, ENDED
+        "elections": [
+            {"id": e.id, "name": e.name, "status": e.status.value}
+            for e in get_all_elections(db)
+        ]
     }
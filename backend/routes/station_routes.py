@@ -0,0 +1,187 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import config
+from ..database.async_session import get_async_db
+from ..database.writer import DatabaseWriter, get_writer
+from ..database.crud import mark_voters_as_voted, unmark_voters
+from ..database import async_crud
+from ..database.models import ElectionStatus
+
+from ..blockchain.transaction import VoteTransaction
+from ..routes.auth import get_current_user, hash_voter_id
+from ..routes.election import get_election
+from ..routes.voter_routes import ip_admission
+from ..security.rate_limit import admission
+from ..security.membership import voter_index
+from ..security.stations import kiosk_key, station_key, station_login, verify_ballot
+from ..utils.live_counters import live_counters
+
+# same chain registry as admin + voter routes
+from ..routes.admin_routes import chains
+
+router = APIRouter(
+    prefix="/station",
+    tags=["station"]
+)
+
+
+# =========================================================
+# REQUEST BODY
+# =========================================================
+
+class Ballot(BaseModel):
+    kiosk_id: str
+    voter_id: str
+    candidate_id: int
+    # HMAC-SHA256 made with the kiosk's own key (see security/stations.py)
+    signature: str
+
+
+class BallotBatch(BaseModel):
+    ballots: List[Ballot]
+
+
+# =========================================================
+# AUTH
+# =========================================================
+
+@router.post("/login")
+def station_login_route(
+    station_id: str,
+    key: str,
+    _admit: None = Depends(ip_admission)
+):
+    """
+    Returns a JWT token for a polling station gateway.
+    """
+    return station_login(station_id, key)
+
+
+def verify_station(token: str = Query(...)):
+    """
+    Confirms the token belongs to a station.
+    Returns station_id.
+    """
+    identity, role = get_current_user(token)
+    if role != "station":
+        raise HTTPException(status_code=403, detail="Station access required")
+    return identity
+
+
+# =========================================================
+# SUBMIT A BATCH OF BALLOTS
+# =========================================================
+
+@router.post("/ballots")
+async def station_submit_ballots(
+    batch: BallotBatch,
+    station_id: str = Depends(verify_station),
+    _slot: None = Depends(admission.write_slot),
+    state=Depends(get_election),
+    db: AsyncSession = Depends(get_async_db),
+    writer: DatabaseWriter = Depends(get_writer)
+):
+    """
+    Casts every valid ballot of the batch in one go, and reports a
+    status per ballot (in upload order):
+
+      accepted, unknown_kiosk, invalid_signature, duplicate_in_batch,
+      voter_not_found, candidate_not_found, already_voted
+    """
+    if state.status != ElectionStatus.ONGOING:
+        raise HTTPException(status_code=403, detail="Election not ongoing")
+
+    ballots = batch.ballots
+    if len(ballots) > config.STATION_BATCH_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {config.STATION_BATCH_MAX} ballots per upload"
+        )
+
+    if station_key(station_id) is None:
+        raise HTTPException(status_code=403, detail="Station no longer configured")
+
+    statuses = [None] * len(ballots)
+
+    # Kiosk signatures, and one ballot per voter within the batch
+    seen = set()
+    for i, ballot in enumerate(ballots):
+        key = kiosk_key(ballot.kiosk_id, station_id)
+        if key is None:
+            statuses[i] = "unknown_kiosk"
+        elif not verify_ballot(key, state.id, state.epoch, ballot.voter_id,
+                               ballot.candidate_id, ballot.signature):
+            statuses[i] = "invalid_signature"
+        elif ballot.voter_id in seen:
+            statuses[i] = "duplicate_in_batch"
+        else:
+            seen.add(ballot.voter_id)
+
+    # Voters and candidates, validated as sets
+    voter_rows = await async_crud.get_voter_rows(db, seen)
+    candidate_ids = {c.id for c in await async_crud.get_all_candidates(db, state.id)}
+
+    to_claim = []
+    for i, ballot in enumerate(ballots):
+        if statuses[i] is not None:
+            continue
+        row_id = voter_rows.get(ballot.voter_id)
+        if row_id is None:
+            statuses[i] = "voter_not_found"
+        elif ballot.candidate_id not in candidate_ids:
+            statuses[i] = "candidate_not_found"
+        elif voter_index.has_voted(state.id, state.epoch, row_id):
+            # answered from the in-memory bitmap, no query
+            statuses[i] = "already_voted"
+        else:
+            to_claim.append(i)
+
+    # Claim every remaining ballot in one transaction
+    claimed = set()
+    if to_claim:
+        claimed = await writer.run_async(
+            mark_voters_as_voted, [ballots[i].voter_id for i in to_claim], state.id, state.epoch
+        )
+        if claimed is None:
+            raise HTTPException(status_code=409, detail="Election was reset; upload again")
+
+    transactions = []
+    for i in to_claim:
+        ballot = ballots[i]
+        if ballot.voter_id not in claimed:
+            voter_index.mark_voted(state.id, state.epoch, voter_rows[ballot.voter_id])
+            statuses[i] = "already_voted"
+            continue
+        statuses[i] = "accepted"
+        transactions.append(VoteTransaction(
+            voter_hash=hash_voter_id(ballot.voter_id),
+            candidate_id=ballot.candidate_id
+        ))
+
+    # All accepted ballots join the mempool together (one journal fsync)
+    if transactions:
+        try:
+            await run_in_threadpool(chains.get(state.id, state.epoch).add_transactions, transactions)
+        except Exception:
+            # none of them was recorded: give the ballots back
+            await writer.run_async(unmark_voters, list(claimed), state.id, state.epoch)
+            raise
+        for voter_id in claimed:
+            voter_index.mark_voted(state.id, state.epoch, voter_rows[voter_id])
+        live_counters.add_accepted(state.id, state.epoch, len(transactions))
+
+    return {
+        "election_id": state.id,
+        "station_id": station_id,
+        "accepted": len(transactions),
+        "rejected": len(ballots) - len(transactions),
+        "results": [
+            {"voter_id": ballot.voter_id, "status": status}
+            for ballot, status in zip(ballots, statuses)
+        ]
+    }
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database.session import get_db
+from ..database.async_session import get_async_db
+from ..database.writer import DatabaseWriter, get_writer
 from ..database.crud import (
     register_voter,
-    get_voter_by_id,
-    get_all_candidates,
     mark_voter_as_voted,
-    get_election_state
+    unmark_voters
 )
-from ..database.models import ElectionStatus
+from ..database import async_crud
+from ..database.models import ElectionStatus, DEFAULT_ELECTION_ID
 
 from ..blockchain.transaction import VoteTransaction
 from ..routes.auth import (
@@ -18,8 +19,17 @@ from ..routes.auth import (
     voter_login
 )
 
-# IMPORTANT: use the SAME blockchain instance as admin
-from ..routes.admin_routes import blockchain
+from ..routes.election import get_election
+from ..security.rate_limit import admission
+from ..security.membership import voter_index
+from ..utils.idempotency import idempotency
+from ..utils.live_counters import live_counters
+from ..utils.results_cache import results_cache, cached_response
+from ..utils.single_flight import single_flight
+from ..utils.serializers import voter_results_document
+
+# IMPORTANT: use the SAME chain registry as admin
+from ..routes.admin_routes import chains
 
 router = APIRouter(
     prefix="/voter",
@@ -42,6 +52,53 @@ def verify_voter(token: str = Query(...)):
     return identity
 
 
+# =========================================================
+# ADMISSION CONTROL
+# =========================================================
+
+def login_admission(request: Request, voter_id: str):
+    admission.admit(request, voter_id)
+
+
+def vote_admission(request: Request, voter_id: str = Depends(verify_voter)):
+    admission.admit(request, voter_id)
+
+
+def ip_admission(request: Request):
+    admission.admit(request)
+
+
+# =========================================================
+# IDEMPOTENT RETRIES
+# =========================================================
+
+async def vote_idempotency(
+    candidate_id: int,
+    election_id: int = DEFAULT_ELECTION_ID,
+    idempotency_key: str = Header(None, max_length=255),
+    voter_id: str = Depends(verify_voter)
+):
+    """
+    Claims the request's Idempotency-Key (scoped to the voter), or
+    answers a retry with the first attempt's response. Resolved before
+    admission control, so a replay costs no token, query or chain work.
+    """
+    if idempotency_key is None:
+        yield None
+        return
+
+    try:
+        entry = await idempotency.begin((voter_id, idempotency_key), (election_id, candidate_id))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        yield entry
+    finally:
+        # no final response recorded (e.g. rate limited): free the key
+        idempotency.abandon(entry)
+
+
 # =========================================================
 # VOTER REGISTRATION
 # =========================================================
@@ -49,14 +106,18 @@ def verify_voter(token: str = Query(...)):
 @router.post("/register")
 def voter_register(
     voter_id: str,
-    db: Session = Depends(get_db)
+    _admit: None = Depends(ip_admission),
+    _slot: None = Depends(admission.write_slot),
+    writer: DatabaseWriter = Depends(get_writer)
 ):
     voter_hash = hash_voter_id(voter_id)
 
-    voter = register_voter(db, voter_id, voter_hash)
+    voter = writer.run(register_voter, voter_id, voter_hash)
     if not voter:
         raise HTTPException(status_code=400, detail="Voter already exists")
 
+    voter_index.add(voter.voter_hash, voter.id)
+
     return {"message": "Voter registered successfully"}
 
 
@@ -65,11 +126,12 @@ def voter_register(
 # =========================================================
 
 @router.post("/login")
-def voter_login_route(
+async def voter_login_route(
     voter_id: str,
-    db: Session = Depends(get_db)
+    _admit: None = Depends(login_admission),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return voter_login(voter_id, db)
+    return await voter_login(voter_id, db)
 
 
 # =========================================================
@@ -77,11 +139,15 @@ def voter_login_route(
 # =========================================================
 
 @router.get("/candidates")
-def voter_view_candidates(
-    db: Session = Depends(get_db),
+async def voter_view_candidates(
+    state=Depends(get_election),
+    db: AsyncSession = Depends(get_async_db),
     voter_id: str = Depends(verify_voter)
 ):
-    candidates = get_all_candidates(db)
+    # concurrent requests share one query
+    candidates = await single_flight.run(
+        ("candidates", state.id), async_crud.get_all_candidates, db, state.id
+    )
     return {
         "candidates": [
             {"id": c.id, "name": c.name} for c in candidates
@@ -94,40 +160,72 @@ def voter_view_candidates(
 # =========================================================
 
 @router.post("/vote/{candidate_id}")
-def voter_cast_vote(
+async def voter_cast_vote(
     candidate_id: int,
-    db: Session = Depends(get_db),
+    idempotent=Depends(vote_idempotency),
+    _admit: None = Depends(vote_admission),
+    _slot: None = Depends(admission.write_slot),
+    state=Depends(get_election),
+    db: AsyncSession = Depends(get_async_db),
+    writer: DatabaseWriter = Depends(get_writer),
     voter_id: str = Depends(verify_voter)
 ):
+    try:
+        result = await cast_vote(candidate_id, state, db, writer, voter_id)
+    except HTTPException as e:
+        if idempotent is not None:
+            idempotency.finish(idempotent, e.status_code, {"detail": e.detail})
+        raise
+
+    if idempotent is not None:
+        idempotency.finish(idempotent, 200, result)
+    return result
+
+
+async def cast_vote(candidate_id: int, state, db: AsyncSession, writer: DatabaseWriter, voter_id: str):
     # Check election status
-    state = get_election_state(db)
     if state.status != ElectionStatus.ONGOING:
         raise HTTPException(status_code=403, detail="Election not ongoing")
 
+    # Already voted here? Answered from the in-memory bitmap, no query
+    voter_hash = hash_voter_id(voter_id)
+    row_id = voter_index.row_id(voter_hash)
+    if row_id is not None and voter_index.has_voted(state.id, state.epoch, row_id):
+        raise HTTPException(status_code=400, detail="Voter has already voted")
+
     # Get voter
-    voter = get_voter_by_id(db, voter_id)
+    voter = await async_crud.get_voter_by_id(db, voter_id)
     if not voter:
         raise HTTPException(status_code=404, detail="Voter not found")
 
-    if voter.has_voted:
-        raise HTTPException(status_code=400, detail="Voter has already voted")
-
-    # Validate candidate
-    candidates = get_all_candidates(db)
-    if candidate_id not in [c.id for c in candidates]:
+    # Validate candidate (must belong to this election)
+    if not await async_crud.get_candidate(db, candidate_id, state.id):
         raise HTTPException(status_code=404, detail="Candidate not found")
 
+    # Claim this election's ballot (atomic: one vote per voter per election)
+    claimed = await writer.run_async(mark_voter_as_voted, voter_id, state.id, state.epoch)
+    if claimed is None:
+        raise HTTPException(status_code=409, detail="Election was reset; vote again")
+    if not claimed:
+        voter_index.mark_voted(state.id, state.epoch, voter.id)
+        raise HTTPException(status_code=400, detail="Voter has already voted")
+
     # Create blockchain transaction
-    voter_hash = hash_voter_id(voter_id)
     tx = VoteTransaction(
         voter_hash=voter_hash,
         candidate_id=candidate_id
     )
 
-    blockchain.add_transaction(tx)
-
-    # Mark voter as voted
-    mark_voter_as_voted(db, voter_id)
+    # blocks until the journal fsync (shared with concurrent votes) lands,
+    # so run it off the event loop
+    try:
+        await run_in_threadpool(chains.get(state.id, state.epoch).add_transaction, tx)
+    except Exception:
+        # the vote was not recorded: give the ballot back
+        await writer.run_async(unmark_voters, [voter_id], state.id, state.epoch)
+        raise
+    voter_index.mark_voted(state.id, state.epoch, voter.id)
+    live_counters.add_accepted(state.id, state.epoch)
 
     return {"message": "Vote cast successfully"}
 
@@ -137,36 +235,36 @@ def voter_cast_vote(
 # =========================================================
 
 @router.get("/results")
-def voter_view_results(
-    db: Session = Depends(get_db),
+async def voter_view_results(
+    request: Request,
+    state=Depends(get_election),
+    db: AsyncSession = Depends(get_async_db),
     voter_id: str = Depends(verify_voter)
 ):
-    state = get_election_state(db)
     if state.status != ElectionStatus.ENDED:
         raise HTTPException(status_code=403, detail="Election results not available")
 
-    candidates = get_all_candidates(db)
-    vote_counts = {c.id: 0 for c in candidates}
+    # served from the cached bytes computed when the election ended
+    chain_tip = chains.get(state.id, state.epoch).last_block().hash
+    entry = results_cache.get(state.id, "voter", chain_tip)
 
-    # Count votes from blockchain
-    for block in blockchain.chain:
-        for tx in block.transactions:
-            vote_counts[tx.candidate_id] += 1
+    if entry is None:
+        # a stampede on a cold cache builds the document once
+        entry = await single_flight.run(
+            ("results", "voter", state.id, chain_tip),
+            build_voter_results, db, state.id, chain_tip
+        )
 
-    total_votes = sum(vote_counts.values())
+    return cached_response(entry, request)
 
-    results = []
-    for c in candidates:
-        votes = vote_counts[c.id]
-        percent = (votes / total_votes * 100) if total_votes > 0 else 0
 
-        results.append({
-            "candidate": c.name,
-            "votes": votes,
-            "percent_of_votes": round(percent, 2)
-        })
+async def build_voter_results(db: AsyncSession, election_id: int, chain_tip: str):
+    candidates = await async_crud.get_all_candidates(db, election_id)
 
-    return {
-        "total_votes": total_votes,
-        "results": results
-    }
\ No newline at end of file
+    # Count sealed votes (GROUP BY over the ledger tables)
+    vote_counts = await async_crud.count_votes_by_candidate(db, election_id)
+
+    return results_cache.put(
+        election_id, "voter", chain_tip,
+        voter_results_document(candidates, vote_counts)
+    )
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+# ASYNC VS SYNC ROUTE BENCHMARK
+#
+# Runs the voter login lookup N times at a given concurrency, once
+# through a sync `def` route on SessionLocal (the previous
+# implementation) and once through the async route on aiosqlite.
+#
+#   python -m backend.scripts.bench_async --voters 10000 --requests 5000 --concurrency 200
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="VoteChain async route benchmark")
+    parser.add_argument("--voters", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    return parser.parse_args()
+
+
+async def run_load(client, path_for, total: int, concurrency: int):
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with sem:
+            started = time.perf_counter()
+            res = await client.post(path_for(i))
+            latencies.append(time.perf_counter() - started)
+            assert res.status_code == 200, res.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def bench(args):
+    import httpx
+    from fastapi import Depends, FastAPI
+    from sqlalchemy.orm import Session
+
+    from backend.database.session import Base, SessionLocal, engine, get_db
+    from backend.database import crud
+    from backend.routes.auth import create_token, hash_voter_id
+    from backend.routes.voter_routes import voter_login_route
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.bulk_insert_mappings(crud.Voter, [
+        {"voter_id": f"BENCH{i:07d}", "voter_hash": hash_voter_id(f"BENCH{i:07d}")}
+        for i in range(args.voters)
+    ])
+    db.commit()
+    db.close()
+
+    app = FastAPI()
+
+    # before: sync route, one threadpool thread per in-flight request
+    @app.post("/sync/login")
+    def sync_login(voter_id: str, db: Session = Depends(get_db)):
+        voter = crud.get_voter_by_id(db, voter_id)
+        return {"token": create_token(voter.voter_id, "voter")}
+
+    # after: the async route served by the app
+    app.post("/async/login")(voter_login_route)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, prefix in (("sync  (before)", "/sync"), ("async (after) ", "/async")):
+            stats = await run_load(
+                client,
+                lambda i: f"{prefix}/login?voter_id=BENCH{i % args.voters:07d}",
+                args.requests,
+                args.concurrency
+            )
+            print(
+                f"[+] {label}  {stats['rps']:8.0f} req/s"
+                f"   p50 {stats['p50_ms']:7.1f} ms   p99 {stats['p99_ms']:7.1f} ms"
+            )
+
+
+def main():
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # must be set before backend.database.session is imported
+        os.environ["VOTECHAIN_DB"] = f"sqlite:///{tmp}/bench.db"
+
+        print("=== VoteChain Async Benchmark ===")
+        print(f"[*] {args.voters} voters, {args.requests} logins, concurrency {args.concurrency}")
+        asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
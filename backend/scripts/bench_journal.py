@@ -0,0 +1,87 @@
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from backend.blockchain.chain import Blockchain
+from backend.blockchain.journal import MempoolJournal
+from backend.blockchain.transaction import VoteTransaction
+
+
+# MEMPOOL JOURNAL BENCHMARK
+#
+# Measures the per-vote latency added by the write-ahead journal:
+# N threads cast votes into one chain, without a journal and then with
+# it, and the fsync count shows how many votes each group commit covered.
+#
+#   python -m backend.scripts.bench_journal --votes 20000 --threads 64
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="VoteChain mempool journal benchmark")
+    parser.add_argument("--votes", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, default=64)
+    return parser.parse_args()
+
+
+def run(chain: Blockchain, votes: int, threads: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(offset):
+        mine = []
+        for i in range(offset, votes, threads):
+            tx = VoteTransaction(f"voter-{i}", i % 5)
+            started = time.perf_counter()
+            chain.add_transaction(tx)
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "votes_per_s": votes / elapsed,
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    }
+
+
+def main():
+    args = parse_args()
+
+    print("=== VoteChain Mempool Journal Benchmark ===")
+    print(f"[*] {args.votes:,} votes from {args.threads} threads")
+
+    base = run(Blockchain(), args.votes, args.threads)
+    print(f"[+] no journal:   {base['votes_per_s']:>10,.0f} votes/s   "
+          f"p50 {base['p50_us']:>8.1f} us   p99 {base['p99_us']:>8.1f} us")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = MempoolJournal(Path(tmp) / "mempool.log")
+        chain = Blockchain(journal=journal)
+        result = run(chain, args.votes, args.threads)
+
+        print(f"[+] with journal: {result['votes_per_s']:>10,.0f} votes/s   "
+              f"p50 {result['p50_us']:>8.1f} us   p99 {result['p99_us']:>8.1f} us")
+        print(f"[+] fsyncs: {journal.fsyncs:,} "
+              f"({args.votes / max(1, journal.fsyncs):.1f} votes per group commit)")
+
+        started = time.perf_counter()
+        chain.mine_block()
+        print(f"[+] seal + journal compaction: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    print(f"[*] added latency p50: {result['p50_us'] - base['p50_us']:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
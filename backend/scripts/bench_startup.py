@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+# STARTUP BENCHMARK
+#
+# Measures a cold start in a fresh interpreter per run, against a
+# throwaway database and data directories:
+#
+#   import      time to import backend.app
+#   accepting   time until the startup hook returned (server accepts
+#               connections; /ready answers 503 while warming up)
+#   ready       time until /ready answers 200
+#
+# The first run creates the schema; later runs find it up to date.
+#
+#   python -m backend.scripts.bench_startup --runs 5
+
+
+PROBE = r"""
+import json, time
+started = time.perf_counter()
+from backend.app import app
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    accepting = time.perf_counter()
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.001)
+    ready = time.perf_counter()
+
+print(json.dumps({
+    "import": imported - started,
+    "accepting": accepting - started,
+    "ready": ready - started,
+}))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="VoteChain startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    return parser.parse_args()
+
+
+def probe(env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+
+    print("=== VoteChain Startup Benchmark ===")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        env = dict(
+            os.environ,
+            VOTECHAIN_DB=f"sqlite:///{tmp / 'votechain.db'}",
+            VOTECHAIN_CHAIN_STORE=str(tmp / "chain.db"),
+            VOTECHAIN_JOURNAL_DIR=str(tmp / "journal"),
+            VOTECHAIN_ARCHIVE_DIR=str(tmp / "segments"),
+            VOTECHAIN_COLUMNS_DIR=str(tmp / "columns"),
+        )
+
+        first = probe(env)
+        print(
+            f"[*] first start (schema created): import {first['import'] * 1000:.0f} ms, "
+            f"accepting {first['accepting'] * 1000:.0f} ms, ready {first['ready'] * 1000:.0f} ms"
+        )
+
+        runs = [probe(env) for _ in range(args.runs)]
+
+    print(f"[+] warm restarts, median of {args.runs}:")
+    for key in ("import", "accepting", "ready"):
+        print(f"    {key:<10} {statistics.median(r[key] for r in runs) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from backend.blockchain.block import Block
+from backend.blockchain.chain import Blockchain
+from backend.blockchain.store import SqliteChainStore
+from backend.blockchain.tally import tally_chain, tally_store
+from backend.blockchain.transaction import VoteTransaction
+
+
+# TALLY BENCHMARK
+#
+# Builds a synthetic sealed chain of N votes and times the in-memory
+# tally, then the serial and parallel tallies over a chain store file.
+#
+#   python -m backend.scripts.bench_tally --votes 1000000 10000000 --workers 8
+
+
+def build_chain(num_votes: int, block_size: int, candidates: int) -> Blockchain:
+    rng = random.Random(42)
+    chain = Blockchain()
+    now = time.time()
+
+    for start in range(0, num_votes, block_size):
+        txs = []
+        for i in range(start, min(start + block_size, num_votes)):
+            tx = VoteTransaction(f"v{i}", rng.randint(1, candidates))
+            tx.timestamp = now + i * 0.001
+            txs.append(tx)
+        block = Block(len(chain.chain), txs, chain.chain[-1].hash)
+        chain.chain.append(block)
+
+    return chain
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def bench(num_votes: int, block_size: int, workers: int, candidates: int):
+    print(f"\n=== {num_votes:,} votes, blocks of {block_size:,} ===")
+
+    chain, elapsed = timed(lambda: build_chain(num_votes, block_size, candidates))
+    print(f"[*] built chain:             {elapsed:8.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteChainStore(Path(tmp) / "chain.db")
+        _, elapsed = timed(lambda: store.append_blocks(chain.chain))
+        print(f"[*] wrote chain store:       {elapsed:8.2f}s")
+
+        runs = [
+            ("memory, in process", lambda: tally_chain(chain)),
+            ("store,  1 worker", lambda: tally_store(store.path, workers=1)),
+            (f"store,  {workers} workers", lambda: tally_store(store.path, workers=workers)),
+        ]
+
+        expected = None
+        for label, fn in runs:
+            counts, elapsed = timed(fn)
+            assert expected is None or counts == expected, "tally mismatch"
+            expected = counts
+            rate = num_votes / elapsed if elapsed else float("inf")
+            print(f"[+] {label:<24} {elapsed:8.2f}s  ({rate:,.0f} votes/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoteChain tally benchmark")
+    parser.add_argument("--votes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--block-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=5)
+    args = parser.parse_args()
+
+    for num_votes in args.votes:
+        bench(num_votes, args.block_size, args.workers, args.candidates)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,293 @@
-from sqlalchemy.orm import Session
-from backend.database.session import SessionLocal, Base, engine
-from backend.database.models import Voter, Candidate
-from backend.database.crud import add_candidate, add_voter
+import argparse
+import hashlib
+import time
 
+import numpy as np
+from sqlalchemy import delete, func, insert, select
 
-# CONFIG
+from backend import config
+from backend.blockchain.block import Block
+from backend.blockchain.shared import chain_store_path
+from backend.blockchain.store import SqliteChainStore
+from backend.blockchain.transaction import VoteTransaction
+from backend.database.session import engine
+from backend.database.schema import ensure_schema
+from backend.database.models import (
+    Voter,
+    Candidate,
+    ElectionState,
+    ElectionStatus,
+    VoterParticipation,
+    BlockRecord,
+    VoteRecord
+)
 
-NUM_VOTERS = 20
-CANDIDATE_NAMES = [
-    "Alice Johnson",
-    "Bob Singh",
-    "Charlie Mehra"
-]
 
+# SYNTHETIC ELECTION GENERATOR
+#
+# Fills the database with a complete, consistent election:
+#
+#   voters          VOTER00000001 ... with their SHA-256 voter hashes
+#   candidates      CANDIDATE 1 ... of the election
+#   participation   one row per voter who voted (turnout)
+#   ledger          blocks + vote_transactions tables
+#   chain store     sealed, hash-linked blocks (chain-<id>[-e<epoch>].db), resumed
+#                   by the "disk" and "sqlite" chain backends
+#
+# Votes are streamed block by block, so memory stays flat however many
+# voters are generated. Same arguments + same seed = same election
+# (hashes differ only through the block timestamps).
+#
+#   python -m backend.scripts.generate_test_data --voters 10000000 \
+#       --candidates 5 --turnout 0.65 --distribution bimodal --clear
+
+
+DISTRIBUTIONS = ("uniform", "normal", "bimodal")
+
+# rows per executemany batch (voters, participation)
+INSERT_BATCH = 50_000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="VoteChain synthetic election generator")
+    parser.add_argument("--voters", type=int, default=20)
+    parser.add_argument("--candidates", type=int, default=3)
+    parser.add_argument(
+        "--weights", type=float, nargs="+",
+        help="relative popularity of each candidate (default: equal)"
+    )
+    parser.add_argument("--turnout", type=float, default=0.7, help="share of voters who vote, 0..1")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform",
+                        help="when during the voting window votes arrive")
+    parser.add_argument("--hours", type=float, default=12.0, help="length of the voting window")
+    parser.add_argument("--start", type=float, help="window start, unix time (default: --hours ago)")
+    parser.add_argument("--block-size", type=int, default=10_000, help="votes per sealed block")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--election-id", type=int, default=config.DEFAULT_ELECTION_ID)
+    parser.add_argument("--status", choices=("ended", "ongoing"), default="ended")
+    parser.add_argument("--clear", action="store_true",
+                        help="delete all voters and this election's data first")
+    args = parser.parse_args()
+
+    if not 0.0 <= args.turnout <= 1.0:
+        parser.error("--turnout must be between 0 and 1")
+    if args.weights and len(args.weights) != args.candidates:
+        parser.error("--weights needs one value per candidate")
+    if args.block_size < 1:
+        parser.error("--block-size must be positive")
+    return args
+
+
+def voter_id(i: int) -> str:
+    return f"VOTER{i:08d}"
 
-# MAIN
 
-def clear_old_data(db: Session):
-    db.query(Voter).delete()
-    db.query(Candidate).delete()
-    db.commit()
+def voter_hash(i: int) -> str:
+    # same as routes.auth.hash_voter_id
+    return hashlib.sha256(voter_id(i).encode()).hexdigest()
+
+
+def vote_offsets(rng, n: int, window: float, distribution: str):
+    """
+    Sorted vote times, in seconds after the window start.
+    """
+    if distribution == "uniform":
+        offsets = rng.uniform(0, window, n)
+    elif distribution == "normal":
+        # one midday peak
+        offsets = rng.normal(window / 2, window / 6, n)
+    else:
+        # morning and evening peaks
+        centers = rng.choice([window * 0.25, window * 0.75], n)
+        offsets = rng.normal(centers, window / 10)
+    offsets = np.clip(offsets, 0, window)
+    offsets.sort()
+    return offsets
+
+
+# DATABASE SETUP
+
+def clear_old_data(conn, election_id: int):
+    conn.execute(delete(Voter))
+    conn.execute(delete(Candidate).where(Candidate.election_id == election_id))
+    for table in (VoterParticipation, VoteRecord, BlockRecord):
+        conn.execute(delete(table).where(table.election_id == election_id))
     print("[*] Old data cleared.")
 
 
-def generate_voters(db: Session):
-    print(f"[*] Generating {NUM_VOTERS} voters...")
+def election_epoch(conn, election_id: int) -> int:
+    """
+    Current epoch of the election (0 if it does not exist yet): the
+    chain store file and participation rows belong to that epoch.
+    """
+    epoch = conn.execute(
+        select(ElectionState.epoch).where(ElectionState.id == election_id)
+    ).scalar()
+    return epoch or 0
+
+
+def prepare_election(conn, election_id: int, status: ElectionStatus):
+    exists = conn.execute(
+        select(ElectionState.id).where(ElectionState.id == election_id)
+    ).first()
+    if exists:
+        conn.execute(
+            ElectionState.__table__.update()
+            .where(ElectionState.id == election_id)
+            .values(status=status)
+        )
+    else:
+        conn.execute(insert(ElectionState).values(
+            id=election_id, name=f"Synthetic election {election_id}", status=status, epoch=0
+        ))
+
+
+def generate_candidates(conn, election_id: int, count: int) -> list:
+    print(f"[*] Adding {count} candidates...")
+    first = conn.execute(select(func.coalesce(func.max(Candidate.id), 0))).scalar() + 1
+    ids = list(range(first, first + count))
+    conn.execute(insert(Candidate), [
+        {"id": cid, "name": f"CANDIDATE {n}", "election_id": election_id}
+        for n, cid in enumerate(ids, start=1)
+    ])
+    return ids
 
-    for i in range(1, NUM_VOTERS + 1):
-        voter_id = f"VOTER{i:03d}"         # e.g. VOTER001, VOTER002...
-        add_voter(db, voter_id)
 
-    print("[+] Voters generated.")
+def generate_voters(conn, count: int):
+    print(f"[*] Generating {count:,} voters...")
+    for start in range(1, count + 1, INSERT_BATCH):
+        conn.execute(insert(Voter), [
+            {"id": i, "voter_id": voter_id(i), "voter_hash": voter_hash(i)}
+            for i in range(start, min(start + INSERT_BATCH, count + 1))
+        ])
 
 
-def generate_candidates(db: Session):
-    print(f"[*] Adding {len(CANDIDATE_NAMES)} candidates...")
+# CHAIN
 
-    for name in CANDIDATE_NAMES:
-        add_candidate(db, name)
+def seal(index: int, transactions: list, previous_hash: str, timestamp: float) -> Block:
+    """
+    A sealed block with a chosen timestamp (the time of its last vote).
+    """
+    block = Block(index, transactions, previous_hash)
+    block.timestamp = timestamp
+    block.hash = block.compute_hash()
+    return block
 
-    print("[+] Candidates created.")
 
+def generate_chain(conn, store, args, epoch: int, candidate_ids: list, rng) -> int:
+    """
+    Streams the sealed chain into the chain store and the ledger tables,
+    plus the participation rows of every voter in it.
+    Returns the number of blocks (genesis included).
+    """
+    voters_voting = int(round(args.voters * args.turnout))
+    print(f"[*] Sealing {voters_voting:,} votes into blocks of {args.block_size:,}...")
+
+    start = args.start if args.start is not None else time.time() - args.hours * 3600
+    timestamps = start + vote_offsets(rng, voters_voting, args.hours * 3600, args.distribution)
+
+    # who votes (in arrival order) and for whom
+    voters = rng.choice(np.arange(1, args.voters + 1), voters_voting, replace=False)
+    weights = np.asarray(args.weights or [1.0] * len(candidate_ids))
+    choices = rng.choice(np.asarray(candidate_ids), voters_voting, p=weights / weights.sum())
+
+    genesis = seal(0, [], "0", start)
+    store.append_blocks([genesis])
+    conn.execute(insert(BlockRecord), [block_row(genesis, args.election_id, epoch)])
+
+    previous = genesis
+    for offset in range(0, voters_voting, args.block_size):
+        end = min(offset + args.block_size, voters_voting)
+
+        transactions = []
+        for i in range(offset, end):
+            tx = VoteTransaction(voter_hash(int(voters[i])), int(choices[i]))
+            tx.timestamp = float(timestamps[i])
+            transactions.append(tx)
+
+        block = seal(previous.index + 1, transactions, previous.hash, transactions[-1].timestamp)
+        store.append_blocks([block])
+
+        conn.execute(insert(BlockRecord), [block_row(block, args.election_id, epoch)])
+        conn.execute(insert(VoteRecord), [
+            {
+                "election_id": args.election_id,
+                "epoch": epoch,
+                "block_index": block.index,
+                "voter_hash": tx.voter_hash,
+                "candidate_id": tx.candidate_id,
+                "timestamp": tx.timestamp
+            }
+            for tx in transactions
+        ])
+        conn.execute(insert(VoterParticipation), [
+            {"election_id": args.election_id, "voter_id": voter_id(int(v)), "epoch": epoch}
+            for v in voters[offset:end]
+        ])
+
+        previous = block
+        if block.index % 50 == 0:
+            print(f"    block {block.index:,} ({end:,} votes)")
+
+    return previous.index + 1
+
+
+def block_row(block: Block, election_id: int, epoch: int) -> dict:
+    return {
+        "election_id": election_id,
+        "epoch": epoch,
+        "block_index": block.index,
+        "timestamp": block.timestamp,
+        "previous_hash": block.previous_hash,
+        "hash": block.hash
+    }
+
+
+# MAIN
 
 def main():
+    args = parse_args()
+    started = time.perf_counter()
+
     print("=== VoteChain Test Data Generator ===")
-    print("Creating tables if not present...")
+    config.ensure_data_dir()
+    ensure_schema(engine)
+
+    rng = np.random.default_rng(args.seed)
+    status = ElectionStatus.ENDED if args.status == "ended" else ElectionStatus.ONGOING
+
+    with engine.connect() as conn:
+        # bulk load: durability is pointless for throwaway data
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        conn.commit()
 
-    Base.metadata.create_all(bind=engine)
+        with conn.begin():
+            epoch = election_epoch(conn, args.election_id)
+            store = SqliteChainStore(chain_store_path(args.election_id, epoch))
 
-    db = SessionLocal()
+            if args.clear:
+                clear_old_data(conn, args.election_id)
+                store.clear()
+            elif conn.execute(select(func.count(Voter.id))).scalar():
+                print("[!] Voters already exist; rerun with --clear.")
+                return
+            elif store.block_count():
+                print(f"[!] {store.path} already holds blocks; rerun with --clear.")
+                return
 
-    clear_old = input("Clear old data? (y/n): ").strip().lower()
-    if clear_old == "y":
-        clear_old_data(db)
+            prepare_election(conn, args.election_id, status)
+            candidate_ids = generate_candidates(conn, args.election_id, args.candidates)
+            generate_voters(conn, args.voters)
+            print("[+] Voters and candidates created.")
 
-    generate_voters(db)
-    generate_candidates(db)
+            blocks = generate_chain(conn, store, args, epoch, candidate_ids, rng)
 
-    db.close()
-    print("\nDone.")
-    print("You now have sample voters and candidates in your database.")
+    elapsed = time.perf_counter() - started
+    print(f"[+] Sealed {blocks:,} blocks into {store.path}")
+    if config.CHAIN_BACKEND == "memory":
+        print("[!] VOTECHAIN_CHAIN_BACKEND=memory does not resume chains from disk;")
+        print("    run the server with the disk or sqlite backend to load this one.")
+    print(f"\nDone in {elapsed:.1f}s.")
 
 
 if __name__ == "__main__":
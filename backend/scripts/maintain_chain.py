@@ -0,0 +1,404 @@
+import argparse
+import os
+import time
+from pathlib import Path
+
+from sqlalchemy import delete, distinct, func, insert, select
+
+from backend import config
+from backend.blockchain.columns import get_columns, reset_columns
+from backend.blockchain.journal import MempoolJournal, slot_paths
+from backend.blockchain.shared import chain_store_path, journal_path
+from backend.blockchain.store import SqliteChainStore
+from backend.blockchain.tally import tally_store
+from backend.blockchain.verify import verify_store
+from backend.database.session import engine
+from backend.database.models import (
+    Voter,
+    VoterParticipation,
+    ElectionState,
+    BlockRecord,
+    VoteRecord
+)
+
+
+# OFFLINE CHAIN MAINTENANCE
+#
+# Works on the persisted chain store of one election and on the
+# database, with the API server stopped:
+#
+#   verify    re-hash every block in parallel, check indexes and links
+#   rebuild   rebuild the ledger tables and analytics columns from the
+#             chain store, reindex, and recount
+#   check     cross-check voted flags (participation rows) against the
+#             sealed ballots
+#   compact   drop sealed votes from the mempool journal, checkpoint and
+#             VACUUM the chain store and the database
+#
+# Every command reports blocks/s and votes/s, to size maintenance windows.
+#
+#   python -m backend.scripts.maintain_chain verify --workers 8
+#   python -m backend.scripts.maintain_chain rebuild --election-id 2
+#   python -m backend.scripts.maintain_chain check
+#   python -m backend.scripts.maintain_chain compact
+
+
+# blocks per read / insert batch
+BATCH_BLOCKS = 50
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="VoteChain offline chain maintenance")
+    parser.add_argument("--election-id", type=int, default=config.DEFAULT_ELECTION_ID)
+    parser.add_argument("--store", type=Path, help="chain store file (overrides --election-id)")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    verify = commands.add_parser("verify", help="verify every block of the chain")
+    verify.add_argument("--workers", type=int, default=config.TALLY_WORKERS)
+    verify.add_argument("--chunk-blocks", type=int, default=100, help="blocks per work unit")
+
+    rebuild = commands.add_parser("rebuild", help="rebuild ledger tables, columns and tallies")
+    rebuild.add_argument("--workers", type=int, default=config.TALLY_WORKERS)
+    rebuild.add_argument("--skip-verify", action="store_true", help="rebuild without verifying first")
+
+    commands.add_parser("check", help="cross-check voted flags against sealed ballots")
+    commands.add_parser("compact", help="compact the journal, chain store and database")
+
+    return parser.parse_args()
+
+
+def rate(blocks: int, votes: int, seconds: float) -> str:
+    seconds = max(seconds, 1e-9)
+    return f"{blocks / seconds:,.0f} blocks/s, {votes / seconds:,.0f} votes/s"
+
+
+def stream_blocks(store: SqliteChainStore):
+    """
+    Yields the stored blocks in batches of BATCH_BLOCKS, in chain order.
+    """
+    end = store.last_index() + 1
+    for lo in range(0, end, BATCH_BLOCKS):
+        yield store.load_blocks(lo, min(lo + BATCH_BLOCKS, end))
+
+
+def file_size(path) -> int:
+    """
+    Size of an SQLite file including its WAL.
+    """
+    return sum(
+        os.path.getsize(p) for p in (str(path), f"{path}-wal") if os.path.exists(p)
+    )
+
+
+def election_epoch(election_id: int) -> int:
+    """
+    Current epoch of the election: whose chain store, journal and
+    participation rows are maintained.
+    """
+    with engine.connect() as conn:
+        epoch = conn.execute(
+            select(ElectionState.epoch).where(ElectionState.id == election_id)
+        ).scalar()
+    return epoch or 0
+
+
+def sqlite_path() -> Path:
+    return Path(engine.url.database) if engine.dialect.name == "sqlite" else None
+
+
+# VERIFY
+
+def run_verify(store: SqliteChainStore, workers: int, chunk_blocks: int) -> bool:
+    total = store.last_index() + 1
+    started = time.perf_counter()
+    last_report = [0.0]
+
+    def progress(blocks, votes):
+        now = time.perf_counter()
+        if now - last_report[0] >= 1.0 or blocks == total:
+            last_report[0] = now
+            print(
+                f"    {blocks:,}/{total:,} blocks ({100 * blocks / max(total, 1):5.1f}%)  "
+                f"{rate(blocks, votes, now - started)}"
+            )
+
+    print(f"[*] Verifying {total:,} blocks with {workers} workers...")
+    report = verify_store(store.path, workers=workers, chunk_blocks=chunk_blocks, progress=progress)
+
+    for index, problem in report["problems"][:20]:
+        print(f"[!] block {index}: {problem}")
+    if len(report["problems"]) > 20:
+        print(f"[!] ... {len(report['problems']) - 20} more")
+
+    print(
+        f"[{'+' if not report['problems'] else '!'}] {report['blocks']:,} blocks, "
+        f"{report['votes']:,} votes, {len(report['problems'])} problems "
+        f"in {report['seconds']:.2f}s ({rate(report['blocks'], report['votes'], report['seconds'])})"
+    )
+    return not report["problems"]
+
+
+# REBUILD
+
+def rebuild_ledger(store: SqliteChainStore, election_id: int, epoch: int):
+    """
+    Rewrites the blocks / vote_transactions rows of the election's
+    epoch from the chain store, in one transaction.
+    """
+    started = time.perf_counter()
+    blocks = votes = 0
+
+    with engine.begin() as conn:
+        conn.execute(delete(VoteRecord).where(
+            VoteRecord.election_id == election_id, VoteRecord.epoch == epoch
+        ))
+        conn.execute(delete(BlockRecord).where(
+            BlockRecord.election_id == election_id, BlockRecord.epoch == epoch
+        ))
+
+        for batch in stream_blocks(store):
+            conn.execute(insert(BlockRecord), [
+                {
+                    "election_id": election_id,
+                    "epoch": epoch,
+                    "block_index": block.index,
+                    "timestamp": block.timestamp,
+                    "previous_hash": block.previous_hash,
+                    "hash": block.hash
+                }
+                for block in batch
+            ])
+            rows = [
+                {
+                    "election_id": election_id,
+                    "epoch": epoch,
+                    "block_index": block.index,
+                    "voter_hash": tx.voter_hash,
+                    "candidate_id": tx.candidate_id,
+                    "timestamp": tx.timestamp
+                }
+                for block in batch
+                for tx in block.transactions
+            ]
+            if rows:
+                conn.execute(insert(VoteRecord), rows)
+            blocks += len(batch)
+            votes += len(rows)
+
+    elapsed = time.perf_counter() - started
+    print(f"[+] Ledger tables: {blocks:,} blocks, {votes:,} votes in {elapsed:.2f}s ({rate(blocks, votes, elapsed)})")
+
+
+def rebuild_columns(store: SqliteChainStore, election_id: int):
+    started = time.perf_counter()
+    reset_columns(election_id)
+    columns = get_columns(election_id)
+
+    blocks = votes = 0
+    for batch in stream_blocks(store):
+        votes += columns.append_blocks(batch)
+        blocks += len(batch)
+
+    elapsed = time.perf_counter() - started
+    print(f"[+] Analytics columns: {votes:,} votes in {elapsed:.2f}s ({rate(blocks, votes, elapsed)})")
+
+
+def reindex_database():
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for table in (BlockRecord, VoteRecord, VoterParticipation, Voter):
+            conn.exec_driver_sql(f"REINDEX {table.__tablename__}")
+        conn.exec_driver_sql("ANALYZE")
+    print(f"[+] Database indexes rebuilt in {time.perf_counter() - started:.2f}s")
+
+
+def recount(store: SqliteChainStore, election_id: int, epoch: int, workers: int) -> bool:
+    started = time.perf_counter()
+    chain_counts = tally_store(store.path, workers=workers)
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        ledger_counts = dict(conn.execute(
+            select(VoteRecord.candidate_id, func.count(VoteRecord.id))
+            .where(VoteRecord.election_id == election_id, VoteRecord.epoch == epoch)
+            .group_by(VoteRecord.candidate_id)
+        ).all())
+
+    votes = sum(chain_counts.values())
+    print(f"[*] Recount: {votes:,} votes in {elapsed:.2f}s ({rate(store.last_index() + 1, votes, elapsed)})")
+    for candidate_id in sorted(set(chain_counts) | set(ledger_counts)):
+        chain_votes = chain_counts.get(candidate_id, 0)
+        ledger_votes = ledger_counts.get(candidate_id, 0)
+        marker = "" if chain_votes == ledger_votes else f"   [!] ledger has {ledger_votes:,}"
+        print(f"    candidate {candidate_id:>6}: {chain_votes:>12,}{marker}")
+
+    return chain_counts == ledger_counts
+
+
+def run_rebuild(store: SqliteChainStore, election_id: int, epoch: int, workers: int,
+                skip_verify: bool) -> bool:
+    if not skip_verify and not run_verify(store, workers, 100):
+        print("[!] Chain failed verification; not rebuilding from it (use --skip-verify to force).")
+        return False
+
+    rebuild_ledger(store, election_id, epoch)
+    rebuild_columns(store, election_id)
+    reindex_database()
+    return recount(store, election_id, epoch, workers)
+
+
+# CHECK
+
+def run_check(store: SqliteChainStore, election_id: int, epoch: int) -> bool:
+    """
+    Every participation row must have exactly one sealed ballot, and
+    every sealed ballot a participation row. Votes still in the mempool
+    journal explain voted flags without a sealed ballot.
+    """
+    started = time.perf_counter()
+
+    voted_hash = (
+        select(Voter.voter_hash)
+        .join(VoterParticipation, VoterParticipation.voter_id == Voter.voter_id)
+        .where(VoterParticipation.election_id == election_id, VoterParticipation.epoch == epoch)
+    )
+    sealed_hash = select(VoteRecord.voter_hash).where(
+        VoteRecord.election_id == election_id, VoteRecord.epoch == epoch
+    )
+
+    with engine.connect() as conn:
+        voted = conn.execute(
+            select(func.count(VoterParticipation.id))
+            .where(VoterParticipation.election_id == election_id, VoterParticipation.epoch == epoch)
+        ).scalar()
+        sealed = conn.execute(
+            select(func.count(VoteRecord.id))
+            .where(VoteRecord.election_id == election_id, VoteRecord.epoch == epoch)
+        ).scalar()
+        sealed_voters = conn.execute(
+            select(func.count(distinct(VoteRecord.voter_hash)))
+            .where(VoteRecord.election_id == election_id, VoteRecord.epoch == epoch)
+        ).scalar()
+        voted_unsealed = set(conn.execute(voted_hash.except_(sealed_hash)).scalars())
+        sealed_unvoted = conn.execute(
+            select(func.count()).select_from(sealed_hash.except_(voted_hash).subquery())
+        ).scalar()
+
+    chain_votes = sum(header[4] for header in store.load_headers())
+
+    pending = set()
+    for path in slot_paths(journal_path(election_id, epoch)):
+        journal = MempoolJournal(path)
+        pending.update(tx.voter_hash for tx in journal.replay())
+        journal.close()
+
+    elapsed = time.perf_counter() - started
+    duplicates = sealed - sealed_voters
+    unexplained = voted_unsealed - pending
+
+    print(f"[*] Voted flags (participation rows): {voted:,}")
+    print(f"[*] Sealed ballots (ledger tables):   {sealed:,}")
+    print(f"[*] Sealed ballots (chain store):     {chain_votes:,}")
+    print(f"[*] Pending in the mempool journal:   {len(pending):,}")
+
+    ok = True
+    if chain_votes != sealed:
+        ok = False
+        print("[!] Ledger tables and chain store disagree; run `rebuild`.")
+    if duplicates:
+        ok = False
+        print(f"[!] {duplicates:,} voters have more than one sealed ballot")
+    if unexplained:
+        ok = False
+        print(f"[!] {len(unexplained):,} voters are marked voted without a sealed or pending ballot")
+    if sealed_unvoted:
+        ok = False
+        print(f"[!] {sealed_unvoted:,} sealed ballots belong to voters not marked voted")
+
+    print(f"[{'+' if ok else '!'}] Checked in {elapsed:.2f}s ({rate(store.last_index() + 1, sealed, elapsed)})")
+    return ok
+
+
+# COMPACT
+
+def compact_journal(store: SqliteChainStore, election_id: int, epoch: int):
+    for path in slot_paths(journal_path(election_id, epoch)):
+        journal = MempoolJournal(path)
+        pending = journal.replay()
+        if pending:
+            # drop entries that were sealed but never discarded (crash after sealing)
+            hashes = {tx.voter_hash for tx in pending}
+            sealed = [
+                tx
+                for batch in stream_blocks(store)
+                for block in batch
+                for tx in block.transactions
+                if tx.voter_hash in hashes
+            ]
+            journal.discard(sealed)
+            print(f"[+] Journal {path.name}: {len(pending):,} entries, {len(sealed):,} already sealed dropped")
+        journal.close()
+
+
+def compact_file(label: str, path: Path, compact):
+    before = file_size(path)
+    started = time.perf_counter()
+    compact()
+    elapsed = time.perf_counter() - started
+    after = file_size(path)
+    print(f"[+] {label}: {before / 1e6:,.1f} MB -> {after / 1e6:,.1f} MB in {elapsed:.2f}s")
+    return elapsed
+
+
+def compact_database():
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.exec_driver_sql("VACUUM")
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+
+def run_compact(store: SqliteChainStore, election_id: int, epoch: int) -> bool:
+    compact_journal(store, election_id, epoch)
+
+    elapsed = compact_file("Chain store", Path(store.path), store.compact)
+    votes = sum(header[4] for header in store.load_headers())
+    print(f"    ({rate(store.last_index() + 1, votes, elapsed)})")
+
+    database = sqlite_path()
+    if database is not None:
+        compact_file("Database", database, compact_database)
+    return True
+
+
+# MAIN
+
+def main():
+    args = parse_args()
+    epoch = election_epoch(args.election_id)
+    path = args.store or chain_store_path(args.election_id, epoch)
+
+    if not path.exists():
+        print(f"[!] Chain store not found: {path}")
+        raise SystemExit(1)
+
+    store = SqliteChainStore(path)
+
+    print(f"=== VoteChain Chain Maintenance: {args.command} ===")
+    print(f"[*] Store:    {path}")
+    print(f"[*] Election: {args.election_id} (epoch {epoch})")
+
+    if args.command == "verify":
+        ok = run_verify(store, args.workers, args.chunk_blocks)
+    elif args.command == "rebuild":
+        ok = run_rebuild(store, args.election_id, epoch, args.workers, args.skip_verify)
+    elif args.command == "check":
+        ok = run_check(store, args.election_id, epoch)
+    else:
+        ok = run_compact(store, args.election_id, epoch)
+
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
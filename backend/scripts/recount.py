@@ -0,0 +1,64 @@
+import argparse
+import time
+from pathlib import Path
+
+from backend import config
+from backend.blockchain.shared import chain_store_path
+from backend.blockchain.tally import tally_store
+
+
+# OFFLINE RECOUNT
+#
+# Recounts an election straight from its persisted chain store with the
+# parallel tally engine. Does not need the API server or the database.
+#
+#   python -m backend.scripts.recount --election-id 1 --workers 8
+#   python -m backend.scripts.recount --store data/chain-1.db --since 1700000000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="VoteChain offline recount")
+    parser.add_argument("--election-id", type=int, default=config.DEFAULT_ELECTION_ID)
+    parser.add_argument("--epoch", type=int, default=0, help="election epoch (resets so far)")
+    parser.add_argument("--store", type=Path, help="chain store file (overrides --election-id)")
+    parser.add_argument("--workers", type=int, default=config.TALLY_WORKERS)
+    parser.add_argument("--start-block", type=int)
+    parser.add_argument("--end-block", type=int, help="exclusive")
+    parser.add_argument("--since", type=float, help="UNIX timestamp, inclusive")
+    parser.add_argument("--until", type=float, help="UNIX timestamp, exclusive")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    path = args.store or chain_store_path(args.election_id, args.epoch)
+
+    if not path.exists():
+        print(f"[!] Chain store not found: {path}")
+        raise SystemExit(1)
+
+    print("=== VoteChain Recount ===")
+    print(f"[*] Store:   {path}")
+    print(f"[*] Workers: {args.workers}")
+
+    started = time.perf_counter()
+    counts = tally_store(
+        path,
+        start_block=args.start_block,
+        end_block=args.end_block,
+        start_time=args.since,
+        end_time=args.until,
+        workers=args.workers
+    )
+    elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    print()
+    for candidate_id, votes in sorted(counts.items()):
+        print(f"  candidate {candidate_id:>6}: {votes:>10}")
+    print(f"  {'total':>16}: {total:>10}")
+    print(f"\n[+] Counted {total} votes in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
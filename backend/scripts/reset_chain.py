@@ -1,65 +1,94 @@
-from sqlalchemy.orm import Session
-from backend.database.session import SessionLocal, Base, engine
-from backend.database.models import Voter, Candidate
-from backend.database.crud import add_candidate, add_voter
-
-
-# CONFIG
-
-NUM_VOTERS = 20
-CANDIDATE_NAMES = [
-    "Alice Johnson",
-    "Bob Singh",
-    "Charlie Mehra"
-]
-
-
-# MAIN
-
-def clear_old_data(db: Session):
-    db.query(Voter).delete()
-    db.query(Candidate).delete()
-    db.commit()
-    print("[*] Old data cleared.")
-
-
-def generate_voters(db: Session):
-    print(f"[*] Generating {NUM_VOTERS} voters...")
-
-    for i in range(1, NUM_VOTERS + 1):
-        voter_id = f"VOTER{i:03d}"         # e.g. VOTER001, VOTER002...
-        add_voter(db, voter_id)
-
-    print("[+] Voters generated.")
-
-
-def generate_candidates(db: Session):
-    print(f"[*] Adding {len(CANDIDATE_NAMES)} candidates...")
-
-    for name in CANDIDATE_NAMES:
-        add_candidate(db, name)
-
-    print("[+] Candidates created.")
+import argparse
+
+from backend import config
+from backend.blockchain.archiver import ChainArchiver
+from backend.blockchain.chain import Blockchain
+from backend.blockchain.columns import reset_columns
+from backend.blockchain.journal import MempoolJournal, slot_paths
+from backend.blockchain.segments import retire_archive
+from backend.blockchain.shared import chain_store_path, journal_path
+from backend.blockchain.store import SqliteChainStore
+from backend.database.session import SessionLocal
+from backend.database.crud import (
+    get_election_state,
+    purge_sealed_blocks,
+    reset_election
+)
+
+
+# OFFLINE CHAIN RESET
+#
+# What POST /admin/election/clear does, with the server stopped: starts
+# a new epoch of the election (its ballots stop counting, status back to
+# NOT_STARTED), packs the old chain into the retired epoch's archive
+# segments, clears its mempool journal, ledger rows and analytics
+# columns. Voters and candidates are kept.
+#
+#   python -m backend.scripts.reset_chain --election-id 2 --yes
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="VoteChain offline chain reset")
+    parser.add_argument("--election-id", type=int, default=config.DEFAULT_ELECTION_ID)
+    parser.add_argument("--yes", action="store_true", help="confirm: the election's votes stop counting")
+    return parser.parse_args()
+
+
+def purge_ledger(election_id: int, epoch: int) -> int:
+    # runs on the archiver thread: its own session
+    db = SessionLocal()
+    try:
+        return purge_sealed_blocks(db, election_id, epoch)
+    finally:
+        db.close()
 
 
 def main():
-    print("=== VoteChain Test Data Generator ===")
-    print("Creating tables if not present...")
+    args = parse_args()
 
-    Base.metadata.create_all(bind=engine)
+    print("=== VoteChain Chain Reset ===")
 
     db = SessionLocal()
+    try:
+        state = get_election_state(db, args.election_id)
+        if state is None:
+            print(f"[!] Election {args.election_id} does not exist.")
+            raise SystemExit(1)
+
+        if not args.yes:
+            print(f"[!] This resets every vote of election {args.election_id}; rerun with --yes.")
+            raise SystemExit(1)
+
+        old_epoch = state.epoch
+        store_path = chain_store_path(args.election_id, old_epoch)
+        chain = None
+        if store_path.exists():
+            chain = Blockchain(args.election_id, block_store=SqliteChainStore(store_path))
+
+        for path in slot_paths(journal_path(args.election_id, old_epoch)):
+            MempoolJournal(path).close(remove=True)
+            print(f"[*] Mempool journal {path.name} cleared.")
+
+        epoch = reset_election(db, args.election_id)
+        print(f"[*] Election {args.election_id} now at epoch {epoch}.")
+
+        # same archival as the server's, run to completion here
+        archiver = ChainArchiver()
+        archiver.submit(
+            args.election_id, old_epoch, chain, retire_archive(args.election_id, old_epoch),
+            purge=lambda: purge_ledger(args.election_id, old_epoch)
+        )
+        archiver.wait(args.election_id)
+        archiver.stop()
+        for error in archiver.errors:
+            print(f"[!] Archival failed: {error['error']}")
+
+        reset_columns(args.election_id)
+        print("[*] Old chain archived, ledger rows and analytics columns dropped.")
+    finally:
+        db.close()
 
-    clear_old = input("Clear old data? (y/n): ").strip().lower()
-    if clear_old == "y":
-        clear_old_data(db)
-
-    generate_voters(db)
-    generate_candidates(db)
-
-    db.close()
     print("\nDone.")
-    print("You now have sample voters and candidates in your database.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+import argparse
+import os
+from pathlib import Path
+
+import uvicorn
+
+from backend import config
+from backend.database.session import SessionLocal, engine
+from backend.database.schema import ensure_schema
+from backend.database.crud import get_live_counter_seeds
+from backend.utils.live_counters import LiveCounters
+
+
+# MULTI-WORKER LAUNCHER
+#
+# Runs uvicorn with several worker processes sharing one block of live
+# vote counters (ballots accepted / sealed / pending per election), so
+# /election/status, /admin/turnout and /admin/metrics report every
+# worker's ballots. The block is created and seeded from the database
+# here, before any worker starts; workers attach to it on startup
+# (VOTECHAIN_SHARED_COUNTERS). It lives in /dev/shm when available and
+# is removed on exit.
+#
+# Every worker also needs the same mempool and ledger, or ending an
+# election would seal only one worker's ballots: with more than one
+# worker the chain backend is "sqlite" (the default here), and any
+# other VOTECHAIN_CHAIN_BACKEND is refused.
+#
+#   python -m backend.scripts.serve --workers 4 --port 8000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="VoteChain multi-worker server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--counters", type=Path, help="counter block file (default: /dev/shm)")
+    return parser.parse_args()
+
+
+def default_counters_path() -> Path:
+    shm = Path("/dev/shm")
+    if shm.is_dir():
+        return shm / f"votechain-{os.getpid()}.counters"
+    return config.DATA_DIR / "counters.shm"
+
+
+def shared_chain_backend(workers: int) -> bool:
+    """
+    Makes the workers share one chain store; False if the configured
+    backend would give each worker its own mempool.
+    """
+    if workers <= 1:
+        return True
+    backend = os.environ.setdefault("VOTECHAIN_CHAIN_BACKEND", "sqlite")
+    return backend == "sqlite"
+
+
+def main():
+    args = parse_args()
+
+    print("=== VoteChain Server ===")
+    if not shared_chain_backend(args.workers):
+        print(
+            f"[!] VOTECHAIN_CHAIN_BACKEND={os.environ['VOTECHAIN_CHAIN_BACKEND']} keeps "
+            f"a mempool per worker; use sqlite or --workers 1"
+        )
+        raise SystemExit(1)
+    print(f"[*] Chain backend: {os.environ.get('VOTECHAIN_CHAIN_BACKEND', config.CHAIN_BACKEND)}")
+    config.ensure_data_dir()
+    ensure_schema(engine)
+
+    db = SessionLocal()
+    try:
+        seeds = get_live_counter_seeds(db)
+    finally:
+        db.close()
+
+    path = args.counters or default_counters_path()
+    LiveCounters.create(path, seeds)
+    print(f"[*] Live counters for {len(seeds)} election(s) in {path}")
+
+    # inherited by the worker processes (read by backend.config)
+    os.environ["VOTECHAIN_SHARED_COUNTERS"] = str(path)
+    try:
+        uvicorn.run("backend.app:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+
+# DATABASE STRESS TEST
+#
+# Mixed login/vote/registration workload from many threads against one
+# SQLite file, run twice:
+#
+#   shared: every thread reads and writes through its own SessionLocal
+#           session (the previous access layer)
+#   split:  reads through the read-only pool, writes queued to the
+#           single writer thread (session.read_engine + writer.py)
+#
+# Reports throughput and "database is locked" errors for each.
+#
+#   python -m backend.scripts.stress_db --threads 32 --ops 300 --write-ratio 0.3
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="VoteChain database stress test")
+    parser.add_argument("--voters", type=int, default=5_000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=300, help="operations per thread")
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    return parser.parse_args()
+
+
+def seed(url: str, voters: int):
+    from backend.database.session import Base
+    from backend.database.models import Voter, Candidate, ElectionState, ElectionStatus
+
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(ElectionState(id=1, name="Stress", status=ElectionStatus.ONGOING))
+    db.add_all([Candidate(name=f"C{i}", election_id=1) for i in range(5)])
+    db.bulk_save_objects([Voter(voter_id=f"V{i}", voter_hash=f"h{i}") for i in range(voters)])
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def run(args, read_session, write):
+    """
+    read_session(): new session for reads; write(fn, *args) performs a write.
+    """
+    from backend.database import crud
+
+    counter = iter(range(10**9))
+    counter_lock = threading.Lock()
+    stats = {"ops": 0, "locked": 0, "other_errors": 0}
+    stats_lock = threading.Lock()
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        ops = locked = other = 0
+        for _ in range(args.ops):
+            try:
+                if rng.random() < args.write_ratio:
+                    with counter_lock:
+                        n = next(counter)
+                    if n % 2:
+                        write(crud.register_voter, f"NEW{n}", f"new{n}")
+                    else:
+                        write(crud.mark_voter_as_voted, f"V{n % args.voters}", 1, 0)
+                else:
+                    db = read_session()
+                    try:
+                        crud.get_voter_by_id(db, f"V{rng.randrange(args.voters)}")
+                        crud.get_all_candidates(db, 1)
+                        crud.get_election_state(db, 1)
+                    finally:
+                        db.close()
+                ops += 1
+            except OperationalError as e:
+                if "locked" in str(e):
+                    locked += 1
+                else:
+                    other += 1
+        with stats_lock:
+            stats["ops"] += ops
+            stats["locked"] += locked
+            stats["other_errors"] += other
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def report(name, stats):
+    print(f"[+] {name:<7} {stats['ops'] / stats['seconds']:>9,.0f} ops/s   "
+          f"ok {stats['ops']:>7,}   locked {stats['locked']:>5,}   "
+          f"other errors {stats['other_errors']:>3,}   ({stats['seconds']:.1f} s)")
+
+
+def main():
+    args = parse_args()
+
+    print("=== VoteChain Database Stress Test ===")
+    print(f"[*] {args.threads} threads x {args.ops} ops, "
+          f"{args.write_ratio:.0%} writes, {args.voters:,} voters")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # shared: one engine, reads and writes on per-thread sessions
+        url = f"sqlite:///{os.path.join(tmp, 'shared.db')}"
+        seed(url, args.voters)
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        Session = sessionmaker(autoflush=False, bind=engine)
+
+        def shared_write(fn, *fn_args):
+            db = Session()
+            try:
+                return fn(db, *fn_args)
+            finally:
+                db.close()
+
+        report("shared", run(args, Session, shared_write))
+        engine.dispose()
+
+        # split: read-only pool + single writer thread
+        from backend.database.session import configure_sqlite
+        from backend.database.writer import DatabaseWriter
+
+        url = f"sqlite:///{os.path.join(tmp, 'split.db')}"
+        seed(url, args.voters)
+        write_engine = create_engine(url, connect_args={"check_same_thread": False})
+        configure_sqlite(write_engine)
+        read_engine = create_engine(url, connect_args={"check_same_thread": False}, pool_size=8)
+        configure_sqlite(read_engine, read_only=True)
+
+        writer = DatabaseWriter(sessionmaker(bind=write_engine, expire_on_commit=False))
+        report("split", run(args, sessionmaker(bind=read_engine), writer.run))
+        writer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import bisect
+import threading
+import time
+from array import array
+
+from .. import config
+from ..database.crud import get_voter_index_rows, get_participation_rows
+
+
+# REGISTERED-VOTER INDEX
+#
+# Keys are the first 64 bits of the voter's SHA-256 hash (Voter.voter_hash),
+# kept in a sorted array('Q') with the voter row ids alongside: ~16 bytes per
+# voter. New registrations go to a small dict that is merged into the sorted
+# arrays once it grows, so registering stays O(1) amortized.
+
+MERGE_THRESHOLD = 4096
+
+
+def hash_key(voter_hash: str) -> int:
+    return int(voter_hash[:16], 16)
+
+
+class VotedBitmap:
+    """
+    One bit per voter row id.
+    """
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def add(self, row_id: int):
+        byte = row_id >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits) + 1024))
+        self.bits[byte] |= 1 << (row_id & 7)
+
+    def __contains__(self, row_id: int) -> bool:
+        byte = row_id >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (row_id & 7)))
+
+
+class VoterIndex:
+    """
+    In-memory view of the voters table for the login and vote paths:
+
+      - row_id(voter_hash): registered voter's row id, or None.
+        A miss means the voter is not registered and needs no query;
+        a hit is still confirmed against the database.
+      - has_voted(election_id, epoch, row_id): exact bitmap of voters
+        whose ballot claim succeeded in that epoch of the election.
+        Only ever set after the database accepted (or refused a
+        duplicate) claim, so a set bit is always a true "already voted".
+
+    Voters registered by other worker processes are picked up on a
+    miss (see routes.auth.lookup_voter_row), at most once every
+    VOTER_INDEX_REFRESH_SECONDS. Voted bits are per process, but keyed
+    by epoch: once an election is reset (by any worker) requests carry
+    the new epoch, and the old bitmap simply stops matching.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._keys = array("Q")         # sorted hash keys
+        self._rows = array("q")         # voter row ids, parallel to _keys
+        self._delta = {}                # recent registrations, key -> row id
+        self._voted = {}                # election_id -> (epoch, VotedBitmap)
+        self.max_row_id = 0
+        self._refreshed_at = 0.0
+
+    def clear(self):
+        """
+        Forgets everything (tests, full resets); the next miss refreshes.
+        """
+        with self._lock:
+            self._reset()
+
+    # --------------------------------------------------------
+    # MEMBERSHIP
+    # --------------------------------------------------------
+
+    def load(self, voters, participation=()):
+        """
+        Rebuilds the index from (row_id, voter_hash) pairs and
+        (election_id, epoch, row_id) ballots of the current epochs.
+        """
+        pairs = sorted((hash_key(voter_hash), row_id) for row_id, voter_hash in voters)
+        voted = {}
+        for election_id, epoch, row_id in participation:
+            voted.setdefault(election_id, (epoch, VotedBitmap()))[1].add(row_id)
+
+        with self._lock:
+            self._keys = array("Q", (key for key, _ in pairs))
+            self._rows = array("q", (row for _, row in pairs))
+            self._delta = {}
+            self._voted = voted
+            self.max_row_id = max((row for _, row in pairs), default=0)
+            self._refreshed_at = time.monotonic()
+
+    def add(self, voter_hash: str, row_id: int):
+        with self._lock:
+            self._delta[hash_key(voter_hash)] = row_id
+            self.max_row_id = max(self.max_row_id, row_id)
+            if len(self._delta) >= MERGE_THRESHOLD:
+                self._merge()
+
+    def extend(self, voters):
+        for row_id, voter_hash in voters:
+            self.add(voter_hash, row_id)
+        self._refreshed_at = time.monotonic()
+
+    def _merge(self):
+        pairs = sorted(
+            list(zip(self._keys, self._rows)) + list(self._delta.items())
+        )
+        self._keys = array("Q", (key for key, _ in pairs))
+        self._rows = array("q", (row for _, row in pairs))
+        self._delta = {}
+
+    def row_id(self, voter_hash: str):
+        key = hash_key(voter_hash)
+        with self._lock:
+            row = self._delta.get(key)
+            if row is not None:
+                return row
+            pos = bisect.bisect_left(self._keys, key)
+            if pos < len(self._keys) and self._keys[pos] == key:
+                return self._rows[pos]
+        return None
+
+    def refresh_due(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= config.VOTER_INDEX_REFRESH_SECONDS
+
+    def __len__(self):
+        return len(self._keys) + len(self._delta)
+
+    # --------------------------------------------------------
+    # VOTED BITMAPS
+    # --------------------------------------------------------
+
+    def mark_voted(self, election_id: int, epoch: int, row_id: int):
+        with self._lock:
+            entry = self._voted.get(election_id)
+            if entry is None or entry[0] < epoch:
+                # first ballot of a new epoch: the old bitmap is dropped
+                entry = (epoch, VotedBitmap())
+                self._voted[election_id] = entry
+            if entry[0] == epoch:
+                entry[1].add(row_id)
+
+    def has_voted(self, election_id: int, epoch: int, row_id: int) -> bool:
+        entry = self._voted.get(election_id)
+        return entry is not None and entry[0] == epoch and row_id in entry[1]
+
+    def reset_election(self, election_id: int):
+        with self._lock:
+            self._voted.pop(election_id, None)
+
+
+# shared by all routes of this process
+voter_index = VoterIndex()
+
+
+def load_voter_index(db):
+    """
+    Builds the index from the database (server startup).
+    """
+    voter_index.load(get_voter_index_rows(db), get_participation_rows(db))
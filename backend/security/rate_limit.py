@@ -0,0 +1,162 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+
+from .. import config
+
+
+# TOKEN BUCKET
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills
+    at `rate` tokens per second. Each admitted request costs one token.
+    """
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = now
+
+    def try_acquire(self, now: float) -> float:
+        """
+        Takes a token if one is available.
+        Returns 0 when admitted, otherwise the seconds until the
+        next token is due.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+# BOUNDED BUCKET STORE
+
+class BucketStore:
+    """
+    In-memory buckets keyed by client IP or voter id.
+    Bounded to `max_buckets` entries; the least recently used bucket
+    is evicted first (an evicted key simply starts with a full bucket).
+    """
+
+    def __init__(self, capacity: float, rate: float, max_buckets: int):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.capacity, self.rate, now)
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.try_acquire(now)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# GLOBAL CONCURRENCY LIMIT
+
+class ConcurrencyLimiter:
+    """
+    Caps the number of write requests in flight.
+    Never waits: a request that finds no free slot is rejected.
+    """
+
+    def __init__(self, limit: int):
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def try_enter(self) -> bool:
+        return self._slots.acquire(blocking=False)
+
+    def leave(self):
+        self._slots.release()
+
+
+# ADMISSION CONTROL
+
+def too_many_requests(retry_after: float):
+    raise HTTPException(
+        status_code=429,
+        detail="Too many requests",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+class AdmissionControl:
+    """
+    Per-client-IP and per-voter-id token buckets plus a global
+    concurrency limit on write endpoints. Rejections are a fast 429
+    with Retry-After, before any database work is done.
+    """
+
+    def __init__(self):
+        self.enabled = config.RATE_LIMIT_ENABLED
+        self.ip_buckets = BucketStore(
+            config.RATE_LIMIT_IP_BURST,
+            config.RATE_LIMIT_IP_PER_SECOND,
+            config.RATE_LIMIT_MAX_BUCKETS
+        )
+        self.voter_buckets = BucketStore(
+            config.RATE_LIMIT_VOTER_BURST,
+            config.RATE_LIMIT_VOTER_PER_SECOND,
+            config.RATE_LIMIT_MAX_BUCKETS
+        )
+        self.writes = ConcurrencyLimiter(config.WRITE_CONCURRENCY_LIMIT)
+
+    def admit(self, request: Request, voter_id: str = None):
+        """
+        Charges the caller's IP bucket and, if given, the voter's bucket.
+        """
+        if not self.enabled:
+            return
+
+        wait = self.ip_buckets.hit(client_ip(request))
+        if wait:
+            too_many_requests(wait)
+
+        if voter_id is not None:
+            wait = self.voter_buckets.hit(voter_id)
+            if wait:
+                too_many_requests(wait)
+
+    def write_slot(self):
+        """
+        FastAPI dependency holding one write slot for the request.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        if not self.writes.try_enter():
+            too_many_requests(1)
+        try:
+            yield
+        finally:
+            self.writes.leave()
+
+
+# shared by all routes of this process
+admission = AdmissionControl()
@@ -0,0 +1,64 @@
+import hashlib
+import hmac
+
+from fastapi import HTTPException
+
+from .. import config
+from ..routes.auth import create_token
+
+
+# POLLING STATIONS
+#
+# Stations collect ballots on local kiosks and upload them in batches
+# through a gateway. Gateways and kiosks hold different secrets:
+#
+#   - the gateway logs in with its station's credential
+#     (VOTECHAIN_STATIONS) and gets a "station" token; that credential
+#     cannot sign ballots
+#   - each kiosk signs its ballots with its own key (VOTECHAIN_KIOSKS),
+#     shared only with the server, so the gateway can neither alter nor
+#     forge ballots in transit; the signed message is
+#     "<election_id>:<epoch>:<voter_id>:<candidate_id>" (HMAC-SHA256,
+#     hex), which keeps a ballot from counting in another election or
+#     after a reset (new epoch)
+#
+# A kiosk's ballots are only accepted in uploads of its own station.
+
+
+def station_key(station_id: str):
+    key = config.STATION_KEYS.get(station_id)
+    return key.encode() if key is not None else None
+
+
+def kiosk_key(kiosk_id: str, station_id: str):
+    """
+    Signing key of a kiosk of `station_id`; None for an unknown kiosk
+    or one of another station.
+    """
+    entry = config.KIOSK_KEYS.get(kiosk_id)
+    if entry is None or entry[0] != station_id:
+        return None
+    return entry[1].encode()
+
+
+def sign_ballot(key: bytes, election_id: int, epoch: int, voter_id: str, candidate_id: int) -> str:
+    message = f"{election_id}:{epoch}:{voter_id}:{candidate_id}".encode()
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+
+def verify_ballot(key: bytes, election_id: int, epoch: int, voter_id: str,
+                  candidate_id: int, signature: str) -> bool:
+    expected = sign_ballot(key, election_id, epoch, voter_id, candidate_id)
+    # as bytes: compare_digest refuses non-ASCII str
+    return hmac.compare_digest(expected.encode(), signature.encode())
+
+
+def station_login(station_id: str, key: str):
+    """
+    Returns a JWT token for a configured station's gateway.
+    """
+    expected = station_key(station_id)
+    if expected is None or not hmac.compare_digest(expected, key.encode()):
+        raise HTTPException(status_code=401, detail="Invalid station credentials")
+
+    return {"token": create_token(station_id, "station")}
@@ -1,8 +1,24 @@
+import sqlite3
+import threading
+import time
+
 import pytest
-from backend.blockchain.chain import Blockchain
+from backend import config
+from backend.blockchain import tally
+from backend.blockchain.chain import Blockchain, ForkResolutionError
 from backend.blockchain.transaction import VoteTransaction
 from backend.blockchain.utils import sha256_hash
 from backend.blockchain.block import Block
+from backend.blockchain.columns import VoteColumns
+from backend.blockchain.journal import JournalInUse, MempoolJournal, open_journal
+from backend.blockchain.lazy import MissingBlockError
+from backend.blockchain.monitor import IntegrityMonitor
+from backend.blockchain.registry import ChainRegistry
+from backend.blockchain.shared import SharedBlockchain, journal_path
+from backend.blockchain.store import SqliteChainStore
+from backend.blockchain.tally import tally_chain, tally_store
+from backend.blockchain.turnout import TurnoutSeries
+from backend.blockchain.verify import verify_store
 
 
 # FIXTURE: Fresh blockchain for every test
@@ -138,3 +154,484 @@ def test_consensus_rejects_invalid_chain(chain):
     # Should NOT adopt invalid chain
     assert changed == False
     assert len(chain.chain) == 1
+
+
+# CONCURRENCY TEST (NO LOST / DUPLICATED VOTES)
+
+def test_concurrent_votes_and_sealing_lose_nothing(chain):
+    num_threads = 8
+    votes_per_thread = 500
+    done = threading.Event()
+
+    def voter(thread_no):
+        for i in range(votes_per_thread):
+            chain.add_transaction(VoteTransaction(f"t{thread_no}-v{i}", i % 3))
+
+    def sealer():
+        while not done.is_set():
+            chain.mine_block()
+
+    sealer_thread = threading.Thread(target=sealer)
+    sealer_thread.start()
+
+    voters = [threading.Thread(target=voter, args=(n,)) for n in range(num_threads)]
+    for t in voters:
+        t.start()
+    for t in voters:
+        t.join()
+
+    done.set()
+    sealer_thread.join()
+    chain.mine_block()
+
+    sealed = [tx.voter_hash for block in chain.chain for tx in block.transactions]
+
+    assert len(sealed) == num_threads * votes_per_thread
+    assert len(set(sealed)) == len(sealed)
+    assert chain.current_transactions == []
+
+    for i in range(1, len(chain.chain)):
+        assert chain.chain[i].index == i
+        assert chain.chain[i].previous_hash == chain.chain[i - 1].hash
+
+
+# SHARED CHAIN STORE (MULTI-WORKER)
+
+def test_shared_store_is_one_ledger_across_instances(tmp_path):
+    path = tmp_path / "chain.db"
+    worker_a = SharedBlockchain(SqliteChainStore(path))
+    worker_b = SharedBlockchain(SqliteChainStore(path))
+
+    # both workers agree on one genesis block
+    assert worker_a.chain[0].hash == worker_b.chain[0].hash
+
+    worker_a.add_transaction(VoteTransaction("A", 1))
+    worker_b.add_transaction(VoteTransaction("B", 2))
+    assert len(worker_a.current_transactions) == 2
+    # turnout follows the shared sealed blocks, not each worker's share
+    assert worker_a.turnout.total() == worker_b.turnout.total() == 0
+
+    block = worker_b.mine_block()
+    assert [tx.voter_hash for tx in block.transactions] == ["A", "B"]
+
+    assert len(worker_a.chain) == 2
+    assert worker_a.turnout.total() == worker_b.turnout.total() == 2
+    assert worker_a.last_block().hash == block.hash
+    assert worker_a.last_block().compute_hash() == block.hash
+    assert worker_a.current_transactions == []
+    assert worker_a.mine_block() is None
+
+    # the store holds one branch: peer chains are refused
+    with pytest.raises(ForkResolutionError):
+        worker_a.resolve_conflicts([Blockchain()])
+
+
+# PARALLEL TALLY ENGINE
+
+def test_parallel_tally_matches_serial(chain, tmp_path):
+    for block_no in range(6):
+        for i in range(20):
+            chain.add_transaction(VoteTransaction(f"b{block_no}-{i}", i % 4))
+        chain.mine_block()
+
+    # in-memory chains are counted in one pass in this process
+    assert tally_chain(chain) == chain.tally
+
+    store = SqliteChainStore(tmp_path / "chain.db")
+    store.append_blocks(chain.chain)
+    assert tally_store(store.path, workers=2) == chain.tally
+
+    # block range filter: [1, 3) holds two blocks of 20 votes
+    assert sum(tally_chain(chain, start_block=1, end_block=3).values()) == 40
+    assert sum(tally_store(store.path, start_block=1, end_block=3, workers=2).values()) == 40
+
+    # recounts reuse one worker pool
+    pool = tally._pool
+    assert pool is not None
+    tally_store(store.path, workers=2)
+    assert tally._pool is pool
+    tally.shutdown_pool()
+
+    # time window filter: only votes from the last block
+    cutoff = chain.chain[-1].transactions[0].timestamp
+    assert sum(tally_chain(chain, start_time=cutoff).values()) == 20
+
+
+# DISK-BACKED CHAIN (HEADERS RESIDENT, LRU BODIES)
+
+def test_disk_backed_chain_keeps_bodies_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "BLOCK_CACHE_TRANSACTIONS", 10)
+
+    store = SqliteChainStore(tmp_path / "chain.db")
+    chain = Blockchain(block_store=store)
+
+    for block_no in range(5):
+        for i in range(5):
+            chain.add_transaction(VoteTransaction(f"d{block_no}-{i}", i % 2))
+        chain.mine_block()
+
+    assert len(chain.chain) == 6
+    assert len(chain.chain.cache) <= 2          # 10 transactions = 2 blocks of 5
+    assert chain.last_block().index == 5
+    assert chain.chain[2].transactions[0].voter_hash == "d1-0"
+    assert [b.index for b in chain.chain] == list(range(6))
+    assert all(
+        chain.chain[i].previous_hash == chain.chain[i - 1].hash
+        for i in range(1, 6)
+    )
+
+    # a new instance resumes the persisted chain and its tally
+    resumed = Blockchain(block_store=SqliteChainStore(tmp_path / "chain.db"))
+    assert len(resumed.chain) == 6
+    assert resumed.tally == chain.tally == {0: 15, 1: 10}
+
+
+def test_disk_backed_chain_reports_blocks_lost_from_the_store(tmp_path):
+    store = SqliteChainStore(tmp_path / "chain.db")
+    chain = Blockchain(block_store=store)
+    for block_no in range(4):
+        chain.add_transaction(VoteTransaction(f"l{block_no}", 1))
+        chain.mine_block()
+    lazy = chain.chain
+    conn = store._connect()
+
+    # trailing row gone: no endless loop on the empty batch
+    conn.execute("DELETE FROM blocks WHERE block_index = 4")
+    lazy.cache.clear()
+    with pytest.raises(MissingBlockError) as missing:
+        list(lazy)
+    assert missing.value.index == 4
+    with pytest.raises(MissingBlockError):
+        lazy[-1]
+
+    # middle row gone: the next block is not yielded in its place
+    conn.execute("DELETE FROM blocks WHERE block_index = 2")
+    lazy.cache.clear()
+    seen = []
+    with pytest.raises(MissingBlockError) as missing:
+        for block in lazy:
+            seen.append(block.index)
+    assert missing.value.index == 2
+    assert seen == [0, 1]
+
+
+# MEMORY-MAPPED VOTE COLUMNS
+
+def test_vote_columns_follow_sealed_blocks(chain, tmp_path):
+    columns = VoteColumns(tmp_path / "columns")
+
+    for i in range(6):
+        chain.add_transaction(VoteTransaction(f"c{i}", i % 3))
+    chain.mine_block()
+    assert columns.append_chain(chain) == 6
+
+    for i in range(4):
+        chain.add_transaction(VoteTransaction(f"n{i}", 1))
+    chain.mine_block()
+    assert columns.append_chain(chain) == 4
+    assert columns.append_chain(chain) == 0      # already caught up
+
+    assert columns.tally() == chain.tally == {0: 2, 1: 6, 2: 2}
+    assert columns.per_block_counts() == {1: 6, 2: 4}
+
+    turnout = columns.turnout_histogram(3600)
+    assert turnout["cumulative"][-1] == 10
+
+    # a fresh reader maps the same files
+    reopened = VoteColumns(tmp_path / "columns")
+    assert reopened.tally() == columns.tally()
+    assert reopened.tally(end_time=0) == {}
+
+    # appends exclude each other across instances (worker processes),
+    # and the one that waited re-reads meta before appending
+    for i in range(5):
+        chain.add_transaction(VoteTransaction(f"w{i}", 2))
+    chain.mine_block()
+
+    with columns._append_lock():
+        other = threading.Thread(target=reopened.append_blocks, args=(chain.chain,))
+        other.start()
+        other.join(0.2)
+        assert other.is_alive()
+    other.join()
+
+    assert columns.meta() == {"count": 15, "next_block": 4}
+    assert columns.append_chain(chain) == 0
+
+
+# TURNOUT TIME-SERIES
+
+def test_turnout_series_buckets_votes_as_they_arrive(chain):
+    series = TurnoutSeries(60)
+    for ts in (600, 610, 725, 540, 1300):
+        series.record(ts)
+
+    curve = series.curve()
+    assert curve["start"] == 540
+    assert curve["counts"] == [1, 2, 0, 1] + [0] * 8 + [1]
+    assert curve["cumulative"][-1] == 5
+
+    coarse = series.curve(300)
+    assert coarse["start"] == 300
+    assert coarse["counts"] == [1, 3, 0, 1]
+
+    with pytest.raises(ValueError):
+        series.curve(90)
+
+    # a stray timestamp stores one bucket, and too long a curve is refused
+    series.record(1e15)
+    assert len(series._counts) == 5
+    with pytest.raises(ValueError):
+        series.curve()
+    assert series.curve(60 * 10 ** 12)["cumulative"][-1] == 6
+
+    # the chain feeds its series from add_transaction
+    chain.add_transaction(VoteTransaction("t1", 1))
+    chain.add_transaction(VoteTransaction("t2", 2))
+    chain.mine_block()
+    assert chain.turnout.total() == 2
+
+
+# MEMPOOL JOURNAL
+
+def test_journal_replays_unsealed_votes_after_restart(tmp_path):
+    path = tmp_path / "mempool.log"
+    chain = Blockchain(journal=MempoolJournal(path))
+
+    chain.add_transaction(VoteTransaction("sealed", 1))
+    chain.mine_block()
+
+    threads = [
+        threading.Thread(target=chain.add_transaction, args=(VoteTransaction(f"j{i}", 2),))
+        for i in range(20)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert chain.journal.fsyncs <= 20
+
+    # crash: a half-written line at the tail is ignored
+    with open(path, "ab") as fh:
+        fh.write(b'{"voter_hash": "torn"')
+    chain.journal.close()       # the process is gone
+
+    restarted = Blockchain(journal=MempoolJournal(path))
+    pending = {tx.voter_hash for tx in restarted.current_transactions}
+    assert pending == {f"j{i}" for i in range(20)}
+
+    # new lines after the recovered tail are readable, sealing compacts the journal
+    restarted.add_transaction(VoteTransaction("late", 3))
+    restarted.mine_block()
+    restarted.journal.close()
+    assert MempoolJournal(path).replay() == []
+
+
+def test_worker_processes_journal_to_their_own_slots(tmp_path):
+    path = tmp_path / "mempool-1.log"
+    worker_a = Blockchain(journal=open_journal(path))
+    worker_b = Blockchain(journal=open_journal(path))
+    assert worker_a.journal.path != worker_b.journal.path
+    with pytest.raises(JournalInUse):
+        MempoolJournal(worker_a.journal.path)
+
+    # sealing compacts only the sealer's own file: b's votes stay durable
+    worker_a.add_transaction(VoteTransaction("a1", 1))
+    worker_b.add_transaction(VoteTransaction("b1", 2))
+    worker_a.mine_block()
+
+    # both exit; a single restarted worker replays every slot
+    worker_a.journal.close()
+    worker_b.journal.close()
+    restarted = Blockchain(journal=open_journal(path))
+    assert [tx.voter_hash for tx in restarted.current_transactions] == ["b1"]
+    assert sorted(p.name for p in tmp_path.glob("*.log")) == ["mempool-1.log"]
+
+
+def test_registry_closes_a_chain_replaced_by_a_newer_epoch(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "MEMPOOL_JOURNAL", True)
+    monkeypatch.setattr(config, "JOURNAL_DIR", tmp_path / "journal")
+    monkeypatch.setattr(config, "CHAIN_BACKEND", "disk")
+    monkeypatch.setattr(config, "CHAIN_STORE_FILE", tmp_path / "chain.db")
+
+    registry = ChainRegistry()
+    old = registry.get(1, epoch=0)
+    old.add_transaction(VoteTransaction("void", 1))
+
+    # another worker reset the election: the old epoch's slot is released
+    new = registry.get(1, epoch=1)
+    assert new is not old and registry.get(1) is new
+    assert old.block_store._local.conn is None
+    reopened = open_journal(journal_path(1, 0))
+    assert reopened.path == journal_path(1, 0)
+    assert reopened.replay() == []
+    reopened.close()
+    new.close()
+
+
+# FORK-AWARE BLOCK TREE
+
+def test_reorg_rolls_back_only_the_fork_and_updates_by_delta(chain):
+    chain.add_transaction(VoteTransaction("v1", 1))
+    chain.add_transaction(VoteTransaction("v2", 1))
+    b1 = chain.mine_block()
+    chain.add_transaction(VoteTransaction("v3", 2))
+    b2 = chain.mine_block()
+
+    # a peer sealed a different block 2 on top of b1, then block 3
+    f2 = Block(index=2, transactions=[VoteTransaction("v4", 3)], previous_hash=b1.hash)
+    f3 = Block(index=3, transactions=[VoteTransaction("v5", 3)], previous_hash=f2.hash)
+
+    # same height: the tip seen first is kept
+    assert chain.receive_block(f2) == True
+    assert chain.last_block().hash == b2.hash
+
+    chain.add_transaction(VoteTransaction("v5", 3))     # pending here, sealed in f3
+    assert chain.receive_block(f3) == True
+
+    assert [b.hash for b in chain.chain[2:]] == [f2.hash, f3.hash]
+    assert chain.chain[1] is b1
+    assert chain.tally == {1: 2, 3: 2}
+    assert chain.sealed_voters == {"v1", "v2", "v4", "v5"}
+
+    # the orphaned vote is back in the mempool, the one sealed by the peer is gone
+    assert [tx.voter_hash for tx in chain.current_transactions] == ["v3"]
+    assert chain.is_chain_valid()
+
+    # unknown parent or bad hash is refused
+    assert chain.receive_block(Block(index=5, transactions=[], previous_hash="nope")) == False
+    assert len(chain.tree) == 5
+
+
+def test_peer_blocks_cannot_reseal_voters_of_their_branch(chain, tmp_path):
+    chain.add_transaction(VoteTransaction("v1", 1))
+    b1 = chain.mine_block()
+
+    # v1 is already sealed in b1, on the branch of both blocks
+    again = Block(index=2, transactions=[VoteTransaction("v1", 2)], previous_hash=b1.hash)
+    twice = Block(index=2, transactions=[VoteTransaction("v2", 2), VoteTransaction("v2", 2)],
+                  previous_hash=b1.hash)
+    assert chain.receive_block(again) == False
+    assert chain.receive_block(twice) == False
+    assert chain.tally == {1: 1}
+
+    # on a fork that does not contain b1, v1 may be sealed
+    fork = Block(index=1, transactions=[VoteTransaction("v1", 2)], previous_hash=chain.chain[0].hash)
+    assert chain.receive_block(fork) == True
+
+    # a peer chain re-sealing v1 is grafted only up to that block
+    peer = Blockchain()
+    peer.chain.append(b1)
+    peer.tree.add(b1)
+    peer.chain.append(again)
+    peer.tree.add(again)
+    assert peer.is_chain_valid() == False
+    assert chain.resolve_conflicts([peer]) == False
+    assert again.hash not in chain.tree
+    assert chain.tally == {1: 1}
+
+    # store-backed chains keep no forks
+    stored = Blockchain(block_store=SqliteChainStore(tmp_path / "chain.db"))
+    with pytest.raises(ForkResolutionError):
+        stored.receive_block(again)
+
+
+# INTEGRITY MONITOR
+
+def test_integrity_monitor_verifies_new_blocks_and_samples_old_ones(monkeypatch):
+    monkeypatch.setattr(config, "MEMPOOL_JOURNAL", False)
+    registry = ChainRegistry()
+    chain = registry.get(1)
+    for i in range(5):
+        chain.add_transaction(VoteTransaction(f"m{i}", 1))
+        chain.mine_block()
+
+    monitor = IntegrityMonitor(registry, sample_size=100, cpu_budget=10)
+    report = monitor.check_once()
+    assert report["elections"][1]["validated_index"] == 5
+    assert report["metrics"]["blocks_verified"] == 6
+    assert report["findings"] == []
+
+    # only new blocks are verified again
+    chain.add_transaction(VoteTransaction("m5", 2))
+    chain.mine_block()
+    assert monitor.check_once()["metrics"]["blocks_verified"] == 7
+
+    # tampering below the validated mark is caught by the sample, once
+    chain.chain[3].transactions[0].candidate_id = 2
+    monitor.check_once()
+    report = monitor.check_once()
+    assert [(f["block_index"], f["problem"]) for f in report["findings"]] == [(3, "hash_mismatch")]
+    assert "votechain_integrity_failures_total 1" in monitor.prometheus()
+
+    # no CPU budget left: nothing new is verified this cycle
+    starved = IntegrityMonitor(registry, cpu_budget=-1)
+    assert starved.check_once()["metrics"]["budget_exhausted"] == 1
+
+
+def test_integrity_monitor_errors_are_not_tamper_findings():
+    class VanishingRegistry:
+        # e.g. a chain reset between listing and loading it
+        def election_ids(self):
+            return [1]
+
+        def get(self, election_id):
+            raise RuntimeError("chain store closed")
+
+    monitor = IntegrityMonitor(VanishingRegistry(), interval=0.01)
+    monitor.start()
+    deadline = time.time() + 5
+    while not monitor.metrics["errors"] and time.time() < deadline:
+        time.sleep(0.01)
+    monitor.stop()
+
+    assert monitor.metrics["errors"] >= 1
+    assert monitor.metrics["last_error"] == "chain store closed"
+    assert monitor.metrics["failures"] == 0
+    assert list(monitor.findings) == []
+
+
+def test_integrity_monitor_reports_blocks_lost_from_the_store():
+    class TruncatedRegistry:
+        def election_ids(self):
+            return [1]
+
+        def get(self, election_id):
+            raise MissingBlockError(3)
+
+    report = IntegrityMonitor(TruncatedRegistry()).check_once()
+    assert [(f["block_index"], f["problem"]) for f in report["findings"]] == [(3, "missing")]
+    assert report["metrics"]["errors"] == 0
+
+
+# OFFLINE VERIFICATION
+
+def test_offline_verification_finds_tampered_and_missing_blocks(chain, tmp_path):
+    for block_no in range(8):
+        for i in range(5):
+            chain.add_transaction(VoteTransaction(f"o{block_no}-{i}", i % 3))
+        chain.mine_block()
+
+    store = SqliteChainStore(tmp_path / "chain.db")
+    store.append_blocks(chain.chain)
+
+    report = verify_store(store.path, workers=2, chunk_blocks=3)
+    assert report["problems"] == []
+    assert (report["blocks"], report["votes"]) == (9, 40)
+
+    # a vote changed on disk, and two blocks lost from a chunk boundary on
+    conn = store._connect()
+    conn.execute(
+        "UPDATE blocks SET transactions = replace(transactions, '\"candidate_id\": 1', "
+        "'\"candidate_id\": 2') WHERE block_index = 2"
+    )
+    conn.execute("DELETE FROM blocks WHERE block_index IN (6, 7)")
+
+    progress = []
+    report = verify_store(store.path, workers=2, chunk_blocks=3, progress=lambda b, v: progress.append(b))
+    assert report["problems"] == [(2, "hash_mismatch"), (6, "missing"), (7, "missing")]
+    assert progress[-1] == 9
+
+    # verification only reads the store
+    with pytest.raises(sqlite3.OperationalError):
+        SqliteChainStore(store.path, read_only=True).clear()
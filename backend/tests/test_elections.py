@@ -0,0 +1,453 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import app
+from backend.routes.admin_routes import chains
+from backend.blockchain.archiver import chain_archiver
+from backend.database.session import Base, get_db, get_read_db
+from backend.database.async_session import get_async_db
+from backend.database.writer import DatabaseWriter, get_writer
+from backend.security.membership import voter_index
+from backend.utils.idempotency import idempotency
+from backend.utils.live_counters import live_counters
+from backend.utils.results_cache import results_cache
+from backend.utils.single_flight import single_flight
+
+
+# FIXTURE: app bound to an isolated temporary database
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from backend import config
+    from backend.blockchain import segments, columns
+
+    monkeypatch.setattr(config, "ARCHIVE_DIR", tmp_path / "segments")
+    monkeypatch.setattr(segments, "_archives", {})
+    monkeypatch.setattr(config, "COLUMNS_DIR", tmp_path / "columns")
+    monkeypatch.setattr(columns, "_stores", {})
+    monkeypatch.setattr(config, "JOURNAL_DIR", tmp_path / "journal")
+
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    TestingSession = sessionmaker(bind=engine)
+    writer = DatabaseWriter(sessionmaker(bind=engine, expire_on_commit=False))
+
+    async_engine = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:"))
+    AsyncTestingSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    def override_get_db():
+        db = TestingSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_writer] = lambda: writer
+    chains.clear()
+    voter_index.clear()
+    idempotency.clear()
+    live_counters.clear()
+    yield TestClient(app)
+    # archival jobs purge through this writer
+    chain_archiver.wait()
+    app.dependency_overrides.clear()
+    writer.stop()
+
+
+@pytest.fixture
+def admin_token(client):
+    return client.post("/admin/login?password=admin123").json()["token"]
+
+
+# CONCURRENT ELECTIONS
+
+def test_elections_have_separate_ballots_and_results(client, admin_token):
+    admin = {"token": admin_token}
+
+    board = client.post("/admin/election/create", params={**admin, "name": "Board"}).json()["election_id"]
+    referendum = client.post("/admin/election/create", params={**admin, "name": "Referendum"}).json()["election_id"]
+
+    alice = client.post("/admin/candidate/add", params={**admin, "name": "Alice", "election_id": board}).json()["id"]
+    yes = client.post("/admin/candidate/add", params={**admin, "name": "Yes", "election_id": referendum}).json()["id"]
+
+    for election_id in (board, referendum):
+        res = client.post("/admin/election/start", params={**admin, "election_id": election_id})
+        assert res.status_code == 200
+
+    client.post("/voter/register", params={"voter_id": "MULTI001"})
+    voter = {"token": client.post("/voter/login", params={"voter_id": "MULTI001"}).json()["token"]}
+
+    # a candidate of another election is rejected
+    res = client.post(f"/voter/vote/{yes}", params={**voter, "election_id": board})
+    assert res.status_code == 404
+
+    # one ballot per election, not one per deployment
+    assert client.post(f"/voter/vote/{alice}", params={**voter, "election_id": board}).status_code == 200
+    assert client.post(f"/voter/vote/{yes}", params={**voter, "election_id": referendum}).status_code == 200
+
+    res = client.post(f"/voter/vote/{alice}", params={**voter, "election_id": board})
+    assert res.status_code == 400
+
+    client.post("/admin/election/end", params={**admin, "election_id": board})
+
+    board_results = client.get("/admin/results", params={**admin, "election_id": board}).json()
+    assert board_results["total_votes"] == 1
+    assert board_results["results"][0]["candidate"] == "Alice"
+
+    # the referendum is still running
+    status = client.get("/election/status", params={"election_id": referendum}).json()
+    assert status["status"] == "ONGOING"
+
+
+def test_unknown_election_is_404(client):
+    assert client.get("/election/status", params={"election_id": 999}).status_code == 404
+
+
+def test_login_rejects_unknown_voters_from_the_index(client):
+    assert client.post("/voter/login", params={"voter_id": "NOBODY"}).status_code == 404
+
+    # registered right after the miss: found without waiting for a refresh
+    client.post("/voter/register", params={"voter_id": "LATE001"})
+    assert client.post("/voter/login", params={"voter_id": "LATE001"}).status_code == 200
+
+
+# CACHED FINAL RESULTS
+
+def test_results_are_served_from_cache_with_etag(client, admin_token):
+    admin = {"token": admin_token}
+
+    candidate = client.post("/admin/candidate/add", params={**admin, "name": "Solo"}).json()["id"]
+    client.post("/admin/election/start", params=admin)
+
+    client.post("/voter/register", params={"voter_id": "ETAG001"})
+    voter = {"token": client.post("/voter/login", params={"voter_id": "ETAG001"}).json()["token"]}
+    client.post(f"/voter/vote/{candidate}", params=voter)
+
+    client.post("/admin/election/end", params=admin)
+
+    first = client.get("/admin/results", params=admin)
+    second = client.get("/admin/results", params=admin)
+    assert first.status_code == 200
+    assert first.json()["total_votes"] == 1
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.content == second.content
+
+    res = client.get("/admin/results", params=admin, headers={"If-None-Match": first.headers["etag"]})
+    assert res.status_code == 304
+
+    res = client.get("/voter/results", params=voter)
+    assert res.status_code == 200
+    assert res.json()["results"][0]["votes"] == 1
+
+    # clearing the election drops the cached document
+    client.post("/admin/election/clear", params=admin)
+    assert client.get("/admin/results", params=admin).status_code == 403
+
+
+# SEGMENT ARCHIVE
+
+def test_sealed_blocks_are_archived_and_range_served(client, admin_token):
+    admin = {"token": admin_token}
+
+    candidate = client.post("/admin/candidate/add", params={**admin, "name": "Arch"}).json()["id"]
+    client.post("/admin/election/start", params=admin)
+    client.post("/voter/register", params={"voter_id": "ARCH001"})
+    voter = {"token": client.post("/voter/login", params={"voter_id": "ARCH001"}).json()["token"]}
+    client.post(f"/voter/vote/{candidate}", params=voter)
+    client.post("/admin/election/end", params=admin)
+
+    segments = client.get("/archive/segments", params=admin).json()["segments"]
+    assert len(segments) == 1
+    assert segments[0]["first_index"] == 0 and segments[0]["last_index"] == 1
+
+    block = client.get("/archive/blocks/1", params=admin).json()
+    assert block["transactions"][0]["candidate_id"] == candidate
+
+    name = segments[0]["name"]
+    full = client.get(f"/archive/segments/{name}", params=admin)
+    assert full.status_code == 200
+    assert len(full.content) == segments[0]["bytes"]
+
+    part = client.get(f"/archive/segments/{name}", params=admin, headers={"Range": "bytes=0-9"})
+    assert part.status_code == 206
+    assert part.content == full.content[:10]
+
+    assert client.get("/archive/blocks/99", params=admin).status_code == 404
+
+    integrity = client.get("/admin/integrity", params={**admin, "run": True}).json()
+    assert integrity["elections"]["1"]["validated_index"] == 1
+    assert integrity["findings"] == []
+    metrics = client.get("/admin/integrity/metrics", params=admin).text
+    assert 'votechain_integrity_validated_index{election_id="1"} 1' in metrics
+
+
+# VOTE COLUMN ANALYTICS
+
+def test_analytics_run_over_sealed_vote_columns(client, admin_token):
+    admin = {"token": admin_token}
+
+    first = client.post("/admin/candidate/add", params={**admin, "name": "First"}).json()["id"]
+    second = client.post("/admin/candidate/add", params={**admin, "name": "Second"}).json()["id"]
+    client.post("/admin/election/start", params=admin)
+
+    for i, candidate in enumerate((first, first, second)):
+        client.post("/voter/register", params={"voter_id": f"COL00{i}"})
+        voter = {"token": client.post("/voter/login", params={"voter_id": f"COL00{i}"}).json()["token"]}
+        client.post(f"/voter/vote/{candidate}", params=voter)
+
+    turnout = client.get("/admin/turnout", params={**admin, "resolution": 3600}).json()
+    assert turnout["total_votes"] == 3
+    assert turnout["pending_votes"] == 3
+    assert turnout["cumulative"][-1] == 3
+    assert turnout["sealed_only"] is False
+    assert client.get("/admin/turnout", params={**admin, "resolution": 90}).status_code == 400
+    assert client.get("/admin/turnout", params={**admin, "resolution": -60}).status_code == 400
+    assert client.get("/election/status").json()["votes_cast"] == 3
+
+    client.post("/admin/election/end", params=admin)
+    metrics = client.get("/admin/metrics", params=admin).text
+    assert 'votechain_votes_sealed_total{election_id="1",epoch="0"} 3' in metrics
+    assert 'votechain_mempool_depth{election_id="1",epoch="0"} 0' in metrics
+
+    tally = client.get("/admin/analytics/tally", params=admin).json()
+    assert tally["total_votes"] == 3
+    assert {r["candidate_id"]: r["votes"] for r in tally["results"]} == {first: 2, second: 1}
+
+    turnout = client.get("/admin/analytics/turnout", params={**admin, "bucket_seconds": 3600}).json()
+    assert turnout["cumulative"][-1] == 3
+
+    blocks = client.get("/admin/analytics/blocks", params=admin).json()
+    assert blocks == [{"block_index": 1, "votes": 3}]
+
+    client.post("/admin/election/clear", params=admin)
+    assert client.get("/admin/analytics/tally", params=admin).json()["total_votes"] == 0
+
+
+# RESET BY EPOCH
+
+def test_reset_starts_a_new_epoch_and_archives_the_old_chain(client, admin_token, tmp_path):
+    admin = {"token": admin_token}
+
+    candidate = client.post("/admin/candidate/add", params={**admin, "name": "Again"}).json()["id"]
+    client.post("/admin/election/start", params=admin)
+    client.post("/voter/register", params={"voter_id": "EPOCH001"})
+    voter = {"token": client.post("/voter/login", params={"voter_id": "EPOCH001"}).json()["token"]}
+    assert client.post(f"/voter/vote/{candidate}", params=voter).status_code == 200
+    old_chain = chains.get(1)
+
+    res = client.post("/admin/election/clear", params=admin)
+    assert res.json()["epoch"] == 1
+    assert chain_archiver.wait(1, timeout=10)
+
+    # the old chain went to its epoch's archive; the new one starts empty
+    assert chains.get(1) is not old_chain
+    assert (tmp_path / "segments" / "election-1-epoch-0").is_dir()
+    assert client.get("/archive/segments", params=admin).json()["segments"] == []
+
+    # the same voter can vote again in the new epoch, once
+    client.post("/admin/election/start", params=admin)
+    assert client.post(f"/voter/vote/{candidate}", params=voter).status_code == 200
+    assert client.post(f"/voter/vote/{candidate}", params=voter).status_code == 400
+
+    client.post("/admin/election/end", params=admin)
+    results = client.get("/admin/results", params=admin).json()
+    assert results["total_votes"] == 1
+
+
+def test_failed_journal_write_gives_the_ballot_back(client, admin_token):
+    admin = {"token": admin_token}
+
+    candidate = client.post("/admin/candidate/add", params={**admin, "name": "Disk"}).json()["id"]
+    client.post("/admin/election/start", params=admin)
+    client.post("/voter/register", params={"voter_id": "FSYNC001"})
+    voter = {"token": client.post("/voter/login", params={"voter_id": "FSYNC001"}).json()["token"]}
+
+    chain = chains.get(1)
+    def disk_full(tx):
+        raise OSError("No space left on device")
+    chain.add_transaction = disk_full
+    with pytest.raises(OSError):
+        client.post(f"/voter/vote/{candidate}", params=voter)
+
+    # not counted as voted: the retry goes through once the disk is back
+    del chain.add_transaction
+    assert client.post(f"/voter/vote/{candidate}", params=voter).status_code == 200
+    assert len(chain.current_transactions) == 1
+
+
+# IDEMPOTENT VOTE RETRIES
+
+def test_vote_retries_with_the_same_key_replay_the_first_response(client, admin_token):
+    admin = {"token": admin_token}
+
+    first = client.post("/admin/candidate/add", params={**admin, "name": "Kiosk"}).json()["id"]
+    second = client.post("/admin/candidate/add", params={**admin, "name": "Other"}).json()["id"]
+    client.post("/admin/election/start", params=admin)
+    client.post("/voter/register", params={"voter_id": "KIOSK001"})
+    voter = {"token": client.post("/voter/login", params={"voter_id": "KIOSK001"}).json()["token"]}
+    key = {"Idempotency-Key": "ballot-7f3a"}
+
+    # concurrent duplicates: one attempt runs, the others get its response
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(
+            lambda _: client.post(f"/voter/vote/{first}", params=voter, headers=key), range(8)
+        ))
+    assert {r.status_code for r in responses} == {200}
+    assert {r.json()["message"] for r in responses} == {"Vote cast successfully"}
+    assert sum("idempotent-replayed" not in r.headers for r in responses) == 1
+
+    # later retry: replayed, not "already voted"
+    retry = client.post(f"/voter/vote/{first}", params=voter, headers=key)
+    assert retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+
+    # the key belongs to that request; a new key is a new attempt
+    assert client.post(f"/voter/vote/{second}", params=voter, headers=key).status_code == 422
+    assert client.post(
+        f"/voter/vote/{first}", params=voter, headers={"Idempotency-Key": "ballot-8c1d"}
+    ).status_code == 400
+
+    client.post("/admin/election/end", params=admin)
+    assert client.get("/admin/results", params=admin).json()["total_votes"] == 1
+
+
+# REQUEST COALESCING
+
+def test_results_stampede_computes_once(client, admin_token, monkeypatch):
+    from backend.database import async_crud
+
+    admin = {"token": admin_token}
+    candidate = client.post("/admin/candidate/add", params={**admin, "name": "Crowd"}).json()["id"]
+    client.post("/admin/election/start", params=admin)
+    client.post("/voter/register", params={"voter_id": "CROWD001"})
+    voter = {"token": client.post("/voter/login", params={"voter_id": "CROWD001"}).json()["token"]}
+    client.post(f"/voter/vote/{candidate}", params=voter)
+    client.post("/admin/election/end", params=admin)
+
+    # a cold cache and a slow tally, so the burst overlaps
+    results_cache.invalidate(1)
+    tallies = []
+    count_votes = async_crud.count_votes_by_candidate
+
+    async def slow_count(db, election_id):
+        tallies.append(election_id)
+        await asyncio.sleep(0.3)
+        return await count_votes(db, election_id)
+
+    monkeypatch.setattr(async_crud, "count_votes_by_candidate", slow_count)
+
+    def fetch(i):
+        if i % 2:
+            return client.get("/admin/results", params=admin)
+        return client.get("/voter/results", params=voter)
+
+    executions = single_flight.executions
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(fetch, range(32)))
+
+    assert {r.status_code for r in responses} == {200}
+    assert {r.json()["total_votes"] for r in responses[1::2]} == {1}
+    # one tally per document (admin + voter), not one per request
+    assert len(tallies) == 2
+    assert single_flight.executions - executions == 2
+    assert single_flight.in_flight() == 0
+
+
+# POLLING STATION BATCH UPLOADS
+
+def test_station_uploads_a_batch_of_signed_ballots(client, admin_token, monkeypatch):
+    from backend import config
+    from backend.security.stations import sign_ballot
+
+    monkeypatch.setattr(config, "STATION_KEYS", {"north-1": "gateway-secret"})
+    monkeypatch.setattr(config, "KIOSK_KEYS", {
+        "k1": ("north-1", "kiosk-key"),
+        "k9": ("south-2", "south-key"),
+    })
+    admin = {"token": admin_token}
+
+    first = client.post("/admin/candidate/add", params={**admin, "name": "North"}).json()["id"]
+    second = client.post("/admin/candidate/add", params={**admin, "name": "South"}).json()["id"]
+    client.post("/admin/election/start", params=admin)
+    for i in range(5):
+        client.post("/voter/register", params={"voter_id": f"ST{i:03d}"})
+
+    # ST004 already voted at a kiosk of its own
+    voter = {"token": client.post("/voter/login", params={"voter_id": "ST004"}).json()["token"]}
+    client.post(f"/voter/vote/{first}", params=voter)
+
+    assert client.post("/station/login", params={"station_id": "north-1", "key": "wrong"}).status_code == 401
+    station = {"token": client.post(
+        "/station/login", params={"station_id": "north-1", "key": "gateway-secret"}
+    ).json()["token"]}
+    epoch = client.get("/election/status").json()["epoch"]
+
+    def ballot(voter_id, candidate, kiosk="k1", key=b"kiosk-key"):
+        return {
+            "kiosk_id": kiosk,
+            "voter_id": voter_id,
+            "candidate_id": candidate,
+            "signature": sign_ballot(key, 1, epoch, voter_id, candidate)
+        }
+
+    tampered = ballot("ST002", first)
+    tampered["candidate_id"] = second
+    ballots = [
+        ballot("ST000", first),
+        ballot("ST001", second),
+        ballot("ST001", first),
+        tampered,
+        ballot("NOBODY", first),
+        ballot("ST003", 9999),
+        ballot("ST004", second),
+        # the gateway's own credential cannot sign ballots
+        ballot("ST003", first, key=b"gateway-secret"),
+        # another station's kiosk
+        ballot("ST003", first, kiosk="k9", key=b"south-key"),
+        {**ballot("ST003", first), "signature": "é" * 64},
+    ]
+
+    res = client.post("/station/ballots", params=station, json={"ballots": ballots})
+    assert res.status_code == 200
+    body = res.json()
+    assert [r["status"] for r in body["results"]] == [
+        "accepted", "accepted", "duplicate_in_batch", "invalid_signature",
+        "voter_not_found", "candidate_not_found", "already_voted",
+        "invalid_signature", "unknown_kiosk", "invalid_signature",
+    ]
+    assert (body["accepted"], body["rejected"]) == (2, 8)
+
+    # voters are not station tokens, and uploads are not replayable
+    assert client.post("/station/ballots", params=voter, json={"ballots": []}).status_code == 403
+    again = client.post("/station/ballots", params=station, json={"ballots": ballots[:1]}).json()
+    assert again["results"][0]["status"] == "already_voted"
+
+    # a failed journal write gives the batch's ballots back
+    chain = chains.get(1)
+    def disk_full(transactions):
+        raise OSError("No space left on device")
+    chain.add_transactions = disk_full
+    with pytest.raises(OSError):
+        client.post("/station/ballots", params=station, json={"ballots": [ballot("ST003", first)]})
+    del chain.add_transactions
+    retry = client.post("/station/ballots", params=station, json={"ballots": [ballot("ST003", first)]})
+    assert retry.json()["accepted"] == 1
+
+    client.post("/admin/election/end", params=admin)
+    results = client.get("/admin/results", params=admin).json()
+    assert results["total_votes"] == 4
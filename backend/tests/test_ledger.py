@@ -0,0 +1,227 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.session import Base
+from backend.database import models  # noqa: F401  (registers tables)
+from backend.database.schema import SCHEMA_VERSION, ensure_schema, stored_schema_version
+from backend.database.crud import (
+    sync_sealed_blocks,
+    save_sealed_block,
+    count_votes_by_candidate,
+    clear_sealed_blocks,
+    has_voted
+)
+from backend.blockchain.chain import Blockchain
+from backend.blockchain.transaction import VoteTransaction
+
+
+# FIXTURE: isolated in-memory database
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def chain():
+    chain = Blockchain()
+    for i, candidate_id in enumerate([1, 2, 1, 1, 3]):
+        chain.add_transaction(VoteTransaction(f"voter{i}", candidate_id))
+    chain.mine_block()
+    chain.add_transaction(VoteTransaction("late", 2))
+    chain.mine_block()
+    return chain
+
+
+# SEALED BLOCK STORAGE
+
+def test_sync_writes_every_block(db, chain):
+    assert sync_sealed_blocks(db, chain) == 3
+    assert sync_sealed_blocks(db, chain) == 0
+
+
+def test_group_by_tally_matches_chain(db, chain):
+    sync_sealed_blocks(db, chain)
+    assert count_votes_by_candidate(db) == {1: 3, 2: 2, 3: 1}
+
+
+def test_tampered_block_is_rejected(db, chain):
+    sync_sealed_blocks(db, chain)
+
+    chain.add_transaction(VoteTransaction("x", 1))
+    block = chain.mine_block()
+    block.transactions[0].candidate_id = 2
+
+    assert save_sealed_block(db, block) is None
+    assert count_votes_by_candidate(db) == {1: 3, 2: 2, 3: 1}
+
+
+def test_block_must_extend_stored_tip(db, chain):
+    other = Blockchain()
+    other.add_transaction(VoteTransaction("y", 1))
+    foreign = other.mine_block()
+
+    sync_sealed_blocks(db, chain)
+    assert save_sealed_block(db, foreign) is None
+
+
+def test_clear_sealed_blocks(db, chain):
+    sync_sealed_blocks(db, chain)
+    clear_sealed_blocks(db)
+    assert count_votes_by_candidate(db) == {}
+
+
+def test_epochs_have_their_own_ledger_rows(db, chain):
+    from backend.database.crud import get_election_state, purge_sealed_blocks, reset_election
+
+    get_election_state(db)
+    sync_sealed_blocks(db, chain)
+    reset_election(db)
+
+    # the new epoch's chain is sealed while epoch 0 is still purging
+    fresh = Blockchain()
+    fresh.add_transaction(VoteTransaction("voter0", 3))
+    fresh.mine_block()
+    assert sync_sealed_blocks(db, fresh, epoch=1) == 2
+    assert count_votes_by_candidate(db) == {3: 1}
+
+    while purge_sealed_blocks(db, 1, 0, limit=2):
+        pass
+    assert count_votes_by_candidate(db) == {3: 1}
+    assert sync_sealed_blocks(db, fresh, epoch=1) == 0
+
+
+def test_claims_are_refused_once_the_epoch_moved_on(db):
+    from backend.database.crud import (
+        get_election_state, mark_voter_as_voted, mark_voters_as_voted, reset_election
+    )
+
+    get_election_state(db)
+    assert mark_voter_as_voted(db, "a", 1, 0) is True
+    assert mark_voter_as_voted(db, "a", 1, 0) is False
+    assert mark_voters_as_voted(db, ["a", "b"], 1, 0) == {"b"}
+
+    # a request admitted before the reset claims nothing afterwards
+    reset_election(db)
+    assert mark_voter_as_voted(db, "c", 1, 0) is None
+    assert mark_voters_as_voted(db, ["a", "c"], 1, 0) is None
+    assert mark_voters_as_voted(db, ["a", "c"], 1, 1) == {"a", "c"}
+
+
+# READ/WRITE SPLIT
+
+def test_single_writer_and_readers_never_hit_lock_errors(tmp_path):
+    import threading
+    from sqlalchemy.exc import OperationalError
+    from backend.database.crud import register_voter, count_voters
+    from backend.database.session import configure_sqlite
+    from backend.database.writer import DatabaseWriter
+
+    url = f"sqlite:///{tmp_path / 'stress.db'}"
+    write_engine = create_engine(url, connect_args={"check_same_thread": False})
+    configure_sqlite(write_engine)
+    Base.metadata.create_all(bind=write_engine)
+
+    read_engine = create_engine(url, connect_args={"check_same_thread": False})
+    configure_sqlite(read_engine, read_only=True)
+    ReadSession = sessionmaker(bind=read_engine)
+
+    writer = DatabaseWriter(sessionmaker(bind=write_engine, expire_on_commit=False))
+    errors = []
+
+    def register(offset):
+        try:
+            for i in range(offset, 400, 8):
+                assert writer.run(register_voter, f"S{i}", f"h{i}") is not None
+        except Exception as e:
+            errors.append(e)
+
+    def read():
+        try:
+            for _ in range(50):
+                db = ReadSession()
+                count_voters(db)
+                db.close()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=register, args=(i,)) for i in range(8)]
+    threads += [threading.Thread(target=read) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.stop()
+
+    assert errors == []
+    db = ReadSession()
+    assert count_voters(db) == 400
+
+    # reader connections refuse writes
+    with pytest.raises(OperationalError):
+        register_voter(db, "RO", "ro")
+    db.close()
+
+
+# SCHEMA VERSION
+
+def test_schema_work_is_skipped_once_current(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'votechain.db'}")
+
+    assert ensure_schema(engine) is True
+    assert stored_schema_version(engine) == SCHEMA_VERSION
+    assert ensure_schema(engine) is False
+
+
+def test_upgrade_gives_old_ledger_rows_their_epoch(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'votechain.db'}")
+    with engine.begin() as conn:
+        # layout of schema version 4: no epoch, one block per (election, index)
+        conn.exec_driver_sql(
+            "CREATE TABLE election_state (id INTEGER PRIMARY KEY, name VARCHAR, "
+            "status VARCHAR, epoch INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.exec_driver_sql(
+            "CREATE TABLE blocks (id INTEGER PRIMARY KEY, election_id INTEGER NOT NULL, "
+            "block_index INTEGER NOT NULL, timestamp FLOAT NOT NULL, previous_hash VARCHAR NOT NULL, "
+            "hash VARCHAR NOT NULL, CONSTRAINT uq_block_position UNIQUE (election_id, block_index))"
+        )
+        conn.exec_driver_sql("CREATE INDEX ix_blocks_election_id ON blocks (election_id)")
+        conn.exec_driver_sql("INSERT INTO election_state VALUES (1, 'e', 'ENDED', 2)")
+        conn.exec_driver_sql("INSERT INTO blocks VALUES (1, 1, 0, 1.0, '0', 'h0')")
+
+    assert ensure_schema(engine) is True
+
+    with engine.begin() as conn:
+        assert conn.exec_driver_sql("SELECT epoch FROM blocks").scalar() == 2
+        # block 0 of the next epoch no longer collides with the old one
+        conn.exec_driver_sql(
+            "INSERT INTO blocks (election_id, epoch, block_index, timestamp, previous_hash, hash) "
+            "VALUES (1, 3, 0, 2.0, '0', 'n0')"
+        )
+
+
+def test_upgrade_keeps_voters_of_the_first_release_voted(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'votechain.db'}")
+    with engine.begin() as conn:
+        # layout of the first release: one election, a has_voted flag per voter
+        conn.exec_driver_sql(
+            "CREATE TABLE voters (id INTEGER PRIMARY KEY, voter_id VARCHAR NOT NULL UNIQUE, "
+            "voter_hash VARCHAR NOT NULL UNIQUE, has_voted BOOLEAN)"
+        )
+        conn.exec_driver_sql("CREATE TABLE candidates (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL)")
+        conn.exec_driver_sql("CREATE TABLE election_state (id INTEGER PRIMARY KEY, status VARCHAR)")
+        conn.exec_driver_sql("INSERT INTO election_state VALUES (1, 'ONGOING')")
+        conn.exec_driver_sql("INSERT INTO voters VALUES (1, 'v1', 'h1', 1), (2, 'v2', 'h2', 0)")
+
+    assert ensure_schema(engine) is True
+
+    db = sessionmaker(bind=engine)()
+    assert has_voted(db, "v1") is True
+    assert has_voted(db, "v2") is False
+    db.close()
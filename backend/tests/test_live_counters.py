@@ -0,0 +1,50 @@
+import multiprocessing
+
+from backend.utils.live_counters import LiveCounters
+
+
+def _cast(path, votes):
+    counters = LiveCounters()
+    counters.attach(path)
+    for _ in range(votes):
+        counters.add_accepted(1, 0)
+    counters.add_accepted(2, 0)
+
+
+# SHARED BETWEEN WORKER PROCESSES
+
+def test_workers_increment_one_shared_block(tmp_path):
+    path = tmp_path / "counters.shm"
+    LiveCounters.create(path, [(1, 0, 10, 0)])
+
+    workers = [
+        multiprocessing.Process(target=_cast, args=(str(path), 2000))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+
+    # a fresh attach sees every worker's increments, none lost
+    counters = LiveCounters()
+    counters.attach(path)
+    assert counters.read(1, 0) == {"accepted": 8010, "sealed": 0, "pending": 8010}
+    assert counters.read(2, 0)["accepted"] == 4
+
+    counters.add_sealed(1, 0, 8000)
+    assert counters.read(1, 0)["pending"] == 10
+    assert 'votechain_mempool_depth{election_id="1",epoch="0"} 10' in counters.prometheus()
+
+
+def test_a_new_epoch_starts_at_zero():
+    counters = LiveCounters()
+    counters.open_private([(1, 0, 5, 5)])
+
+    counters.reset(1, 1)
+    assert counters.read(1, 1) == {"accepted": 0, "sealed": 0, "pending": 0}
+    # old-epoch reads and stragglers no longer count
+    counters.add_accepted(1, 0)
+    assert counters.read(1, 0)["accepted"] == 0
+    assert counters.read(1, 1)["accepted"] == 0
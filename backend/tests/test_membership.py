@@ -0,0 +1,50 @@
+from backend.routes.auth import hash_voter_id
+from backend.security import membership
+from backend.security.membership import VoterIndex
+
+
+# REGISTERED-VOTER INDEX
+
+def test_index_finds_loaded_and_registered_voters(monkeypatch):
+    monkeypatch.setattr(membership, "MERGE_THRESHOLD", 4)
+
+    index = VoterIndex()
+    index.load([(i, hash_voter_id(f"V{i:04d}")) for i in range(1, 101)])
+
+    assert index.row_id(hash_voter_id("V0042")) == 42
+    assert index.row_id(hash_voter_id("typo")) is None
+
+    # registrations land in the delta, then get merged into the arrays
+    for i in range(101, 111):
+        index.add(hash_voter_id(f"V{i:04d}"), i)
+
+    assert len(index) == 110
+    assert index.max_row_id == 110
+    assert all(index.row_id(hash_voter_id(f"V{i:04d}")) == i for i in range(1, 111))
+
+
+# VOTED BITMAPS
+
+def test_voted_bitmap_is_per_election_and_epoch():
+    index = VoterIndex()
+    index.load([(7, hash_voter_id("A"))], participation=[(1, 0, 7)])
+
+    assert index.has_voted(1, 0, 7)
+    assert not index.has_voted(2, 0, 7)
+
+    index.mark_voted(2, 0, 70_000)
+    assert index.has_voted(2, 0, 70_000)
+    assert not index.has_voted(2, 0, 69_999)
+
+    # election 1 was reset (epoch 1): its old ballots stop counting
+    assert not index.has_voted(1, 1, 7)
+    index.mark_voted(1, 1, 8)
+    assert index.has_voted(1, 1, 8)
+    assert not index.has_voted(1, 0, 7)
+
+    # a late claim from the old epoch does not leak into the new one
+    index.mark_voted(1, 0, 9)
+    assert not index.has_voted(1, 1, 9)
+
+    index.reset_election(1)
+    assert not index.has_voted(1, 1, 8)
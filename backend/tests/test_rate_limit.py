@@ -0,0 +1,72 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from backend.security.rate_limit import (
+    TokenBucket,
+    BucketStore,
+    ConcurrencyLimiter,
+    AdmissionControl
+)
+
+
+def make_request(ip="10.0.0.1"):
+    return Request({"type": "http", "client": (ip, 1234), "headers": []})
+
+
+# TOKEN BUCKET
+
+def test_bucket_allows_burst_then_refills():
+    bucket = TokenBucket(capacity=3, rate=1.0, now=0.0)
+
+    assert [bucket.try_acquire(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire(0.0) == pytest.approx(1.0)
+
+    # half a second later half a token has refilled
+    assert bucket.try_acquire(0.5) == pytest.approx(0.5)
+    assert bucket.try_acquire(1.0) == 0.0
+
+
+# BOUNDED STORE
+
+def test_store_evicts_least_recently_used():
+    store = BucketStore(capacity=1, rate=0.001, max_buckets=2)
+
+    store.hit("a")
+    store.hit("b")
+    store.hit("a")          # "b" is now least recently used
+    store.hit("c")
+
+    assert len(store) == 2
+    assert store.hit("a") > 0      # still tracked, exhausted
+    assert store.hit("b") == 0     # evicted, starts full again
+
+
+# CONCURRENCY LIMIT
+
+def test_concurrency_limiter_never_waits():
+    limiter = ConcurrencyLimiter(2)
+    assert limiter.try_enter()
+    assert limiter.try_enter()
+    assert not limiter.try_enter()
+    limiter.leave()
+    assert limiter.try_enter()
+
+
+# ADMISSION CONTROL
+
+def test_admission_rejects_with_429_and_retry_after():
+    control = AdmissionControl()
+    control.enabled = True
+    control.voter_buckets = BucketStore(capacity=1, rate=0.1, max_buckets=10)
+
+    control.admit(make_request(), "VOTER1")
+
+    with pytest.raises(HTTPException) as exc:
+        control.admit(make_request(), "VOTER1")
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "10"
+
+    # other voters from the same kiosk are unaffected
+    control.admit(make_request(), "VOTER2")
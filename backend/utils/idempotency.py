@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from .. import config
+
+
+# IDEMPOTENT RETRIES
+#
+# A client that sends an `Idempotency-Key` header may retry the same
+# request safely: the first attempt claims the key, and every retry
+# carrying it gets the first attempt's final response back, without
+# running the request again. Duplicates arriving while the first
+# attempt is still running wait for its outcome.
+#
+# Only final outcomes are kept (success, or a client error of the
+# request itself). When the first attempt fails for a transient reason
+# (rate limited, server busy, crash) the key is released and the next
+# retry runs the request for real.
+#
+# Entries are kept per process, for `ttl` seconds after they complete,
+# and at most `max_entries` of them (least recently used evicted).
+
+
+class IdempotentReplay(Exception):
+    """
+    Raised to answer a request with the stored response of its key.
+    """
+
+    def __init__(self, status_code: int, body):
+        self.status_code = status_code
+        self.body = body
+
+
+class IdempotencyEntry:
+
+    __slots__ = ("key", "fingerprint", "outcome", "expires")
+
+    def __init__(self, key, fingerprint):
+        self.key = key
+        self.fingerprint = fingerprint
+        # resolves to (status_code, body), or None if the attempt was abandoned
+        self.outcome = Future()
+        self.expires = None
+
+
+class IdempotencyStore:
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key, fingerprint):
+        """
+        Returns (entry, owner). The owner runs the request and must
+        finish() or abandon() the entry; anyone else awaits its outcome.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires <= now:
+                del self._entries[key]
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry, False
+
+            entry = IdempotencyEntry(key, fingerprint)
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                # an evicted running entry still resolves for its waiters
+                self._entries.popitem(last=False)
+            return entry, True
+
+    def finish(self, entry: IdempotencyEntry, status_code: int, body):
+        with self._lock:
+            entry.expires = time.monotonic() + self.ttl
+        if not entry.outcome.done():
+            entry.outcome.set_result((status_code, body))
+
+    def abandon(self, entry: IdempotencyEntry):
+        """
+        Releases a key whose attempt produced no final response.
+        No-op once the entry is finished.
+        """
+        if entry.outcome.done():
+            return
+        with self._lock:
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+        entry.outcome.set_result(None)
+
+    async def begin(self, key, fingerprint):
+        """
+        Claims `key` for this request, or raises IdempotentReplay with
+        the outcome of the attempt that holds it. A key reused for a
+        different request (fingerprint) raises ValueError.
+        """
+        while True:
+            entry, owner = self.claim(key, fingerprint)
+            if owner:
+                return entry
+            if entry.fingerprint != fingerprint:
+                raise ValueError("Idempotency-Key already used for a different request")
+
+            outcome = await asyncio.wrap_future(entry.outcome)
+            if outcome is not None:
+                raise IdempotentReplay(*outcome)
+            # that attempt was abandoned: claim the key ourselves
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def replay_response(request: Request, exc: IdempotentReplay) -> JSONResponse:
+    """
+    Exception handler: the stored response, marked as a replay.
+    """
+    return JSONResponse(
+        exc.body,
+        status_code=exc.status_code,
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+# shared by the vote routes of this process
+idempotency = IdempotencyStore(config.IDEMPOTENCY_TTL_SECONDS, config.IDEMPOTENCY_MAX_KEYS)
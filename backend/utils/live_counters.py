@@ -0,0 +1,288 @@
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:     # no cross-process locking: per-process block only
+    fcntl = None
+
+from .. import config
+
+
+# LIVE VOTE COUNTERS (SHARED BETWEEN WORKERS)
+#
+# A small fixed-size block of int64 counters per election, in a memory
+# mapping every worker process attaches to. The launcher (see
+# backend/scripts/serve.py) creates and seeds it from the database
+# before starting the workers; workers find it through
+# VOTECHAIN_SHARED_COUNTERS. A process started without one (plain
+# `uvicorn backend.app:app`) keeps a private, anonymous block.
+#
+#   header   magic, number of slots
+#   slot     election_id, epoch, accepted, sealed      (0 = free slot)
+#
+# `accepted` counts ballots taken into the chain in the current epoch,
+# `sealed` the ones sealed into blocks since; pending = the difference.
+# Updates hold a thread lock and an fcntl lock on the slot's bytes;
+# reads are single aligned 8-byte loads, without locks.
+
+MAGIC = b"VCCOUNT1"
+HEADER = struct.Struct("<8sQ")
+SLOT = struct.Struct("<qqqq")
+
+_ELECTION, _EPOCH, _ACCEPTED, _SEALED = range(4)
+
+
+def block_size(slots: int) -> int:
+    return HEADER.size + slots * SLOT.size
+
+
+class LiveCounters:
+
+    def __init__(self):
+        self._map = None
+        self._fd = None
+        self._slots = 0
+        self._index = {}            # election_id -> slot number (slots never move)
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self.path = None
+
+    # --------------------------------------------------------
+    # SETUP
+    # --------------------------------------------------------
+
+    @staticmethod
+    def create(path, seeds=(), slots: int = None):
+        """
+        Writes a fresh counter block to `path` (launcher side), seeded
+        with (election_id, epoch, accepted, sealed) rows. Replaces the
+        file atomically, so workers never attach to a half-written one.
+        """
+        slots = slots or config.SHARED_COUNTER_SLOTS
+        seeds = list(seeds)
+        if len(seeds) > slots:
+            raise ValueError(f"{len(seeds)} elections do not fit in {slots} counter slots")
+
+        data = bytearray(block_size(slots))
+        HEADER.pack_into(data, 0, MAGIC, slots)
+        for n, seed in enumerate(seeds):
+            SLOT.pack_into(data, HEADER.size + n * SLOT.size, *seed)
+
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def attach(self, path):
+        """
+        Maps the block the launcher created (worker side).
+        """
+        fd = os.open(path, os.O_RDWR)
+        try:
+            mapping = mmap.mmap(fd, 0)
+        except Exception:
+            os.close(fd)
+            raise
+
+        magic, slots = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC or len(mapping) < block_size(slots):
+            mapping.close()
+            os.close(fd)
+            raise ValueError(f"{path} is not a VoteChain counter block")
+
+        self._install(mapping, slots, fd if fcntl is not None else None)
+        if fcntl is None:
+            os.close(fd)
+        self.path = Path(path)
+
+    def open_private(self, seeds=(), slots: int = None):
+        """
+        A block only this process sees (single-worker deployments).
+        """
+        slots = slots or config.SHARED_COUNTER_SLOTS
+        mapping = mmap.mmap(-1, block_size(slots))
+        HEADER.pack_into(mapping, 0, MAGIC, slots)
+        self._install(mapping, slots, None)
+        for seed in seeds:
+            slot = self._slot(seed[_ELECTION], create=True)
+            SLOT.pack_into(self._map, self._offset(slot), *seed)
+
+    def _install(self, mapping, slots: int, fd):
+        with self._lock:
+            old, old_fd = self._map, self._fd
+            self._map, self._fd, self._slots = mapping, fd, slots
+            self._index = {}
+            self.path = None
+        if old is not None:
+            old.close()
+        if old_fd is not None:
+            os.close(old_fd)
+
+    def _ensure_open(self):
+        if self._map is None:
+            with self._open_lock:
+                if self._map is None:
+                    self.open_private()
+
+    def close(self):
+        self._install(None, 0, None)
+
+    # --------------------------------------------------------
+    # SLOTS
+    # --------------------------------------------------------
+
+    @staticmethod
+    def _offset(slot: int) -> int:
+        return HEADER.size + slot * SLOT.size
+
+    def _field(self, slot: int, field: int) -> int:
+        return struct.unpack_from("<q", self._map, self._offset(slot) + field * 8)[0]
+
+    def _locked(self, start: int, length: int):
+        return _RangeLock(self._lock, self._fd, start, length)
+
+    def _slot(self, election_id: int, create: bool = False):
+        """
+        Slot number of the election's counters (None if it has none and
+        `create` is False). Slots are claimed under the header lock.
+        """
+        slot = self._index.get(election_id)
+        if slot is not None:
+            return slot
+
+        with self._locked(0, HEADER.size):
+            for slot in range(self._slots):
+                owner = self._field(slot, _ELECTION)
+                if owner == election_id:
+                    break
+                if owner == 0:
+                    if not create:
+                        return None
+                    SLOT.pack_into(self._map, self._offset(slot), election_id, 0, 0, 0)
+                    break
+            else:
+                if create:
+                    raise RuntimeError("no free live counter slot; raise VOTECHAIN_COUNTER_SLOTS")
+                return None
+
+        self._index[election_id] = slot
+        return slot
+
+    # --------------------------------------------------------
+    # UPDATES
+    # --------------------------------------------------------
+
+    def _add(self, election_id: int, epoch: int, field: int, n: int):
+        self._ensure_open()
+        slot = self._slot(election_id, create=True)
+        offset = self._offset(slot)
+
+        with self._locked(offset, SLOT.size):
+            _, current, accepted, sealed = SLOT.unpack_from(self._map, offset)
+            if epoch < current:
+                # a straggler of a reset epoch: its votes no longer count
+                return
+            if epoch > current:
+                accepted = sealed = 0
+            values = [election_id, epoch, accepted, sealed]
+            values[field] += n
+            SLOT.pack_into(self._map, offset, *values)
+
+    def add_accepted(self, election_id: int, epoch: int, n: int = 1):
+        self._add(election_id, epoch, _ACCEPTED, n)
+
+    def add_sealed(self, election_id: int, epoch: int, n: int):
+        self._add(election_id, epoch, _SEALED, n)
+
+    def reset(self, election_id: int, epoch: int):
+        """
+        Starts the election's new epoch at zero (election reset).
+        """
+        self._add(election_id, epoch, _ACCEPTED, 0)
+
+    def clear(self):
+        """
+        Zeroes every slot (tests).
+        """
+        self._ensure_open()
+        with self._locked(0, block_size(self._slots)):
+            self._map[HEADER.size:block_size(self._slots)] = bytes(self._slots * SLOT.size)
+            self._index = {}
+
+    # --------------------------------------------------------
+    # READS (no locks)
+    # --------------------------------------------------------
+
+    def read(self, election_id: int, epoch: int) -> dict:
+        """
+        {"accepted", "sealed", "pending"} of the election's epoch.
+        """
+        self._ensure_open()
+        slot = self._slot(election_id)
+        accepted = sealed = 0
+        if slot is not None and self._field(slot, _EPOCH) == epoch:
+            accepted = self._field(slot, _ACCEPTED)
+            sealed = self._field(slot, _SEALED)
+        return {"accepted": accepted, "sealed": sealed, "pending": max(accepted - sealed, 0)}
+
+    def snapshot(self) -> list:
+        """
+        (election_id, epoch, accepted, sealed) of every used slot.
+        """
+        self._ensure_open()
+        rows = []
+        for slot in range(self._slots):
+            row = SLOT.unpack_from(self._map, self._offset(slot))
+            if row[_ELECTION] == 0:
+                break
+            rows.append(row)
+        return rows
+
+    def prometheus(self) -> str:
+        """
+        Counters in the Prometheus text exposition format.
+        """
+        lines = [
+            "# TYPE votechain_votes_accepted_total counter",
+            "# TYPE votechain_votes_sealed_total counter",
+            "# TYPE votechain_mempool_depth gauge",
+        ]
+        for election_id, epoch, accepted, sealed in self.snapshot():
+            labels = f'{{election_id="{election_id}",epoch="{epoch}"}}'
+            lines.append(f"votechain_votes_accepted_total{labels} {accepted}")
+            lines.append(f"votechain_votes_sealed_total{labels} {sealed}")
+            lines.append(f"votechain_mempool_depth{labels} {max(accepted - sealed, 0)}")
+        return "\n".join(lines) + "\n"
+
+
+class _RangeLock:
+    """
+    Thread lock plus, for a shared block, an fcntl lock on a byte range
+    of its file (fcntl locks do not exclude threads of one process).
+    """
+
+    __slots__ = ("lock", "fd", "start", "length")
+
+    def __init__(self, lock, fd, start: int, length: int):
+        self.lock = lock
+        self.fd = fd
+        self.start = start
+        self.length = length
+
+    def __enter__(self):
+        self.lock.acquire()
+        if self.fd is not None:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.length, self.start)
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, self.length, self.start)
+        self.lock.release()
+
+
+# shared by the vote, election and admin routes of this process
+live_counters = LiveCounters()
@@ -0,0 +1,60 @@
+import threading
+import time
+
+
+class Readiness:
+    """
+    Tracks background warm-up after the server starts accepting
+    connections. The process is live right away; it reports ready
+    once warm-up has finished (see GET /ready).
+    """
+
+    def __init__(self):
+        self.state = "starting"
+        self.error = None
+        self.started_at = time.monotonic()
+        self.ready_at = None
+        self._thread = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def begin(self, warm_up):
+        """
+        Runs warm_up() in a background thread.
+        """
+        self.state = "starting"
+        self.error = None
+        self.started_at = time.monotonic()
+        self.ready_at = None
+
+        def run():
+            try:
+                warm_up()
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                return
+            self.ready_at = time.monotonic()
+            self.state = "ready"
+
+        self._thread = threading.Thread(target=run, name="votechain-warm-up", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def report(self) -> dict:
+        report = {"status": self.state}
+        if self.ready_at is not None:
+            report["warm_up_seconds"] = round(self.ready_at - self.started_at, 4)
+        if self.error:
+            report["error"] = self.error
+        return report
+
+
+# shared by the app's startup hook and /ready
+readiness = Readiness()
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import threading
+
+from fastapi import Request, Response
+
+
+# FINAL RESULTS CACHE
+#
+# Once an election has ENDED its chain is frozen, so the result documents
+# can be computed once and served as pre-encoded bytes with a strong ETag.
+# Entries are keyed by (election_id, view) and tagged with the chain tip
+# they were computed from; a different tip (chain change) is a miss, and
+# admin_clear_election drops the election's entries.
+
+
+class CachedResult:
+    def __init__(self, body: bytes, chain_tip: str):
+        self.body = body
+        self.chain_tip = chain_tip
+        self.etag = '"' + hashlib.sha256(body).hexdigest() + '"'
+
+
+class ResultsCache:
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, election_id: int, view: str, chain_tip: str):
+        """
+        Returns the cached entry, or None if missing or computed
+        from a different chain tip.
+        """
+        entry = self._entries.get((election_id, view))
+        if entry is None or entry.chain_tip != chain_tip:
+            return None
+        return entry
+
+    def put(self, election_id: int, view: str, chain_tip: str, document) -> CachedResult:
+        body = json.dumps(document, separators=(",", ":")).encode()
+        entry = CachedResult(body, chain_tip)
+        with self._lock:
+            self._entries[(election_id, view)] = entry
+        return entry
+
+    def invalidate(self, election_id: int):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == election_id]:
+                del self._entries[key]
+
+
+def cached_response(entry: CachedResult, request: Request) -> Response:
+    """
+    Serves the cached bytes; answers 304 when the client already
+    holds this exact document (If-None-Match).
+    """
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+
+    client_tags = [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+    if entry.etag in client_tags or "*" in client_tags:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+# shared by admin + voter routes
+results_cache = ResultsCache()
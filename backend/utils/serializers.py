@@ -10,8 +10,7 @@ def voter_to_dict(voter):
     """
     return {
         "id": voter.id,
-        "voter_id": voter.voter_id,
-        "has_voted": voter.has_voted
+        "voter_id": voter.voter_id
     }
 
 
@@ -57,6 +56,48 @@ def full_election_results(total_votes: int, turnout_pct: float, rows: List[dict]
     }
 
 
+def admin_results_document(candidates, vote_counts: dict, total_voters: int):
+    """
+    Full result sheet shown to admins.
+    vote_counts maps candidate_id -> sealed votes.
+    """
+    total_votes = sum(vote_counts.values())
+
+    rows = []
+    for c in candidates:
+        votes = vote_counts.get(c.id, 0)
+        rows.append(election_result_entry(
+            c.name,
+            votes,
+            (votes / total_votes * 100) if total_votes else 0,
+            (votes / total_voters * 100) if total_voters else 0
+        ))
+
+    turnout = (total_votes / total_voters * 100) if total_voters else 0
+    return full_election_results(total_votes, turnout, rows)
+
+
+def voter_results_document(candidates, vote_counts: dict):
+    """
+    Public result sheet shown to voters (no registration figures).
+    """
+    total_votes = sum(vote_counts.values())
+
+    return {
+        "total_votes": total_votes,
+        "results": [
+            {
+                "candidate": c.name,
+                "votes": vote_counts.get(c.id, 0),
+                "percent_of_votes": round(
+                    (vote_counts.get(c.id, 0) / total_votes * 100) if total_votes else 0, 2
+                )
+            }
+            for c in candidates
+        ]
+    }
+
+
 # BLOCKCHAIN SERIALIZERS
 
 def transaction_to_dict(tx):
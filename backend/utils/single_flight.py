@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+# REQUEST COALESCING (SINGLE FLIGHT)
+#
+# Concurrent identical computations share one execution: the first
+# caller for a key runs it, callers arriving while it is in flight
+# await the same result (or exception) instead of running it again.
+# Nothing is kept once the flight lands; the next caller computes
+# afresh, so this only collapses stampedes (e.g. every client asking
+# for the results the second an election ends).
+#
+# Futures are thread-safe, so callers on different event loops or
+# threadpool threads coalesce too.
+
+
+# the flight's owner was cancelled before it had a result
+_ABANDONED = object()
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.executions = 0     # computations actually run (metrics, tests)
+
+    async def run(self, key, compute, *args):
+        """
+        Returns `await compute(*args)`, shared with every concurrent
+        call for the same key.
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                owner = flight is None
+                if owner:
+                    flight = self._flights[key] = Future()
+                    self.executions += 1
+
+            if owner:
+                return await self._fly(key, flight, compute, args)
+
+            result = await asyncio.wrap_future(flight)
+            if result is not _ABANDONED:
+                return result
+            # the owner went away: fly it ourselves
+
+    async def _fly(self, key, flight: Future, compute, args):
+        try:
+            result = await compute(*args)
+        except Exception as e:
+            self._land(key)
+            flight.set_exception(e)
+            raise
+        except BaseException:
+            self._land(key)
+            flight.set_result(_ABANDONED)
+            raise
+
+        self._land(key)
+        flight.set_result(result)
+        return result
+
+    def _land(self, key):
+        with self._lock:
+            del self._flights[key]
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+# shared by admin + voter routes
+single_flight = SingleFlight()